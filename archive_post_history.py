@@ -0,0 +1,41 @@
+"""
+古いサイクルの投稿履歴をアーカイブするスクリプト
+post_history から post_history_archive テーブルへ移動する（post_history_all ビューで両方を参照可能）
+"""
+import argparse
+import logging
+import sys
+from database import PostDatabase
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def main(keep_cycles: int = 2, db_path: str = "posts.db"):
+    """メイン関数"""
+    logger.info("=" * 60)
+    logger.info(f"投稿履歴のアーカイブ（最新{keep_cycles}サイクルを残す）")
+    logger.info("=" * 60)
+    
+    db = PostDatabase(db_path)
+    moved = db.archive_cycles(keep_cycles=keep_cycles)
+    
+    with db.session() as conn:
+        remaining = conn.execute('SELECT COUNT(*) FROM post_history').fetchone()[0]
+        archived = conn.execute('SELECT COUNT(*) FROM post_history_archive').fetchone()[0]
+    
+    logger.info(f"移動: {moved}件 / 現行の投稿履歴: {remaining}件 / アーカイブ: {archived}件")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='古いサイクルの投稿履歴をアーカイブ')
+    parser.add_argument('--keep', type=int, default=2, help='post_history に残すサイクル数（現在のサイクルを含む）')
+    parser.add_argument('--db', default='posts.db', help='データベースファイルのパス')
+    args = parser.parse_args()
+    main(keep_cycles=args.keep, db_path=args.db)
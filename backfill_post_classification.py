@@ -0,0 +1,50 @@
+"""
+投稿の分類カラム（Day番号・語録番号・索引・原書）を再計算するスクリプト
+分類ルールの変更後や、タイトルを直接更新した後に実行する
+"""
+import logging
+import sys
+from database import PostDatabase
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """メイン関数"""
+    logger.info("=" * 60)
+    logger.info("投稿分類の再計算")
+    logger.info("=" * 60)
+    
+    # PostDatabase の初期化時に未適用のマイグレーションも適用される
+    db = PostDatabase()
+    updated = db.reclassify_posts()
+    
+    with db.session() as conn:
+        summary = conn.execute('''
+            SELECT blog_url,
+                   COUNT(*) AS total,
+                   SUM(day_number BETWEEN 1 AND 365) AS day_posts,
+                   SUM(goroku_number IS NOT NULL) AS goroku_posts,
+                   SUM(is_index) AS index_posts,
+                   SUM(is_original_text) AS original_posts
+            FROM posts
+            GROUP BY blog_url
+        ''').fetchall()
+    
+    for row in summary:
+        logger.info(
+            f"{row['blog_url']}: 全{row['total']}件 / Day {row['day_posts']}件 / "
+            f"語録番号あり {row['goroku_posts']}件 / 索引 {row['index_posts']}件 / 原書 {row['original_posts']}件"
+        )
+    logger.info(f"更新: {updated}件")
+
+
+if __name__ == "__main__":
+    main()
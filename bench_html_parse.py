@@ -0,0 +1,111 @@
+"""
+HTML解析のベンチマーク
+保存済みページ（既定: archive/scripts/index4.html）を html.parser と lxml で解析し、
+個別記事リンクの抽出と記事エントリの検索にかかる時間を比較する
+"""
+import argparse
+import sys
+import time
+from typing import Callable, List
+
+from bs4 import BeautifulSoup
+
+import soupsieve
+
+from html_parsing import HAS_LXML, extract_links, iter_links, normalize_url
+from site_profiles import get_profile
+
+DEFAULT_FILES = ['archive/scripts/index4.html']
+
+# 個別記事リンク（事前コンパイル）
+POST_LINKS = soupsieve.compile('a[href*="blog-entry-"]')
+
+
+def links_html_parser(html: str) -> List[str]:
+    """従来の方法: html.parser + find_all + 条件判定"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for a in soup.find_all('a', href=True):
+        href = a.get('href', '')
+        if 'blog-entry-' in href:
+            links.append(normalize_url(href))
+    return links
+
+
+def links_lxml_css(html: str) -> List[str]:
+    """lxml + 事前コンパイルしたCSSセレクタ"""
+    soup = BeautifulSoup(html, 'lxml')
+    return [normalize_url(a.get('href', '')) for a in POST_LINKS.select(soup)]
+
+
+def links_lxml_xpath(html: str) -> List[str]:
+    """html_parsing.extract_links（lxml.html + XPath、BeautifulSoup を介さない）"""
+    return [normalize_url(href) for href, _ in extract_links(html) if 'blog-entry-' in href]
+
+
+def links_streaming(html: str) -> List[str]:
+    """html_parsing.iter_links（アンカー要素のみのイベント駆動解析、木を作らない）"""
+    return [link.url for link in iter_links(html, href_contains='blog-entry-')]
+
+
+def entries_html_parser(html: str) -> int:
+    """従来の方法: html.parser + lambda によるクラス名判定"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return len(soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'post' in x.lower())))
+
+
+def entries_lxml_css(html: str) -> int:
+    """lxml + サイトプロファイルの事前コンパイルしたCSSセレクタ"""
+    soup = BeautifulSoup(html, 'lxml')
+    return len(get_profile('http://notesofacim.blog.fc2.com/').select(soup, 'listing', 'entries'))
+
+
+def bench(func: Callable, html: str, repeat: int) -> float:
+    """1回あたりの平均時間（ミリ秒）"""
+    func(html)  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(files: List[str], repeat: int):
+    if not HAS_LXML:
+        print("lxml がインストールされていません（pip install lxml）")
+        return 1
+
+    cases = [
+        ('リンク抽出', [
+            ('html.parser + find_all', links_html_parser),
+            ('lxml + CSSセレクタ', links_lxml_css),
+            ('extract_links (XPath)', links_lxml_xpath),
+            ('iter_links (ストリーム)', links_streaming),
+        ]),
+        ('エントリ検索', [
+            ('html.parser + lambda', entries_html_parser),
+            ('lxml + CSSセレクタ', entries_lxml_css),
+        ]),
+    ]
+
+    for path in files:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        print(f"\n{path}（{len(html):,} 文字、{repeat}回の平均）")
+        for label, funcs in cases:
+            results = [func(html) for _, func in funcs]
+            if any(result != results[0] for result in results):
+                print(f"  [警告] {label}: 方法により結果が異なります")
+            baseline = None
+            for name, func in funcs:
+                ms = bench(func, html, repeat)
+                baseline = baseline or ms
+                print(f"  {label} / {name:<24} {ms:8.2f} ms  x{baseline / ms:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='HTML解析のベンチマーク（html.parser と lxml の比較）')
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES, help='解析する保存済みHTMLファイル')
+    parser.add_argument('--repeat', type=int, default=50, help='繰り返し回数')
+    args = parser.parse_args()
+    sys.exit(main(args.files, args.repeat))
@@ -0,0 +1,53 @@
+"""
+ツイート整形のベンチマーク
+blog-to-pdf/神の使者365日の言葉_data.json の全エントリを各アカウントのルールで整形し、
+1件あたりの時間（キャッシュなし・キャッシュあり）を表示する
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+from tweet_formatter import FORMATTERS
+
+DEFAULT_DATA = 'blog-to-pdf/神の使者365日の言葉_data.json'
+
+# アカウントごとの整形に使うリンク（ルールの判定と文字数の計算に使う）
+LINKS = {
+    '365bot': 'http://notesofacim.blog.fc2.com/blog-entry-100.html',
+    'pursahs': 'https://ameblo.jp/pursahs-gospel/entry-12345678901.html',
+}
+
+
+def bench(func: Callable[[Dict[str, str]], str], entries: List[Dict[str, str]], repeat: int) -> float:
+    """1件あたりの平均時間（マイクロ秒）"""
+    for entry in entries:  # ウォームアップ
+        func(entry)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for entry in entries:
+            func(entry)
+    return (time.perf_counter() - start) / (repeat * len(entries)) * 1_000_000
+
+
+def main(path: str, repeat: int):
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    print(f"{path}（{len(entries)}件、{repeat}回の平均）")
+
+    for account, link in LINKS.items():
+        formatter = FORMATTERS[account]
+        formatter.clear_cache()
+        uncached = bench(lambda e: formatter._format(e['title'], e['content'], link), entries, repeat)
+        cached = bench(lambda e: formatter.format(e['title'], e['content'], link), entries, repeat)
+        print(f"  {account:<8} キャッシュなし {uncached:8.1f} µs  キャッシュあり {cached:8.1f} µs  x{uncached / cached:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='ツイート整形のベンチマーク')
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA, help='title, content を持つエントリのJSONファイル')
+    parser.add_argument('--repeat', type=int, default=20, help='繰り返し回数')
+    args = parser.parse_args()
+    sys.exit(main(args.data, args.repeat))
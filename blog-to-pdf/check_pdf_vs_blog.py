@@ -1,55 +1,37 @@
 """
 PDFとブログの表記を比較するスクリプト
 """
-import requests
-from bs4 import BeautifulSoup
 import re
 import json
 import os
 import sys
-import time
 from generate_365bot_pdf import fetch_post_content
+from fetch_engine import get_fetch_engine
+from html_parsing import make_soup
+from site_profiles import get_profile
 
 def fetch_blog_content(url: str) -> dict:
-    """ブログからコンテンツを取得"""
+    """ブログからコンテンツを取得（FetchEngine 経由。並列に呼び出してよい）"""
     try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        response = session.get(url, timeout=30)
+        response = get_fetch_engine().get(url)
         response.raise_for_status()
         
         if response.encoding is None or response.encoding == 'ISO-8859-1':
             response.encoding = response.apparent_encoding or 'utf-8'
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         # タイトルを取得
         title_elem = soup.find('h2', class_='entry_header')
-        if not title_elem:
-            for h2 in soup.find_all('h2'):
-                if h2.get('class') and 'entry_header' in h2.get('class'):
-                    title_elem = h2
-                    break
         
         title = title_elem.get_text(strip=True) if title_elem else "タイトルなし"
         
-        # 「ACIM学習ガイド」や「ACIM学習ノート」を削除
-        title = re.sub(r'^ACIM学習(ガイド|ノート)\s*[-|]?\s*', '', title)
-        title = re.sub(r'\s*[-|]?\s*ACIM学習(ガイド|ノート)$', '', title)
-        title = re.sub(r'ACIM学習(ガイド|ノート)', '', title)
-        title = title.replace('神の使い', '神の使者')
-        title = title.strip()
+        # 「ACIM学習ガイド」や「ACIM学習ノート」を削除（サイトプロファイルの除去ルール）
+        profile = get_profile(url)
+        title = profile.clean('title', title)
         
         # コンテンツを取得
-        content_elem = soup.find('div', class_='entry_body')
-        if not content_elem:
-            for div in soup.find_all('div'):
-                if div.get('class') and 'entry_body' in div.get('class'):
-                    content_elem = div
-                    break
+        content_elem = profile.select_one(soup, 'page', 'body')
         
         content = ""
         if content_elem:
@@ -69,9 +51,7 @@ def fetch_blog_content(url: str) -> dict:
             content = content_elem.get_text(separator='\n', strip=False)
             
             # Tweetセクションを削除
-            tweet_pos = content.find('Tweet')
-            if tweet_pos >= 0:
-                content = content[:tweet_pos]
+            content = profile.clean('body', content)
             
             # 連続する空白行を整理
             content = re.sub(r'\n{3,}', '\n\n', content)
@@ -211,6 +191,11 @@ def main():
     
     print(f"Day001～Day365の投稿: {len(all_posts)} 件をチェックします")
     
+    # ブログのコンテンツをまとめて並列取得（比較結果は投稿の順に表示）
+    urls = [post.get('url', '') for post in all_posts if post.get('url', '')]
+    print(f"ブログから {len(urls)} 件のコンテンツを取得中...")
+    blog_contents = dict(zip(urls, get_fetch_engine().map(fetch_blog_content, urls)))
+    
     # 各投稿をチェック
     for i, pdf_post_data in enumerate(all_posts, 1):
         url = pdf_post_data.get('url', '')
@@ -222,8 +207,7 @@ def main():
         print(f"チェック {i}/{len(all_posts)}: {url}")
         print(f"{'='*60}")
         
-        # ブログからコンテンツを取得
-        blog_data = fetch_blog_content(url)
+        blog_data = blog_contents[url]
         print(f"ブログタイトル: {blog_data['title']}")
         print(f"ブログコンテンツ長: {len(blog_data['content'])} 文字")
         
@@ -265,9 +249,6 @@ def main():
             print("PDF:")
             for j, line in enumerate(pdf_lines, 1):
                 print(f"  {j}: {line[:80]}")
-        
-        import time
-        time.sleep(1)  # サーバーへの負荷を軽減
     
     print("\n" + "=" * 60)
     print("比較完了")
@@ -3,8 +3,6 @@
 """
 import os
 import sys
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 from reportlab.lib.pagesizes import A4
@@ -15,10 +13,17 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import logging
-import time
 import re
 import json
 
+# 親ディレクトリの共通モジュール（post_classifier など）を参照する
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from post_classifier import extract_day_number as extract_day_number_from_title
+from fetch_engine import get_fetch_engine
+from html_parsing import extract_links, make_soup
+from site_profiles import get_profile
+from http_session import log_connection_stats
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -34,10 +39,7 @@ INDEX_URLS = [
 def extract_all_post_urls() -> list[str]:
     """全インデックスページから個別投稿のURLを抽出（既存のindex_extractor.pyのロジックを使用）"""
     
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    })
+    engine = get_fetch_engine()
     
     urls = []
     seen_urls = set()
@@ -46,37 +48,31 @@ def extract_all_post_urls() -> list[str]:
     index_urls_set = set(INDEX_URLS)
     index_urls_set.add("http://notesofacim.blog.fc2.com/blog-entry-434.html")
     
-    for index_url in INDEX_URLS:
+    # 索引ページをまとめて並列取得（抽出は索引ページの順に行う）
+    logger.info(f"索引ページを取得中: {len(INDEX_URLS)}件")
+    responses = engine.map(engine.get, INDEX_URLS, return_exceptions=True)
+    
+    for index_url, response in zip(INDEX_URLS, responses):
         try:
             logger.info(f"索引ページからURLを抽出中: {index_url}")
-            response = session.get(index_url, timeout=30)
+            if isinstance(response, Exception):
+                raise response
             response.encoding = response.apparent_encoding or 'utf-8'
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # すべてのリンクを取得（リンクのみ必要なため木を作らずに抽出）
+            links = extract_links(response.text)
+            all_hrefs = [href for href, _ in links if 'blog-entry-' in href and '.html' in href]
             
-            # すべてのリンクを取得
-            all_links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                if 'blog-entry-' in href and '.html' in href:
-                    all_links.append(link)
-            
-            # テーブルやリスト内のリンクも探す
-            if len(all_links) < 50:
-                for element in soup.find_all(['td', 'li', 'div', 'p']):
-                    links_in_element = element.find_all('a', href=True)
-                    for link in links_in_element:
-                        href = link.get('href', '')
-                        link_text = link.get_text(strip=True)
-                        if ('blog-entry-' in href and '.html' in href) or \
-                           (re.search(r'Day\d+', link_text) and 'blog-entry-' in href):
-                            if link not in all_links:
-                                all_links.append(link)
+            # 少ない場合は、テキストにDay番号を含むリンクも探す
+            if len(all_hrefs) < 50:
+                all_hrefs += [
+                    href for href, link_text in links
+                    if 'blog-entry-' in href and '.html' not in href and re.search(r'Day\d+', link_text)
+                ]
             
             # URLを正規化して追加
-            for link in all_links:
-                href = link.get('href', '')
+            for href in all_hrefs:
                 if not href:
                     continue
                 
@@ -97,7 +93,6 @@ def extract_all_post_urls() -> list[str]:
                     urls.append(normalized_url)
             
             logger.info(f"この索引ページから {len([u for u in urls if index_url.split('/')[-1].split('.')[0] in u])} 件のURLを抽出")
-            time.sleep(1)  # サーバーへの負荷を軽減
             
         except Exception as e:
             logger.error(f"URL抽出エラー ({index_url}): {e}")
@@ -107,63 +102,42 @@ def extract_all_post_urls() -> list[str]:
 
 
 def fetch_post_content(url: str) -> dict:
-    """個別投稿ページからコンテンツを取得"""
+    """個別投稿ページからコンテンツを取得（FetchEngine 経由。並列に呼び出してよい）"""
     logger.info(f"コンテンツを取得: {url}")
     
     try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        response = session.get(url, timeout=30)
+        response = get_fetch_engine().get(url)
         response.raise_for_status()
         
         # エンコーディングを適切に処理
         if response.encoding is None or response.encoding == 'ISO-8859-1':
             response.encoding = response.apparent_encoding or 'utf-8'
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         # タイトルを取得（複数の方法を試す）
-        title_elem = None
         # 方法1: h2.entry_headerを探す（実際のHTMLではentry_headerクラス）
         title_elem = soup.find('h2', class_='entry_header')
         if not title_elem:
-            # 方法2: h2タグでentry_headerクラスを含むものを探す
-            for h2 in soup.find_all('h2'):
-                if h2.get('class') and 'entry_header' in h2.get('class'):
-                    title_elem = h2
-                    break
-        if not title_elem:
-            # 方法3: h2.entry_titleを探す（フォールバック）
+            # 方法2: h2.entry_titleを探す（フォールバック）
             title_elem = soup.find('h2', class_='entry_title')
         if not title_elem:
-            # 方法4: h1を探す
+            # 方法3: h1を探す
             title_elem = soup.find('h1')
         if not title_elem:
-            # 方法5: titleタグを探す
+            # 方法4: titleタグを探す
             title_elem = soup.find('title')
         
         title = title_elem.get_text(strip=True) if title_elem else "タイトルなし"
         
-        # 「ACIM学習ガイド」や「ACIM学習ノート」を削除（前後から）
-        # ただし、（）は残す（例：Day246（神の使者:P.359、ACIM:T-01.II.05:04-05））
-        title = re.sub(r'^ACIM学習(ガイド|ノート)\s*[-|]?\s*', '', title)
-        title = re.sub(r'\s*[-|]?\s*ACIM学習(ガイド|ノート)$', '', title)
-        title = re.sub(r'ACIM学習(ガイド|ノート)', '', title)
-        title = title.replace('神の使い', '神の使者')
-        title = title.strip()
+        # 「ACIM学習ガイド」や「ACIM学習ノート」を削除し、「神の使い」を「神の使者」に修正（サイトプロファイルの除去ルール）
+        profile = get_profile(url)
+        title = profile.clean('title', title)
         
-        # コンテンツを取得（entry_bodyクラスを探す）
-        content_elem = soup.find('div', class_='entry_body')
+        # コンテンツを取得（サイトプロファイルの本文セレクタ: entry_bodyクラスのdivなど）
+        content_elem = profile.select_one(soup, 'page', 'body')
         if not content_elem:
             # フォールバック: メインコンテンツエリアを探す
-            for div in soup.find_all('div'):
-                if div.get('class') and 'entry_body' in div.get('class'):
-                    content_elem = div
-                    break
-        if not content_elem:
             content_elem = soup.find('div', class_='entry') or soup.find('article') or soup.find('main')
         
         content = ""
@@ -186,11 +160,8 @@ def fetch_post_content(url: str) -> dict:
             # separator='\n'で改行を保持
             content = content_elem.get_text(separator='\n', strip=False)
             
-            # Tweetセクションを削除（コンテンツの最後から）
-            # 「Tweet」という文字列が見つかった位置から後を削除
-            tweet_pos = content.find('Tweet')
-            if tweet_pos >= 0:
-                content = content[:tweet_pos]
+            # Tweetセクション（「Tweet」以降）を削除
+            content = profile.clean('body', content)
             
             # 連続する空白行を整理（最大2つの連続改行まで）
             content = re.sub(r'\n{3,}', '\n\n', content)
@@ -379,22 +350,18 @@ def main(test_mode: bool = False, test_count: int = 10):
     
     logger.info(f"合計 {len(all_urls)} 件の投稿URLを取得しました")
     
-    # 2. 各投稿のコンテンツを取得
-    all_posts = []
-    for i, url in enumerate(all_urls, 1):
-        logger.info(f"進捗: {i}/{len(all_urls)}")
-        post_data = fetch_post_content(url)
-        all_posts.append(post_data)
-        time.sleep(1)  # サーバーへの負荷を軽減
+    # 2. 各投稿のコンテンツを並列取得（ホストごとの並列数・頻度は FetchEngine が制限）
+    all_posts = get_fetch_engine().map(fetch_post_content, all_urls)
+    logger.info(f"{len(all_posts)} 件のコンテンツを取得しました")
+    log_connection_stats()
     
     # 2.5. Day番号でソート（Day1から順に）
     def extract_day_number(post):
         """タイトルからDay番号を抽出"""
         title = post.get('title', '')
-        # Day番号を抽出（Day046、Day46などに対応）
-        match = re.search(r'Day0*(\d+)', title, re.IGNORECASE)
-        if match:
-            day_num = int(match.group(1))
+        # Day番号を抽出（Day046、Day46、全角数字などに対応）
+        day_num = extract_day_number_from_title(title)
+        if day_num is not None:
             logger.debug(f"タイトル '{title}' からDay番号 {day_num} を抽出")
             return day_num
         # Day番号が見つからない場合は、URLからエントリ番号を取得
@@ -412,8 +379,7 @@ def main(test_mode: bool = False, test_count: int = 10):
     logger.info(f"Day番号でソートしました（Day1から順に）")
     for i, post in enumerate(all_posts[:5], 1):
         title = post.get('title', 'タイトルなし')
-        day_match = re.search(r'Day0*(\d+)', title, re.IGNORECASE)
-        day_num = int(day_match.group(1)) if day_match else '?'
+        day_num = extract_day_number_from_title(title) or '?'
         logger.info(f"  順序 {i}: Day{day_num} - {title[:50]}...")
     
     # テストモードの場合は、指定された開始Dayからtest_count件のみ使用
@@ -422,13 +388,9 @@ def main(test_mode: bool = False, test_count: int = 10):
         start_day = 11
         start_index = None
         for i, post in enumerate(all_posts):
-            title = post.get('title', '')
-            day_match = re.search(r'Day0*(\d+)', title, re.IGNORECASE)
-            if day_match:
-                day_num = int(day_match.group(1))
-                if day_num == start_day:
-                    start_index = i
-                    break
+            if extract_day_number_from_title(post.get('title', '')) == start_day:
+                start_index = i
+                break
         
         if start_index is not None:
             all_posts = all_posts[start_index:start_index + test_count]
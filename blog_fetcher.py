@@ -1,12 +1,19 @@
 """
 ブログコンテンツ取得モジュール
 """
+import hashlib
+import time
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin
 import feedparser
 import logging
+from config import Config
+from http_cache import cached_parse, get_http_cache
+from html_parsing import extract_feed_links, extract_links, make_soup
+from site_profiles import PROFILE_VERSION, element_date, element_text, get_generic_profile, get_profile
+from http_session import get_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,12 +22,15 @@ logger = logging.getLogger(__name__)
 class BlogFetcher:
     """ブログコンテンツを取得するクラス"""
     
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # 条件付きGET（ETag / Last-Modified）で未変更のページを再取得・再解析しないセッション
+        # （省略時はプロセス共通のセッションで接続を再利用する）
+        self.session = session or get_session()
+        # ホストに対応する抽出ルール（タイトル・本文・リンク・日付のセレクタと除去ルール）
+        self.profile = get_profile(base_url)
+        # フィードURLの確認結果（前回成功したフィード・無効なURL）の保存先
+        self._feed_cache = getattr(self.session, 'cache', None) or get_http_cache()
     
     def fetch_latest_post(self) -> Optional[Dict[str, str]]:
         """
@@ -30,9 +40,8 @@ class BlogFetcher:
             投稿情報の辞書（title, content, link, published_date）またはNone
         """
         try:
-            # RSSフィードを試行
-            rss_urls = self._get_rss_urls()
-            for rss_url in rss_urls:
+            # RSSフィードを試行（個別ページではフィードを使わず、ページ自体を解析する）
+            for rss_url in self._iter_feed_urls():
                 post = self._fetch_from_rss(rss_url)
                 if post:
                     return post
@@ -44,50 +53,128 @@ class BlogFetcher:
             logger.error(f"ブログ取得エラー: {e}")
             return None
     
-    def _get_rss_urls(self) -> List[str]:
-        """RSSフィードのURLを生成"""
-        parsed = urlparse(self.base_url)
-        domain = f"{parsed.scheme}://{parsed.netloc}"
+    def _iter_feed_urls(self) -> Iterator[str]:
+        """
+        試行するフィードURLを順に返す
+        
+        1. 前回成功したフィード（FEED_ENDPOINT_TTL_HOURS 以内に確認したもの）
+        2. トップページの <link rel="alternate"> で告知されたフィード
+        3. 以前に成功したフィードと、プロファイルの既定のフィードURL
+        無効と記録されたURL（FEED_DEAD_TTL_HOURS 以内）は試さない。
+        前回のフィードで取得できた場合、トップページは取得しない。
+        base_url が個別ページの場合は何も返さない（ページの <link rel="alternate"> が告知するのは
+        ブログ全体のフィードで、その先頭はその投稿ではなくブログの最新投稿のため）。
+        """
+        if self._is_entry_page():
+            logger.debug(f"個別ページのためフィードを使用しません: {self.base_url}")
+            return
+        now = time.time()
+        endpoints = self._feed_cache.get_feed_endpoints(self.base_url)
+        dead = {
+            e['feed_url'] for e in endpoints
+            if not e['ok'] and now - e['checked_at'] < Config.FEED_DEAD_TTL_HOURS * 3600
+        }
+        working = [e for e in endpoints if e['ok']]
+        tried = set()
+        
+        if working and now - working[0]['checked_at'] < Config.FEED_ENDPOINT_TTL_HOURS * 3600:
+            url = working[0]['feed_url']
+            logger.info(f"前回成功したフィードを使用: {url}")
+            tried.add(url)
+            yield url
+        
+        candidates = self._discover_feed_urls()
+        candidates += [e['feed_url'] for e in working]
+        candidates += [urljoin(self.base_url, path) for path in self.profile.feeds]
+        for url in candidates:
+            if url in tried:
+                continue
+            tried.add(url)
+            if url in dead:
+                logger.debug(f"無効と記録されたフィードをスキップ: {url}")
+                continue
+            yield url
+    
+    def _discover_feed_urls(self) -> List[str]:
+        """トップページの <link rel="alternate"> からフィードURLを検出（未変更のページは解析結果を再利用）"""
+        try:
+            response = self._get_page(self.base_url)
+        except requests.RequestException as e:
+            logger.debug(f"フィード検出のためのページ取得失敗 ({self.base_url}): {e}")
+            return []
+        urls = cached_parse(response, 'feed_links', lambda: extract_feed_links(response.text, self.base_url))
+        if urls:
+            logger.debug(f"フィードを検出: {urls}")
+        return urls
+    
+    def _fetch_feed_entries(self, rss_url: str) -> List[Dict[str, str]]:
+        """RSSフィードを取得してエントリを投稿情報の辞書に変換（未変更のフィードは解析結果を再利用）"""
+        feed = self._fetch_feed(rss_url)
+        return feed['entries'] if feed else []
+    
+    def _fetch_feed(self, rss_url: str) -> Optional[Dict]:
+        """
+        RSSフィードを取得して解析
         
-        # FC2ブログの場合
-        if 'fc2.com' in self.base_url:
-            # FC2ブログのRSS URLパターン
-            blog_id = self.base_url.split('/')[-2] if self.base_url.endswith('/') else self.base_url.split('/')[-1]
-            return [
-                f"{self.base_url}?xml",
-                f"{self.base_url}rss.xml",
-                f"{self.base_url}index.rdf",
-            ]
+        Returns:
+            feed_url, updated（フィードの更新日時）, entries（投稿情報のリスト）,
+            not_modified（本文が前回から変わっていない場合True）の辞書。取得できない場合はNone
+        """
+        response = self.session.get(rss_url, timeout=30)
+        if response.status_code != 200:
+            # 404 などは無効なURLとして記録（429・5xx は一時的なエラーとして記録しない）
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                self._feed_cache.set_feed_endpoint(self.base_url, rss_url, False)
+            return None
         
-        # Amebaブログの場合
-        elif 'ameba.jp' in self.base_url:
-            return [
-                f"{self.base_url}rss20.xml",
-                f"{self.base_url}?xml",
-            ]
+        def parse():
+            feed = feedparser.parse(response.content)
+            return {
+                'updated': feed.feed.get('updated', '') or feed.feed.get('published', ''),
+                'entries': [
+                    {
+                        'title': entry.get('title', ''),
+                        'content': self._clean_html(entry.get('summary', '') or entry.get('description', '')),
+                        'link': entry.get('link', ''),
+                        'published_date': entry.get('published', ''),
+                        'author': entry.get('author', ''),
+                    }
+                    for entry in feed.entries
+                ],
+            }
         
-        # その他の場合
-        return [
-            f"{self.base_url}rss.xml",
-            f"{self.base_url}feed",
-            f"{self.base_url}?feed=rss2",
-        ]
+        feed = cached_parse(response, 'feed', parse)
+        # エントリを取得できたフィードを記録（次回は検出を省略して最初に試す）
+        self._feed_cache.set_feed_endpoint(self.base_url, rss_url, bool(feed['entries']))
+        if not feed['entries']:
+            return None
+        return dict(feed, feed_url=rss_url, not_modified=getattr(response, 'from_cache', False))
+    
+    def fetch_feed(self) -> Optional[Dict]:
+        """
+        エントリを取得できた最初のフィードを返す（blog_sync.py の差分同期用）
+        
+        Returns:
+            _fetch_feed と同じ辞書、またはNone
+        """
+        for rss_url in self._iter_feed_urls():
+            try:
+                logger.info(f"RSS取得を試行: {rss_url}")
+                feed = self._fetch_feed(rss_url)
+                if feed:
+                    return feed
+            except Exception as e:
+                logger.debug(f"RSS取得失敗 ({rss_url}): {e}")
+        return None
     
     def _fetch_from_rss(self, rss_url: str) -> Optional[Dict[str, str]]:
         """RSSフィードから最新投稿を取得"""
         try:
             logger.info(f"RSS取得を試行: {rss_url}")
-            feed = feedparser.parse(rss_url)
+            entries = self._fetch_feed_entries(rss_url)
             
-            if feed.entries:
-                entry = feed.entries[0]  # 最新のエントリ
-                return {
-                    'title': entry.get('title', ''),
-                    'content': self._clean_html(entry.get('summary', '') or entry.get('description', '')),
-                    'link': entry.get('link', ''),
-                    'published_date': entry.get('published', ''),
-                    'author': entry.get('author', ''),
-                }
+            if entries:
+                return entries[0]  # 最新のエントリ
         except Exception as e:
             logger.debug(f"RSS取得失敗 ({rss_url}): {e}")
             return None
@@ -105,28 +192,20 @@ class BlogFetcher:
         posts = []
         try:
             # RSSフィードから取得を試行
-            rss_urls = self._get_rss_urls()
-            for rss_url in rss_urls:
+            for rss_url in self._iter_feed_urls():
                 try:
                     logger.info(f"RSSから全投稿取得を試行: {rss_url}")
-                    feed = feedparser.parse(rss_url)
+                    entries = self._fetch_feed_entries(rss_url)
                     
-                    if feed.entries:
-                        for entry in feed.entries[:max_posts]:
-                            post = {
-                                'title': entry.get('title', ''),
-                                'content': self._clean_html(entry.get('summary', '') or entry.get('description', '')),
-                                'link': entry.get('link', ''),
-                                'published_date': entry.get('published', ''),
-                                'author': entry.get('author', ''),
-                            }
+                    if entries:
+                        for post in entries[:max_posts]:
                             # 重複チェック
                             if not any(p.get('link') == post.get('link') for p in posts):
                                 posts.append(post)
                         
                         if posts:
-                            # FC2でRSSが索引だけの場合はアーカイブを試す
-                            if 'fc2.com' in self.base_url:
+                            # RSSが索引だけの場合はアーカイブ（全記事一覧）を試す
+                            if self.profile.archive_path:
                                 non_index = [p for p in posts if '索引' not in (p.get('title') or '')]
                                 if not non_index:
                                     logger.info("RSSが索引のみのため、アーカイブから再取得を試行")
@@ -140,8 +219,8 @@ class BlogFetcher:
             # RSSが取得できない場合は、HTMLから複数ページを取得
             logger.info("HTMLから投稿を取得します（制限: 最新数件のみ）")
             html_posts = []
-            if 'fc2.com' in self.base_url:
-                html_posts = self._fetch_fc2_archive_posts(max_posts)
+            if self.profile.archive_path:
+                html_posts = self._fetch_archive_posts(max_posts)
             if not html_posts:
                 html_posts = self._fetch_multiple_from_html(max_posts)
             if html_posts:
@@ -152,381 +231,203 @@ class BlogFetcher:
         
         return posts
 
-    def _fetch_fc2_archive_posts(self, max_posts: int = 200) -> List[Dict[str, str]]:
-        """FC2のアーカイブ一覧から投稿リンクを取得"""
-        posts = []
+    def _fetch_archive_posts(self, max_posts: int = 200) -> List[Dict[str, str]]:
+        """アーカイブ（全記事一覧、FC2の archives.html など）から投稿リンクを取得"""
+        archive = self.fetch_archive()
+        posts = archive['posts'][:max_posts] if archive else []
+        if posts:
+            logger.info(f"アーカイブから{len(posts)}件の投稿を取得")
+        return posts
+    
+    def fetch_archive(self) -> Optional[Dict]:
+        """
+        アーカイブ（全記事一覧）を取得して解析
+        
+        Returns:
+            hash（ページ本文のハッシュ）, posts（投稿情報のリスト）,
+            not_modified（本文が前回から変わっていない場合True）の辞書。
+            アーカイブがないプロファイル、または取得できない場合はNone
+        """
+        profile = self.profile
+        if not profile.archive_path:
+            return None
+        entry_path = profile.entry_path.lstrip('/')
         try:
-            archive_url = urljoin(self.base_url, "archives.html")
-            logger.info(f"FC2アーカイブ取得を試行: {archive_url}")
-            response = self.session.get(archive_url, timeout=30)
-            response.encoding = response.apparent_encoding or 'utf-8'
-            response.raise_for_status()
+            archive_url = urljoin(self.base_url, profile.archive_path)
+            logger.info(f"アーカイブ取得を試行: {archive_url}")
+            response = self._get_page(archive_url)
+            
+            def parse():
+                archive_posts = []
+                seen = set()
+                for href, text in extract_links(response.text):
+                    if entry_path not in href or not href.endswith('.html'):
+                        continue
+                    link = href if href.startswith('http') else urljoin(self.base_url, href)
+                    if link in seen:
+                        continue
+                    seen.add(link)
+                    title = profile.clean('title', text)
+                    if not title:
+                        title = link
+                    archive_posts.append({
+                        'title': title,
+                        'content': '',
+                        'link': link,
+                        'published_date': '',
+                        'author': '',
+                    })
+                return archive_posts
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            seen = set()
-            for a in soup.find_all('a', href=True):
-                href = a.get('href', '')
-                if 'blog-entry-' not in href:
-                    continue
-                if not href.endswith('.html'):
-                    continue
-                link = href if href.startswith('http') else urljoin(self.base_url, href)
-                if link in seen:
-                    continue
-                seen.add(link)
-                title = a.get_text(strip=True)
-                if not title:
-                    title = link
-                posts.append({
-                    'title': title,
-                    'content': '',
-                    'link': link,
-                    'published_date': '',
-                    'author': '',
-                })
-                if len(posts) >= max_posts:
-                    break
-            if posts:
-                logger.info(f"FC2アーカイブから{len(posts)}件の投稿を取得")
+            return {
+                'hash': hashlib.sha256(response.content).hexdigest(),
+                'posts': cached_parse(response, f'archive:{PROFILE_VERSION}', parse),
+                'not_modified': getattr(response, 'from_cache', False),
+            }
         except Exception as e:
-            logger.error(f"FC2アーカイブ取得エラー: {e}")
-        return posts
+            logger.error(f"アーカイブ取得エラー: {e}")
+            return None
+    
+    def fetch_listing_page(self, page: int) -> List[Dict[str, str]]:
+        """
+        一覧ページ（page=0 はトップページ、1以降は次のページ）の投稿を取得
+        
+        次のページのURL形式がプロファイルにない場合、page=1 以降は空のリストを返す。
+        エラー時は例外。
+        """
+        if page == 0:
+            url = self.base_url
+        elif self.profile.listing_pages:
+            url = urljoin(self.base_url, self.profile.listing_pages.format(self.profile.listing_page_start + page - 1))
+        else:
+            return []
+        response = self._get_page(url)
+        return cached_parse(
+            response, f'listing:{PROFILE_VERSION}',
+            lambda: self._parse_multiple_entries(make_soup(response.text), max_posts=1000)
+        )
     
     def _fetch_multiple_from_html(self, max_posts: int = 20) -> List[Dict[str, str]]:
         """HTMLから複数の投稿を取得（ページネーション対応は難しいため、最初のページのみ）"""
         posts = []
         try:
-            response = self.session.get(self.base_url, timeout=30)
-            response.encoding = response.apparent_encoding or 'utf-8'
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # FC2ブログの場合
-            if 'fc2.com' in self.base_url:
-                entries = soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'post' in x.lower()))
-                if not entries:
-                    entries = soup.find_all('div', id=lambda x: x and 'entry' in x.lower())
-                
-                for entry in entries[:max_posts]:
-                    post = self._parse_fc2_entry(entry)
-                    if post:
-                        posts.append(post)
-            
-            # Amebaブログの場合
-            elif 'ameba.jp' in self.base_url:
-                entries = soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'article' in x.lower() or 'post' in x.lower()))
-                if not entries:
-                    entries = soup.find_all('div', id=lambda x: x and ('entry' in x.lower() or 'article' in x.lower()))
-                
-                for entry in entries[:max_posts]:
-                    post = self._parse_ameba_entry(entry)
-                    if post:
-                        posts.append(post)
-            
+            response = self._get_page(self.base_url)
+            return cached_parse(
+                response, f'html_entries:{max_posts}:{PROFILE_VERSION}',
+                lambda: self._parse_multiple_entries(make_soup(response.text), max_posts)
+            )
         except Exception as e:
             logger.error(f"HTMLから複数取得エラー: {e}")
         
         return posts
     
-    def _parse_fc2_entry(self, entry) -> Optional[Dict[str, str]]:
-        """FC2ブログのエントリを解析"""
+    def _parse_multiple_entries(self, soup: BeautifulSoup, max_posts: int) -> List[Dict[str, str]]:
+        """一覧ページから投稿を解析（タイトルとリンクがないエントリは除外）"""
+        posts = []
         try:
-            title_elem = entry.find(['h2', 'h3', 'a'], class_=lambda x: x and 'title' in x.lower())
-            if not title_elem:
-                title_elem = entry.find('a', href=lambda x: x and '/blog-entry-' in str(x))
-            
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            link = title_elem.get('href', '') if title_elem and title_elem.name == 'a' else ''
-            
-            if not link or not title:
-                return None
-            
-            if link and not link.startswith('http'):
-                link = urljoin(self.base_url, link)
-            
-            content_elem = entry.find(['div', 'p'], class_=lambda x: x and ('content' in x.lower() or 'entry' in x.lower() or 'text' in x.lower()))
-            if not content_elem:
-                content_elem = entry.find('div', id=lambda x: x and 'entry_body' in x.lower())
-            
-            content = content_elem.get_text(strip=True) if content_elem else ""
-            
-            return {
-                'title': title,
-                'content': content[:500] if content else "",
-                'link': link,
-                'published_date': '',
-                'author': '',
-            }
+            for entry in self.profile.select(soup, 'listing', 'entries')[:max_posts]:
+                post = self._parse_entry(entry)
+                if post['link'] and post['title']:
+                    posts.append(post)
         except Exception as e:
-            logger.debug(f"FC2エントリ解析エラー: {e}")
-            return None
+            logger.error(f"HTMLから複数解析エラー: {e}")
+        
+        return posts
     
-    def _parse_ameba_entry(self, entry) -> Optional[Dict[str, str]]:
-        """Amebaブログのエントリを解析"""
-        try:
-            title_elem = entry.find(['h2', 'h3', 'h4', 'a'], class_=lambda x: x and 'title' in x.lower())
-            if not title_elem:
-                title_elem = entry.find('a')
-            
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            link = title_elem.get('href', '') if title_elem and title_elem.name == 'a' else ''
-            
-            if not link or not title:
-                return None
-            
-            if link and not link.startswith('http'):
-                link = urljoin(self.base_url, link)
-            
-            content_elem = entry.find(['div', 'p', 'section'], class_=lambda x: x and ('content' in x.lower() or 'text' in x.lower() or 'body' in x.lower()))
-            if not content_elem:
-                content_elem = entry.find('div', class_='skin-entryBody')
-            
-            content = content_elem.get_text(strip=True) if content_elem else ""
-            
-            return {
-                'title': title,
-                'content': content[:500] if content else "",
-                'link': link,
-                'published_date': '',
-                'author': '',
-            }
-        except Exception as e:
-            logger.debug(f"Amebaエントリ解析エラー: {e}")
-            return None
+    def _parse_entry(self, entry) -> Dict[str, str]:
+        """一覧ページの記事エントリを解析（リンクはタイトルのリンク、なければエントリ内の記事リンク）"""
+        profile = self.profile
+        title_elem = profile.select_one(entry, 'listing', 'title')
+        link = title_elem.get('href', '') if title_elem is not None and title_elem.name == 'a' else ''
+        if not link:
+            link_elem = profile.select_one(entry, 'listing', 'link')
+            link = link_elem.get('href', '') if link_elem is not None else ''
+        if link and not link.startswith('http'):
+            link = urljoin(self.base_url, link)
+        
+        content = profile.clean('body', element_text(profile.select_one(entry, 'listing', 'body')))
+        
+        return {
+            'title': profile.clean('title', element_text(title_elem)),
+            'content': content[:500] if content else "",
+            'link': link,
+            'published_date': element_date(profile.select_one(entry, 'listing', 'date')),
+            'author': '',
+        }
     
     def _fetch_from_html(self) -> Optional[Dict[str, str]]:
         """HTMLから直接最新投稿を取得"""
         try:
             logger.info(f"HTMLから取得を試行: {self.base_url}")
             response = self.session.get(self.base_url, timeout=30)
-            response.encoding = response.apparent_encoding or 'utf-8'
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 個別ページの場合（blog-entry-やentry-を含むURL）
-            if '/blog-entry-' in self.base_url or '/entry-' in self.base_url:
-                return self._parse_single_page(soup)
-            
-            # FC2ブログの場合
-            if 'fc2.com' in self.base_url:
-                return self._parse_fc2_blog(soup)
-            
-            # Amebaブログの場合
-            elif 'ameba.jp' in self.base_url:
-                return self._parse_ameba_blog(soup)
-            
-            # その他の場合、一般的なブログ構造を試行
-            return self._parse_generic_blog(soup)
+            return self.parse_page_response(response)
             
         except Exception as e:
             logger.error(f"HTML取得エラー: {e}")
             return None
     
-    def _parse_single_page(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
-        """個別ページを解析"""
-        try:
-            # FC2ブログの個別ページ
-            if 'fc2.com' in self.base_url and '/blog-entry-' in self.base_url:
-                # タイトル取得
-                title_elem = soup.find(['h1', 'h2', 'h3'], class_=lambda x: x and 'title' in x.lower())
-                if not title_elem:
-                    title_elem = soup.find('title')
-                
-                title = title_elem.get_text(strip=True) if title_elem else ""
-                
-                # コンテンツ取得（複数の方法で試す）
-                content_elem = None
-                
-                # 方法1: classにentry_bodyを含むdiv
-                content_elem = soup.find('div', class_='entry_body')
-                
-                # 方法2: classにentry_bodyを含むdiv（他の方法）
-                if not content_elem:
-                    for div in soup.find_all('div', class_=True):
-                        classes = ' '.join(div.get('class', []))
-                        if 'entry_body' in classes.lower():
-                            content_elem = div
-                            break
-                
-                # 方法3: classにcontentを含むdiv（idがeで始まるもの）
-                if not content_elem:
-                    content_elem = soup.find('div', class_='content', id=lambda x: x and str(x).startswith('e'))
-                
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",
-                    'link': self.base_url,
-                    'published_date': '',
-                    'author': '',
-                }
-            
-            # Amebaブログの個別ページ
-            elif 'ameba.jp' in self.base_url and '/entry-' in self.base_url:
-                # タイトル取得
-                title_elem = soup.find(['h1', 'h2', 'h3'], class_=lambda x: x and 'title' in x.lower())
-                if not title_elem:
-                    title_elem = soup.find('title')
-                
-                title = title_elem.get_text(strip=True) if title_elem else ""
-                
-                # コンテンツ取得
-                content_elem = soup.find(['div', 'article', 'section'], class_=lambda x: x and ('entry' in x.lower() or 'content' in x.lower() or 'body' in x.lower() or 'text' in x.lower()))
-                if not content_elem:
-                    content_elem = soup.find('div', class_='skin-entryBody')
-                
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",
-                    'link': self.base_url,
-                    'published_date': '',
-                    'author': '',
-                }
-            
-            # その他の個別ページ
-            else:
-                title_elem = soup.find(['h1', 'title'])
-                title = title_elem.get_text(strip=True) if title_elem else ""
-                
-                content_elem = soup.find(['article', 'main', 'div'], class_=lambda x: x and ('content' in x.lower() or 'entry' in x.lower() or 'post' in x.lower()))
-                if not content_elem:
-                    content_elem = soup.find('main') or soup.find('article')
-                
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",
-                    'link': self.base_url,
-                    'published_date': '',
-                    'author': '',
-                }
-        except Exception as e:
-            logger.error(f"個別ページ解析エラー: {e}")
-            return None
-    
-    def _parse_fc2_blog(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
-        """FC2ブログのHTMLを解析"""
-        try:
-            # FC2ブログの記事エントリを探す
-            entries = soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'post' in x.lower()))
-            
-            if not entries:
-                # 別のパターンを試行
-                entries = soup.find_all('div', id=lambda x: x and 'entry' in x.lower())
-            
-            if entries:
-                entry = entries[0]
-                
-                # タイトル取得
-                title_elem = entry.find(['h2', 'h3', 'a'], class_=lambda x: x and 'title' in x.lower())
-                if not title_elem:
-                    title_elem = entry.find('a', href=lambda x: x and '/blog-entry-' in str(x))
-                
-                title = title_elem.get_text(strip=True) if title_elem else "タイトルなし"
-                link = title_elem.get('href', '') if title_elem and title_elem.name == 'a' else ''
-                
-                if link and not link.startswith('http'):
-                    link = urljoin(self.base_url, link)
-                
-                # コンテンツ取得
-                content_elem = entry.find(['div', 'p'], class_=lambda x: x and ('content' in x.lower() or 'entry' in x.lower() or 'text' in x.lower()))
-                if not content_elem:
-                    content_elem = entry.find('div', id=lambda x: x and 'entry_body' in x.lower())
-                
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",  # 最初の500文字
-                    'link': link or self.base_url,
-                    'published_date': '',
-                    'author': '',
-                }
-        except Exception as e:
-            logger.error(f"FC2ブログ解析エラー: {e}")
+    def parse_page_response(self, response: requests.Response) -> Optional[Dict[str, str]]:
+        """
+        取得済みの base_url のレスポンスを解析（FetchEngine で取得したページなど）
         
-        return None
+        本文がキャッシュから返された（304）場合は保存済みの解析結果を使い、再解析しない。
+        """
+        def parse():
+            response.encoding = response.apparent_encoding or 'utf-8'
+            return self._parse_page(make_soup(response.text))
+        
+        return cached_parse(response, f'latest_post:{PROFILE_VERSION}', parse)
+    
+    def _get_page(self, url: str) -> requests.Response:
+        """ページを取得（文字コードを推定して設定、エラー時は例外）"""
+        response = self.session.get(url, timeout=30)
+        response.encoding = response.apparent_encoding or 'utf-8'
+        response.raise_for_status()
+        return response
     
-    def _parse_ameba_blog(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
-        """AmebaブログのHTMLを解析"""
+    def _is_entry_page(self) -> bool:
+        """base_url が個別ページ（blog-entry-やentry-を含むURL）か"""
+        return '/blog-entry-' in self.base_url or '/entry-' in self.base_url
+    
+    def _parse_page(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+        """取得したページを解析（個別ページはページ全体、それ以外は一覧の最初のエントリ）"""
         try:
-            # Amebaブログの記事エントリを探す
-            entries = soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'article' in x.lower() or 'post' in x.lower()))
-            
-            if not entries:
-                entries = soup.find_all('div', id=lambda x: x and ('entry' in x.lower() or 'article' in x.lower()))
+            # 個別ページの場合（blog-entry-やentry-を含むURL）
+            if self._is_entry_page():
+                return self._parse_single_page(soup)
             
+            entries = self.profile.select(soup, 'listing', 'entries')
             if entries:
-                entry = entries[0]
-                
-                # タイトル取得
-                title_elem = entry.find(['h2', 'h3', 'h4', 'a'], class_=lambda x: x and 'title' in x.lower())
-                if not title_elem:
-                    title_elem = entry.find('a')
-                
-                title = title_elem.get_text(strip=True) if title_elem else "タイトルなし"
-                link = title_elem.get('href', '') if title_elem and title_elem.name == 'a' else ''
-                
-                if link and not link.startswith('http'):
-                    link = urljoin(self.base_url, link)
-                
-                # コンテンツ取得
-                content_elem = entry.find(['div', 'p', 'section'], class_=lambda x: x and ('content' in x.lower() or 'text' in x.lower() or 'body' in x.lower()))
-                if not content_elem:
-                    content_elem = entry.find('div', class_='skin-entryBody')
-                
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",
-                    'link': link or self.base_url,
-                    'published_date': '',
-                    'author': '',
-                }
+                post = self._parse_entry(entries[0])
+                post['title'] = post['title'] or "タイトルなし"
+                post['link'] = post['link'] or self.base_url
+                return post
+            
         except Exception as e:
-            logger.error(f"Amebaブログ解析エラー: {e}")
+            logger.error(f"HTML解析エラー: {e}")
         
         return None
     
-    def _parse_generic_blog(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
-        """一般的なブログ構造を解析"""
+    def _parse_single_page(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+        """個別ページを解析（URLがプロファイルの個別ページの形式でない場合は汎用の抽出ルール）"""
         try:
-            # 記事エントリを探す
-            entries = soup.find_all(['article', 'div'], class_=lambda x: x and ('entry' in x.lower() or 'post' in x.lower() or 'article' in x.lower()))
+            profile = self.profile if self.profile.is_entry_url(self.base_url) else get_generic_profile()
+            content = profile.clean('body', element_text(profile.select_one(soup, 'page', 'body')))
             
-            if entries:
-                entry = entries[0]
-                
-                # タイトルとリンク
-                title_elem = entry.find(['h1', 'h2', 'h3', 'a'])
-                title = title_elem.get_text(strip=True) if title_elem else "タイトルなし"
-                link = title_elem.get('href', '') if title_elem and title_elem.name == 'a' else self.base_url
-                
-                # コンテンツ
-                content_elem = entry.find(['div', 'p', 'section'])
-                content = content_elem.get_text(strip=True) if content_elem else ""
-                
-                return {
-                    'title': title,
-                    'content': content[:500] if content else "",
-                    'link': link,
-                    'published_date': '',
-                    'author': '',
-                }
+            return {
+                'title': profile.clean('title', element_text(profile.select_one(soup, 'page', 'title'))),
+                'content': content[:500] if content else "",
+                'link': self.base_url,
+                'published_date': element_date(profile.select_one(soup, 'page', 'date')),
+                'author': '',
+            }
         except Exception as e:
-            logger.error(f"一般的なブログ解析エラー: {e}")
-        
-        return None
+            logger.error(f"個別ページ解析エラー: {e}")
+            return None
     
     def _clean_html(self, html: str) -> str:
         """HTMLタグを削除してテキストのみを抽出"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         return soup.get_text(strip=True)
 
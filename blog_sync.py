@@ -0,0 +1,230 @@
+"""
+ブログの差分同期モジュール
+ブログごとに前回どこまで取得したか（最新エントリ・フィードの更新日時・アーカイブのハッシュ）を
+sync_state テーブルに保存し、次回は新しいページだけを取得して追加・変更・削除の差分を返す
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import Dict, List, Optional
+
+from blog_fetcher import BlogFetcher
+from config import Config
+from database import PostDatabase
+from http_cache import set_offline_mode
+from http_session import connection_stats
+
+logger = logging.getLogger(__name__)
+
+
+class BlogSync:
+    """
+    1つのブログの差分同期
+
+    取得元は次の順に選ぶ:
+    1. アーカイブ（全記事一覧）: ページのハッシュが前回と同じなら解析しない。全件が載るため削除も検出できる
+    2. フィード: 更新日時が前回と同じなら何もしない。既知のリンクに達するまでのエントリを追加とする
+    3. 一覧ページ: 既知のリンクを含むページまでたどる（フィードで既知のリンクに達しなかった場合も）
+    初回（状態なし）または full=True の場合は fetch_all_posts で全件を取得する。
+    """
+
+    def __init__(self, blog_url: str, db: Optional[PostDatabase] = None, fetcher: Optional[BlogFetcher] = None):
+        self.blog_url = blog_url
+        self.db = db or PostDatabase()
+        self.fetcher = fetcher or BlogFetcher(blog_url)
+
+    def sync(self, full: bool = False, dry_run: bool = False, max_pages: Optional[int] = None) -> Dict:
+        """
+        同期を実行してデータベースに反映
+
+        Args:
+            full: 前回の状態を使わず全件を取得する
+            dry_run: データベースに反映せず差分だけを返す
+            max_pages: たどる一覧ページの上限（省略時は Config.SYNC_MAX_PAGES）
+
+        Returns:
+            差分の辞書
+            - source: 取得元（archive / feed / pages / full）
+            - added: 追加された投稿のリスト
+            - changed: タイトルが変わった投稿のリスト（old_title 付き）
+            - removed: ブログから消えた投稿のリンクのリスト（アーカイブから取得した場合のみ）
+            - not_modified: 前回から変更がなかった場合True
+            - requests: 送信したHTTPリクエスト数
+        """
+        state = self.db.get_sync_state(self.blog_url) or {}
+        known = self.db.get_post_titles(self.blog_url)
+        requests_before = connection_stats(self.fetcher.session)['requests']
+        max_pages = Config.SYNC_MAX_PAGES if max_pages is None else max_pages
+
+        if full or not state or not known:
+            result = self._sync_full(known)
+        else:
+            result = (
+                self._sync_archive(state, known)
+                or self._sync_feed(state, known, max_pages)
+                or self._sync_pages(known, max_pages)
+            )
+
+        result['requests'] = connection_stats(self.fetcher.session)['requests'] - requests_before
+        sync_state = result.pop('state')
+        if dry_run:
+            return result
+
+        if result['added'] or result['changed']:
+            self.db.add_posts_bulk(self.blog_url, result['added'] + result['changed'])
+        if result['removed']:
+            # 投稿履歴が参照しているため削除はせず、ログに残す
+            logger.warning(f"ブログから消えた投稿: {len(result['removed'])}件（データベースには残します）")
+        new_state = dict(state, **sync_state)
+        new_state['post_count'] = len(known) + len(result['added'])
+        self.db.save_sync_state(self.blog_url, new_state)
+        logger.info(
+            f"差分同期（{result['source']}）: {self.blog_url} "
+            f"追加 {len(result['added'])}件 / 変更 {len(result['changed'])}件 / 削除 {len(result['removed'])}件"
+            f"（リクエスト {result['requests']}件）"
+        )
+        return result
+
+    def _result(self, source: str, posts: List[Dict[str, str]], known: Dict[str, str],
+                complete: bool = False, not_modified: bool = False, **state) -> Dict:
+        """取得した投稿と既知の投稿を比べて差分を作る（complete=True の場合は削除も検出）"""
+        added, changed, seen = [], [], set()
+        for post in posts:
+            link = post.get('link')
+            if not link or link in seen:
+                continue
+            seen.add(link)
+            if link not in known:
+                added.append(post)
+            elif post.get('title') and post['title'] != known[link]:
+                changed.append(dict(post, old_title=known[link]))
+        removed = [link for link in known if link not in seen] if complete else []
+        state['source'] = source
+        return {
+            'source': source,
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'not_modified': not_modified,
+            'state': state,
+        }
+
+    def _unchanged(self, source: str) -> Dict:
+        return {'source': source, 'added': [], 'changed': [], 'removed': [], 'not_modified': True, 'state': {'source': source}}
+
+    def _sync_full(self, known: Dict[str, str]) -> Dict:
+        """全件を取得（初回）"""
+        logger.info(f"全件を取得します: {self.blog_url}")
+        posts = self.fetcher.fetch_all_posts(max_posts=500)
+        state = {'last_entry_id': posts[0]['link'] if posts else None}
+        archive = self.fetcher.fetch_archive()
+        if archive and archive['posts']:
+            state['archive_hash'] = archive['hash']
+            posts = archive['posts'] + [p for p in posts if p['link'] not in {a['link'] for a in archive['posts']}]
+        feed = self.fetcher.fetch_feed()
+        if feed:
+            state['feed_updated'] = feed['updated']
+            state['last_entry_id'] = feed['entries'][0]['link']
+        return self._result('full', posts, known, **state)
+
+    def _sync_archive(self, state: Dict, known: Dict[str, str]) -> Optional[Dict]:
+        """アーカイブから同期（アーカイブがない場合はNone）"""
+        archive = self.fetcher.fetch_archive()
+        if not archive or not archive['posts']:
+            return None
+        if archive['not_modified'] or archive['hash'] == state.get('archive_hash'):
+            logger.info("アーカイブは前回から変更なし")
+            return self._unchanged('archive')
+        return self._result('archive', archive['posts'], known, complete=True, archive_hash=archive['hash'])
+
+    def _sync_feed(self, state: Dict, known: Dict[str, str], max_pages: int) -> Optional[Dict]:
+        """フィードから同期（フィードがない場合はNone）"""
+        feed = self.fetcher.fetch_feed()
+        if not feed:
+            return None
+        entries = feed['entries']
+        if feed['not_modified'] or (feed['updated'] and feed['updated'] == state.get('feed_updated')):
+            logger.info("フィードは前回から変更なし")
+            return self._unchanged('feed')
+
+        # 前回の最新エントリ（または既知のリンク）に達するまでが新しいエントリ
+        reached = False
+        posts = []
+        for entry in entries:
+            if entry['link'] == state.get('last_entry_id') or entry['link'] in known:
+                reached = True
+            posts.append(entry)
+        result = self._result(
+            'feed', posts, known, feed_updated=feed['updated'], last_entry_id=entries[0]['link']
+        )
+        if not reached:
+            # フィードに載る件数より多く更新された: 既知のリンクまで一覧ページをたどる
+            logger.info("フィードで既知の投稿に達しないため、一覧ページをたどります")
+            pages = self._sync_pages(known, max_pages, skip=set(p['link'] for p in posts))
+            result['added'] += pages['added']
+            result['changed'] += pages['changed']
+        return result
+
+    def _sync_pages(self, known: Dict[str, str], max_pages: int, skip: Optional[set] = None) -> Dict:
+        """一覧ページを先頭からたどり、既知のリンクを含むページで止める"""
+        posts: List[Dict[str, str]] = []
+        for page in range(max_pages):
+            try:
+                page_posts = self.fetcher.fetch_listing_page(page)
+            except Exception as e:
+                logger.warning(f"一覧ページ取得エラー（{page}ページ目）: {e}")
+                break
+            if not page_posts:
+                break
+            posts += [p for p in page_posts if not skip or p['link'] not in skip]
+            if any(p['link'] in known for p in page_posts):
+                break
+        state = {'last_entry_id': posts[0]['link']} if posts else {}
+        return self._result('pages', posts, known, **state)
+
+
+def sync_blog(blog_url: str, db: Optional[PostDatabase] = None, full: bool = False, dry_run: bool = False) -> Dict:
+    """ブログを差分同期（BlogSync(blog_url, db).sync() の省略形）"""
+    return BlogSync(blog_url, db).sync(full=full, dry_run=dry_run)
+
+
+def format_diff(result: Dict) -> List[str]:
+    """差分を表示用の行に変換"""
+    lines = [f"+ {p.get('title', '')} {p['link']}" for p in result['added']]
+    lines += [f"~ {p['old_title']} -> {p.get('title', '')} {p['link']}" for p in result['changed']]
+    lines += [f"- {link}" for link in result['removed']]
+    return lines
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    parser = argparse.ArgumentParser(description='ブログの投稿を差分同期し、追加・変更・削除を表示')
+    parser.add_argument('--blog', choices=['365bot', 'pursahs', 'all'], default='all', help='対象のブログ')
+    parser.add_argument('--url', help='対象のブログURL（--blog の代わりに指定）')
+    parser.add_argument('--full', action='store_true', help='前回の状態を使わず全件を取得')
+    parser.add_argument('--dry-run', action='store_true', help='データベースに反映しない')
+    parser.add_argument('--json', action='store_true', help='差分をJSONで出力')
+    parser.add_argument('--offline', action='store_true', help='ネットワークに接続せずHTTPキャッシュのみから取得')
+    args = parser.parse_args()
+    if args.offline:
+        set_offline_mode(True)
+
+    if args.url:
+        blog_urls = [args.url]
+    else:
+        blog_urls = {
+            '365bot': [Config.BLOG_365BOT_URL],
+            'pursahs': [Config.BLOG_PURSAHS_URL],
+            'all': [Config.BLOG_365BOT_URL, Config.BLOG_PURSAHS_URL],
+        }[args.blog]
+
+    db = PostDatabase()
+    results = {url: sync_blog(url, db, full=args.full, dry_run=args.dry_run) for url in blog_urls}
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for url, result in results.items():
+            print(f"\n{url}（{result['source']}、リクエスト {result['requests']}件）")
+            for line in format_diff(result) or ['変更なし']:
+                print(f"  {line}")
@@ -2,10 +2,15 @@
 import sqlite3
 import sys
 import io
-import re
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.insert(0, '.')
+from database import PostDatabase
+
+# 分類カラム（day_number など）のマイグレーションを適用しておく
+PostDatabase()
+
 conn = sqlite3.connect('posts.db')
 cur = conn.cursor()
 
@@ -30,17 +35,11 @@ total_posts = cur.fetchone()[0]
 print(f"全投稿数: {total_posts}件")
 
 # Day001～Day365の投稿数を取得
-cur.execute('SELECT id, title FROM posts WHERE blog_url = ?', (blog_url_365,))
-all_posts = cur.fetchall()
-day_pattern = re.compile(r'Day(\d{3})')
-day_posts = []
-for post_id, title in all_posts:
-    if title:
-        match = day_pattern.search(title)
-        if match:
-            day_num = int(match.group(1))
-            if 1 <= day_num <= 365:
-                day_posts.append(post_id)
+cur.execute('''
+    SELECT id FROM posts
+    WHERE blog_url = ? AND is_index = 0 AND day_number BETWEEN 1 AND 365
+''', (blog_url_365,))
+day_posts = [row[0] for row in cur.fetchall()]
 
 print(f"Day001～Day365の投稿数: {len(day_posts)}件")
 
@@ -5,13 +5,19 @@ import io
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.insert(0, '.')
+from database import PostDatabase
+
+# アーカイブ用テーブル・ビュー（post_history_all）のマイグレーションを適用しておく
+PostDatabase()
+
 conn = sqlite3.connect('posts.db')
 cur = conn.cursor()
 
 # 全サイクルの投稿数を確認
 cur.execute('''
     SELECT cycle_number, COUNT(DISTINCT post_id) as count
-    FROM post_history 
+    FROM post_history_all 
     WHERE twitter_handle = '365botGary'
     GROUP BY cycle_number
     ORDER BY cycle_number
@@ -31,7 +37,7 @@ print(f"\n合計投稿済み: {total_posted}件")
 
 # 全投稿履歴の投稿IDを確認
 cur.execute('''
-    SELECT DISTINCT post_id FROM post_history 
+    SELECT DISTINCT post_id FROM post_history_all 
     WHERE twitter_handle = '365botGary'
     ORDER BY post_id
 ''')
@@ -2,10 +2,15 @@
 import sqlite3
 import sys
 import io
-import re
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.insert(0, '.')
+from database import PostDatabase
+
+# 分類カラム（day_number など）のマイグレーションを適用しておく
+PostDatabase()
+
 conn = sqlite3.connect('posts.db')
 cur = conn.cursor()
 
@@ -21,24 +26,21 @@ cur.execute('''
 posted_ids = set([row[0] for row in cur.fetchall()])
 
 # 全投稿を取得
-cur.execute('SELECT id, title FROM posts WHERE blog_url = ?', (blog_url,))
+cur.execute('''
+    SELECT id, title, day_number FROM posts
+    WHERE blog_url = ? AND is_index = 0 AND day_number BETWEEN 1 AND 365
+''', (blog_url,))
 all_posts = cur.fetchall()
 
-day_pattern = re.compile(r'Day(\d{3})')
 day_posts_dict = {}  # day_num -> (post_id, title)
 
-for post_id, title in all_posts:
-    if title:
-        match = day_pattern.search(title)
-        if match:
-            day_num = int(match.group(1))
-            if 1 <= day_num <= 365:
-                # 重複がある場合、最初に見つかったものを使う（または投稿済みのものを優先）
-                if day_num not in day_posts_dict:
-                    day_posts_dict[day_num] = (post_id, title)
-                elif post_id in posted_ids:
-                    # 投稿済みのものを優先
-                    day_posts_dict[day_num] = (post_id, title)
+for post_id, title, day_num in all_posts:
+    # 重複がある場合、最初に見つかったものを使う（または投稿済みのものを優先）
+    if day_num not in day_posts_dict:
+        day_posts_dict[day_num] = (post_id, title)
+    elif post_id in posted_ids:
+        # 投稿済みのものを優先
+        day_posts_dict[day_num] = (post_id, title)
 
 print("="*70)
 print("Day001～Day365の正確な投稿数確認（重複除外）")
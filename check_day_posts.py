@@ -2,29 +2,32 @@
 import sqlite3
 import sys
 import io
-import re
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.insert(0, '.')
+from database import PostDatabase
+
+# 分類カラム（day_number など）のマイグレーションを適用しておく
+PostDatabase()
+
 conn = sqlite3.connect('posts.db')
 cur = conn.cursor()
 
 blog_url = "http://notesofacim.blog.fc2.com/"
-cur.execute('SELECT id, title FROM posts WHERE blog_url = ?', (blog_url,))
+cur.execute('''
+    SELECT id, title, day_number FROM posts
+    WHERE blog_url = ? AND is_index = 0 AND day_number IS NOT NULL
+''', (blog_url,))
 all_posts = cur.fetchall()
 
-day_pattern = re.compile(r'Day(\d{3})')
 day_posts = []
 day_numbers = []
 
-for post_id, title in all_posts:
-    if title:
-        match = day_pattern.search(title)
-        if match:
-            day_num = int(match.group(1))
-            if 1 <= day_num <= 365:
-                day_posts.append((post_id, title, day_num))
-                day_numbers.append(day_num)
+for post_id, title, day_num in all_posts:
+    if 1 <= day_num <= 365:
+        day_posts.append((post_id, title, day_num))
+        day_numbers.append(day_num)
 
 print("="*70)
 print("Day001～Day365の投稿数確認")
@@ -39,13 +42,9 @@ if len(day_numbers) != len(set(day_numbers)):
 
 # Day366以上の投稿があるか確認
 over_365 = []
-for post_id, title in all_posts:
-    if title:
-        match = day_pattern.search(title)
-        if match:
-            day_num = int(match.group(1))
-            if day_num > 365:
-                over_365.append((post_id, title, day_num))
+for post_id, title, day_num in all_posts:
+    if day_num > 365:
+        over_365.append((post_id, title, day_num))
 
 if over_365:
     print(f"\nDay366以上の投稿: {len(over_365)}件")
@@ -0,0 +1,110 @@
+"""
+HTTPキャッシュとオフラインモードの確認スクリプト
+ローカルに立てた代替サーバー（ブログの代わり）に対して、
+1. 初回取得（200）でキャッシュに保存されること
+2. 再取得が条件付きGET（304）になり、本文をキャッシュから返すこと
+3. クエリパラメータ（params=）の違うリクエストが別のキャッシュになること
+4. オフラインモードではサーバーに接続せず、同じ内容を再生すること（キャッシュにないURLはエラー）
+5. BlogFetcher がオフラインモードで同じ投稿を返すこと
+を確認する。posts.db・http_cache.db には触れない（一時ディレクトリを使う）。
+"""
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+
+import requests
+
+from blog_fetcher import BlogFetcher
+from http_cache import CachingSession, HttpCache
+
+ENTRY_HTML = '''<html><head><meta charset="utf-8"><title>Day001 テスト記事</title></head>
+<body><div class="entry"><h2 class="entry_header">Day001 テスト記事</h2>
+<div class="entry_body">オフラインでも同じ本文を返します。</div></div></body></html>'''
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """ETag 付きでページを返す代替サーバー（リクエストしたパスを記録する）"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        if self.path.startswith('/blog-entry-1.html'):
+            body = ENTRY_HTML
+        elif self.path.startswith('/list'):
+            body = f'<html><body>list {self.path}</body></html>'
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            StandInHandler.requests_seen.append((304, self.path))
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        StandInHandler.requests_seen.append((200, self.path))
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(label: str, ok: bool, failures: list):
+    print(f"  {'✓' if ok else '✗'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def main() -> int:
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, 'http_cache.db'))
+        online = CachingSession(cache, offline=False)
+
+        print("オンライン")
+        first = online.get(f'{base}/list', params={'page': 1})
+        second = online.get(f'{base}/list', params={'page': 2})
+        check("params の違うリクエストは別々に取得される", first.text != second.text, failures)
+        check("キャッシュのキーはクエリパラメータを含む", first.cache_key.endswith('/list?page=1'), failures)
+        again = online.get(f'{base}/list', params={'page': 1})
+        check("再取得は条件付きGET（304）でキャッシュから返す",
+              again.from_cache and again.text == first.text and StandInHandler.requests_seen[-1][0] == 304, failures)
+        post_online = BlogFetcher(f'{base}/blog-entry-1.html', session=online).fetch_latest_post()
+        check("BlogFetcher で投稿を取得できる", bool(post_online and post_online.get('content')), failures)
+
+        print("オフライン")
+        seen_before = len(StandInHandler.requests_seen)
+        offline = CachingSession(cache, offline=True)
+        replay1 = offline.get(f'{base}/list', params={'page': 1})
+        replay2 = offline.get(f'{base}/list', params={'page': 2})
+        check("params ごとに保存した内容を再生する", (replay1.text, replay2.text) == (first.text, second.text), failures)
+        try:
+            offline.get(f'{base}/list', params={'page': 3})
+            check("キャッシュにないURLはエラーになる", False, failures)
+        except requests.ConnectionError:
+            check("キャッシュにないURLはエラーになる", True, failures)
+        post_offline = BlogFetcher(f'{base}/blog-entry-1.html', session=offline).fetch_latest_post()
+        check("BlogFetcher がオフラインで同じ投稿を返す", post_offline == post_online, failures)
+        check("オフラインではサーバーに接続しない", len(StandInHandler.requests_seen) == seen_before, failures)
+
+    server.shutdown()
+    print(f"\n{'すべて成功' if not failures else f'失敗: {len(failures)}件'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
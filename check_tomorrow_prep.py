@@ -2,7 +2,6 @@
 import sqlite3
 import os
 import sys
-import re
 sys.path.insert(0, '.')
 from database import PostDatabase
 
@@ -14,17 +13,15 @@ twitter_handle_365 = "365botGary"
 cycle_365 = db.get_current_cycle_number(blog_url_365, twitter_handle_365)
 unposted_all_365 = db.get_unposted_posts_in_cycle(blog_url_365, twitter_handle_365, cycle_365)
 # Day001～Day365の投稿のみをフィルタリング（重複を除外）
-day_pattern = re.compile(r'Day(\d{3})')
 unposted_365 = []
 seen_days = set()
 for post in unposted_all_365:
-    title = post.get('title', '')
-    match = day_pattern.search(title)
-    if match:
-        day_num = int(match.group(1))
-        if 1 <= day_num <= 365 and day_num not in seen_days:
-            unposted_365.append(post)
-            seen_days.add(day_num)
+    day_num = post.get('day_number')
+    if post.get('is_index'):
+        continue
+    if day_num is not None and 1 <= day_num <= 365 and day_num not in seen_days:
+        unposted_365.append(post)
+        seen_days.add(day_num)
 
 # pursahsgospelの状況
 blog_url_pursahs = "https://www.ameba.jp/profile/general/pursahs-gospel/"
@@ -34,8 +31,7 @@ unposted_all_pursahs = db.get_unposted_posts_in_cycle(blog_url_pursahs, twitter_
 # 「語録」を含む投稿のみをフィルタリング（『原書』と『索引』は除外）
 unposted_pursahs = []
 for post in unposted_all_pursahs:
-    title = post.get('title', '') or ''
-    if '語録' in title and '原書' not in title and '索引' not in title:
+    if post.get('is_goroku') and not post.get('is_index'):
         unposted_pursahs.append(post)
 
 print("="*60)
@@ -43,6 +43,57 @@ class Config:
     # 投稿設定
     POST_INTERVAL_HOURS: int = int(os.getenv("POST_INTERVAL_HOURS", "24"))
     MAX_POST_LENGTH: int = int(os.getenv("MAX_POST_LENGTH", "280"))
+    # X の重み付き文字数の上限（日本語などは2文字、URLは23文字として数える。tweet_length.py）
+    # ツイートの文字数はこの1つの上限で数える（未設定の場合は MAX_POST_LENGTH）
+    TWEET_MAX_WEIGHTED_LENGTH: int = int(os.getenv("TWEET_MAX_WEIGHTED_LENGTH", os.getenv("MAX_POST_LENGTH", "280")))
+    # アカウント間の投稿間隔（秒）。投稿に成功した後、次のアカウントの投稿はこの時間をあける（連続投稿による一時ブロック防止）
+    POST_SPACING_SECONDS: int = int(os.getenv("POST_SPACING_SECONDS", "60"))
+    
+    # HTTPキャッシュ（ETag / Last-Modified による条件付きGET）
+    HTTP_CACHE_PATH: str = os.getenv("HTTP_CACHE_PATH", "http_cache.db")
+    HTTP_CACHE_MAX_MB: int = int(os.getenv("HTTP_CACHE_MAX_MB", "50"))
+    # 1の場合、ネットワークに接続せずキャッシュのみから返す（テスト・再生用）
+    HTTP_CACHE_OFFLINE: bool = os.getenv("HTTP_CACHE_OFFLINE", "0") == "1"
+    
+    # フィードURLの記憶（前回成功したフィードは有効期間内なら検出を省略し、無効なURLは期間内は試さない）
+    FEED_ENDPOINT_TTL_HOURS: int = int(os.getenv("FEED_ENDPOINT_TTL_HOURS", "24"))
+    FEED_DEAD_TTL_HOURS: int = int(os.getenv("FEED_DEAD_TTL_HOURS", "168"))
+    
+    # 差分同期（blog_sync.py）で既知の投稿に達するまでにたどる一覧ページの上限
+    SYNC_MAX_PAGES: int = int(os.getenv("SYNC_MAX_PAGES", "10"))
+    
+    # ページコンテンツの先読み（prefetch_posts.py）
+    PREFETCH_COUNT: int = int(os.getenv("PREFETCH_COUNT", "3"))
+    # これより古い先読みコンテンツは投稿時に使わず、ページを取得し直す
+    POST_CONTENT_MAX_AGE_HOURS: int = int(os.getenv("POST_CONTENT_MAX_AGE_HOURS", "168"))
+    # 取得済みコンテンツの再確認（revalidate_posts.py）: 1回に確認する件数と、優先度ごとの再確認の間隔
+    REVALIDATE_BATCH: int = int(os.getenv("REVALIDATE_BATCH", "30"))
+    # 次に投稿する候補
+    REVALIDATE_UPCOMING_HOURS: float = float(os.getenv("REVALIDATE_UPCOMING_HOURS", "6"))
+    # 最近（REVALIDATE_RECENT_WINDOW_HOURS 以内に）内容が変わった投稿
+    REVALIDATE_RECENT_HOURS: float = float(os.getenv("REVALIDATE_RECENT_HOURS", "24"))
+    REVALIDATE_RECENT_WINDOW_HOURS: float = float(os.getenv("REVALIDATE_RECENT_WINDOW_HOURS", "168"))
+    # その他の投稿は POST_CONTENT_MAX_AGE_HOURS ごと
+    
+    # 共通HTTPセッション（http_session.py）
+    HTTP_USER_AGENT: str = os.getenv(
+        "HTTP_USER_AGENT",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    )
+    # 接続プール（ホスト数と、ホストごとに保持する接続数）
+    HTTP_POOL_CONNECTIONS: int = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+    
+    # 並列ページ取得（fetch_engine.py）
+    FETCH_MAX_WORKERS: int = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+    # ホストごとの同時接続数と1秒あたりのリクエスト数（既定は1ホストにつき1秒1リクエスト）
+    FETCH_PER_HOST: int = int(os.getenv("FETCH_PER_HOST", "1"))
+    FETCH_RATE_PER_HOST: float = float(os.getenv("FETCH_RATE_PER_HOST", "1"))
+    # 再試行時に Retry-After に従って待機する最大秒数
+    FETCH_MAX_RETRY_AFTER: float = float(os.getenv("FETCH_MAX_RETRY_AFTER", "60"))
+    
+    # HTMLパーサー（auto: lxml があれば lxml、なければ html.parser）
+    HTML_PARSER: str = os.getenv("HTML_PARSER", "auto")
     
     @classmethod
     def get_twitter_credentials_365bot(cls) -> Dict[str, str]:
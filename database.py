@@ -3,14 +3,226 @@
 SQLiteを使用して投稿データと投稿履歴を管理
 """
 import sqlite3
+import hashlib
 import logging
+import os
+import re
+import queue
+import threading
+import atexit
+from contextlib import contextmanager
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+from post_classifier import classify_title
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 接続プール設定
+# busy_timeout: 他プロセス（スケジューラ/リトライ）が書き込み中の場合に待機する最大時間（ミリ秒）
+BUSY_TIMEOUT_MS = 10000
+# プールで保持する最大接続数（スレッドごとに1接続を貸し出す）
+POOL_SIZE = 4
+# 接続ごとにキャッシュするプリペアドステートメント数
+CACHED_STATEMENTS = 128
+# IN句に渡すプレースホルダの最大数（SQLiteの変数上限より小さい値）
+SQL_VARIABLE_CHUNK = 500
+
+
+# 起動時に実行計画を確認する頻出クエリ（名前 -> (SQL, パラメータ)）
+HOT_QUERIES = {
+    'posts_by_blog': (
+        'SELECT * FROM posts WHERE blog_url = ? ORDER BY published_date DESC, id DESC',
+        ('',),
+    ),
+    'posts_count_by_blog': (
+        'SELECT COUNT(*) FROM posts WHERE blog_url = ?',
+        ('',),
+    ),
+    'unposted_in_cycle': (
+        '''SELECT p.id FROM posts p
+           WHERE p.blog_url = ? AND p.is_index = 0
+             AND NOT EXISTS (
+                 SELECT 1 FROM post_history h
+                 WHERE h.blog_url = ? AND h.twitter_handle = ? AND h.cycle_number = ? AND h.post_id = p.id
+             )''',
+        ('', '', '', 0),
+    ),
+    'posted_ids_in_cycle': (
+        '''SELECT DISTINCT post_id FROM post_history
+           WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?''',
+        ('', '', 0),
+    ),
+    'current_cycle': (
+        'SELECT MAX(cycle_number) FROM cycles WHERE blog_url = ? AND twitter_handle = ?',
+        ('', ''),
+    ),
+    'cycle_progress': (
+        '''SELECT eligible_total, posted_count, completed_at FROM cycles
+           WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?''',
+        ('', '', 0),
+    ),
+}
+
+# タイトルから求めて posts に保存する分類カラム（post_classifier.classify_title のキー）
+CLASSIFICATION_COLUMNS = ('is_index', 'day_number', 'goroku_number', 'is_goroku', 'is_original_text')
+
+class _ConnectionPool:
+    """
+    SQLite接続プール（スレッドセーフ）
+    
+    接続は長寿命で再利用し、WALジャーナルモードとbusy_timeoutを設定する。
+    同一スレッド内のネストしたセッションは同じ接続を共有する。
+    """
+    
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        # 貸し出し中の接続（close() 後に返却された接続はプールに戻さず閉じる）
+        self._borrowed = set()
+        self._lock = threading.Lock()
+        self.local = threading.local()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """新しい接続を作成してPRAGMAを設定"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """接続を借りる（空きがなければ作成、上限なら返却を待つ）"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        
+        if conn is None:
+            with self._lock:
+                if len(self._connections) < self.size:
+                    conn = self._connect()
+                    self._connections.append(conn)
+                    self._borrowed.add(conn)
+                    return conn
+            try:
+                conn = self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+            except queue.Empty:
+                raise sqlite3.OperationalError(f"接続プールが枯渇しました: {self.db_path}")
+        
+        with self._lock:
+            self._borrowed.add(conn)
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """接続をプールに返却（close() 後に返却された接続は閉じて破棄する）"""
+        with self._lock:
+            self._borrowed.discard(conn)
+            if conn not in self._connections:
+                discard = True
+            else:
+                discard = False
+                self._idle.put(conn)
+        if discard:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"接続のクローズに失敗: {e}")
+    
+    def close(self):
+        """
+        全接続を閉じる（WALはチェックポイントされ posts.db に書き戻される）
+        
+        貸し出し中の接続は実行中のトランザクションを壊さないよう、返却時に閉じる。
+        """
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            for conn in self._connections:
+                if conn in self._borrowed:
+                    continue
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"接続のクローズに失敗: {e}")
+            self._connections = []
+
+
+# db_pathごとの接続プール（プロセス内で共有）
+_pools: Dict[str, _ConnectionPool] = {}
+# スキーマ初期化済みのdb_path
+_initialized_paths = set()
+_pools_lock = threading.Lock()
+
+
+def _get_pool(db_path: str) -> _ConnectionPool:
+    """db_pathに対応する接続プールを取得（なければ作成）"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """全ての接続プールを閉じる（プロセス終了時に自動実行）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
+
+
+def _normalize_page_content(page_content: Dict[str, str]) -> Dict[str, str]:
+    """ページコンテンツの前後の空白と改行コードを揃える"""
+    def clean(value) -> str:
+        return (value or '').replace('\r\n', '\n').replace('\r', '\n').strip()
+    return {
+        'title': clean(page_content.get('title')),
+        'content': clean(page_content.get('content')),
+        'link': (page_content.get('link') or '').strip(),
+        'published_date': clean(page_content.get('published_date')),
+        'author': clean(page_content.get('author')),
+    }
+
+
+def _content_hash(content: Dict[str, str]) -> str:
+    """ページコンテンツのハッシュ（空白の違いは無視する）"""
+    def normalize(value: str) -> str:
+        return re.sub(r'\s+', ' ', value).strip()
+    return hashlib.sha256(
+        f"{normalize(content['title'])}\n{normalize(content['content'])}".encode('utf-8')
+    ).hexdigest()
+
+
+def _summarize_error(error_info: Optional[dict]) -> Optional[str]:
+    """投稿失敗時のエラー情報から保存する項目を取り出してJSON文字列にする"""
+    if not error_info:
+        return None
+    return json.dumps({
+        'status': error_info.get('status'),
+        'reason': error_info.get('reason'),
+        'transaction_id': error_info.get('transaction_id'),
+        'headers': error_info.get('headers'),
+        'error_message': error_info.get('error_message'),
+    }, ensure_ascii=False, default=str)
+
 
 class PostDatabase:
     """投稿データベース管理クラス"""
@@ -21,58 +233,388 @@ class PostDatabase:
             db_path: データベースファイルのパス
         """
         self.db_path = db_path
-        self._init_database()
+        self._pool = _get_pool(db_path)
+        with _pools_lock:
+            needs_init = os.path.abspath(db_path) not in _initialized_paths
+        if needs_init:
+            self._init_database()
+            self.check_query_plans()
+            with _pools_lock:
+                _initialized_paths.add(os.path.abspath(db_path))
+    
+    @contextmanager
+    def session(self, write: bool = False):
+        """
+        プールから接続を借りてセッションを開始する
+        
+        最も外側のセッション終了時にコミット（例外時はロールバック）する。
+        同一スレッド内でネストした場合は、外側のセッションと同じ接続・トランザクションを共有する。
+        
+        Args:
+            write: Trueの場合、BEGIN IMMEDIATEで書き込みロックを先に取得する
+                   （読み取り→書き込みの昇格による database is locked を防止）
+        
+        Yields:
+            sqlite3.Connection
+        """
+        local = self._pool.local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+        
+        conn = self._pool.acquire()
+        local.conn = conn
+        local.depth = 1
+        try:
+            if write:
+                conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            local.conn = None
+            local.depth = 0
+            self._pool.release(conn)
+    
+    def close(self):
+        """このデータベースの接続プールを閉じる"""
+        self._pool.close()
     
     def _init_database(self):
         """データベーステーブルを初期化"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.session() as conn:
+            cursor = conn.cursor()
+            
+            # 投稿テーブル
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    blog_url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    content TEXT,
+                    link TEXT NOT NULL UNIQUE,
+                    published_date TEXT,
+                    author TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            
+            # 投稿履歴テーブル（どの投稿をいつ投稿したか）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS post_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    post_id INTEGER NOT NULL,
+                    blog_url TEXT NOT NULL,
+                    twitter_handle TEXT NOT NULL,
+                    tweet_id TEXT,
+                    posted_at TEXT NOT NULL,
+                    cycle_number INTEGER NOT NULL,
+                    FOREIGN KEY (post_id) REFERENCES posts (id)
+                )
+            ''')
+            
+            # サイクル管理テーブル（1巡の管理）
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS cycles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    blog_url TEXT NOT NULL,
+                    twitter_handle TEXT NOT NULL,
+                    cycle_number INTEGER NOT NULL,
+                    started_at TEXT NOT NULL,
+                    completed_at TEXT,
+                    UNIQUE(blog_url, twitter_handle, cycle_number)
+                )
+            ''')
+            
+            self._apply_migrations(conn)
         
-        # 投稿テーブル
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                blog_url TEXT NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT,
-                link TEXT NOT NULL UNIQUE,
-                published_date TEXT,
-                author TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
+        logger.info(f"データベースを初期化しました: {self.db_path}")
+    
+    def _migrations(self):
+        """スキーママイグレーションの一覧（バージョン番号, 適用関数）"""
+        return [
+            (1, self._migrate_add_access_path_indexes),
+            (2, self._migrate_add_title_classification),
+            (3, self._migrate_add_number_classification),
+            (4, self._migrate_add_cycle_counters),
+            (5, self._migrate_add_post_history_archive),
+            (6, self._migrate_add_failure_tables),
+            (7, self._migrate_add_post_content),
+            (8, self._migrate_add_sync_state),
+            (9, self._migrate_add_content_revalidation),
+            (10, self._migrate_add_rendered_tweets),
+            (11, self._migrate_add_tweet_fallback),
+            (12, self._migrate_restore_day_pattern),
+            (13, self._migrate_add_tweet_rules_hash),
+        ]
+    
+    def _apply_migrations(self, conn: sqlite3.Connection):
+        """
+        未適用のスキーママイグレーションを順に適用
+        
+        適用済みバージョンは PRAGMA user_version で管理する。
+        """
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, migrate in self._migrations():
+            if version >= target:
+                continue
+            migrate(conn)
+            conn.execute(f'PRAGMA user_version = {int(target)}')
+            version = target
+            logger.info(f"スキーマを移行しました: v{target} ({migrate.__name__})")
+    
+    def _migrate_add_access_path_indexes(self, conn: sqlite3.Connection):
+        """v1: 頻出クエリのアクセスパス用インデックスを追加"""
+        # blog_urlで絞り込み、published_date, id順に並べる投稿一覧
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_posts_blog_published
+            ON posts (blog_url, published_date, id)
+        ''')
+        # サイクル内の投稿済みIDの検索（post_idまで含めたカバリングインデックス）
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_post_history_cycle
+            ON post_history (blog_url, twitter_handle, cycle_number, post_id)
         ''')
+    
+    def _migrate_add_title_classification(self, conn: sqlite3.Connection):
+        """v2: タイトル分類カラム（is_index, day_number, is_goroku）を追加して既存行を埋める"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(posts)')}
+        if 'is_index' not in columns:
+            conn.execute('ALTER TABLE posts ADD COLUMN is_index INTEGER NOT NULL DEFAULT 0')
+        if 'day_number' not in columns:
+            conn.execute('ALTER TABLE posts ADD COLUMN day_number INTEGER')
+        if 'is_goroku' not in columns:
+            conn.execute('ALTER TABLE posts ADD COLUMN is_goroku INTEGER NOT NULL DEFAULT 0')
         
-        # 投稿履歴テーブル（どの投稿をいつ投稿したか）
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS post_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rows = conn.execute('SELECT id, title FROM posts').fetchall()
+        updates = []
+        for row in rows:
+            c = classify_title(row['title'])
+            updates.append((c['is_index'], c['day_number'], c['is_goroku'], row['id']))
+        conn.executemany(
+            'UPDATE posts SET is_index = ?, day_number = ?, is_goroku = ? WHERE id = ?',
+            updates
+        )
+    
+    def _migrate_add_number_classification(self, conn: sqlite3.Connection):
+        """v3: 語録番号・原書フラグを追加し、共通の分類器で全行を再分類"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(posts)')}
+        if 'goroku_number' not in columns:
+            conn.execute('ALTER TABLE posts ADD COLUMN goroku_number INTEGER')
+        if 'is_original_text' not in columns:
+            conn.execute('ALTER TABLE posts ADD COLUMN is_original_text INTEGER NOT NULL DEFAULT 0')
+        # Day番号・語録番号での絞り込み用
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_blog_day ON posts (blog_url, day_number)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_blog_goroku ON posts (blog_url, goroku_number)')
+        self._reclassify_posts(conn)
+    
+    def _migrate_add_cycle_counters(self, conn: sqlite3.Connection):
+        """v4: サイクルの進捗カウンタ（eligible_total, posted_count）を追加して既存サイクルを集計"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(cycles)')}
+        if 'eligible_total' not in columns:
+            conn.execute('ALTER TABLE cycles ADD COLUMN eligible_total INTEGER NOT NULL DEFAULT 0')
+        if 'posted_count' not in columns:
+            conn.execute('ALTER TABLE cycles ADD COLUMN posted_count INTEGER NOT NULL DEFAULT 0')
+        self._rebuild_cycle_counters(conn)
+    
+    def _migrate_add_post_history_archive(self, conn: sqlite3.Connection):
+        """v5: 古いサイクルの投稿履歴を移すアーカイブテーブルと、両方を参照するビューを追加"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS post_history_archive (
+                id INTEGER PRIMARY KEY,
                 post_id INTEGER NOT NULL,
                 blog_url TEXT NOT NULL,
                 twitter_handle TEXT NOT NULL,
                 tweet_id TEXT,
                 posted_at TEXT NOT NULL,
                 cycle_number INTEGER NOT NULL,
+                archived_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_post_history_archive_cycle
+            ON post_history_archive (blog_url, twitter_handle, cycle_number)
+        ''')
+        # レポート用: 現行とアーカイブ済みの投稿履歴をまとめて参照する
+        conn.execute('''
+            CREATE VIEW IF NOT EXISTS post_history_all AS
+            SELECT id, post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number FROM post_history
+            UNION ALL
+            SELECT id, post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number FROM post_history_archive
+        ''')
+    
+    def _migrate_add_failure_tables(self, conn: sqlite3.Connection):
+        """v6: 失敗投稿キューとブロックリストのテーブルを追加（旧 failed_posts.json / blocked_posts.json）"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS failed_posts (
+                post_id INTEGER NOT NULL,
+                account_key TEXT NOT NULL,
+                title TEXT,
+                link TEXT,
+                blog_url TEXT,
+                twitter_handle TEXT,
+                retry_count INTEGER NOT NULL DEFAULT 0,
+                first_failed TEXT NOT NULL,
+                last_failed TEXT NOT NULL,
+                tweet_preview TEXT,
+                last_error TEXT,
+                exhausted INTEGER NOT NULL DEFAULT 0,
+                exhausted_at TEXT,
+                PRIMARY KEY (post_id, account_key)
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS blocked_posts (
+                post_id INTEGER NOT NULL,
+                account_key TEXT NOT NULL,
+                title TEXT,
+                link TEXT,
+                blocked_at TEXT NOT NULL,
+                PRIMARY KEY (post_id, account_key)
+            )
+        ''')
+    
+    def _migrate_add_post_content(self, conn: sqlite3.Connection):
+        """v7: 先読みしたページコンテンツのキャッシュテーブルを追加"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS post_content (
+                post_id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                link TEXT NOT NULL,
+                published_date TEXT,
+                author TEXT,
+                content_hash TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
                 FOREIGN KEY (post_id) REFERENCES posts (id)
             )
         ''')
-        
-        # サイクル管理テーブル（1巡の管理）
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cycles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                blog_url TEXT NOT NULL,
-                twitter_handle TEXT NOT NULL,
-                cycle_number INTEGER NOT NULL,
-                started_at TEXT NOT NULL,
-                completed_at TEXT,
-                UNIQUE(blog_url, twitter_handle, cycle_number)
+    
+    def _migrate_add_sync_state(self, conn: sqlite3.Connection):
+        """v8: ブログごとの差分同期の状態（前回どこまで取得したか）のテーブルを追加"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                blog_url TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                last_entry_id TEXT,
+                feed_updated TEXT,
+                archive_hash TEXT,
+                post_count INTEGER NOT NULL DEFAULT 0,
+                synced_at TEXT NOT NULL
             )
         ''')
+    
+    def _migrate_add_content_revalidation(self, conn: sqlite3.Connection):
+        """v9: ページコンテンツの再確認日時（checked_at）と最終変更日時（changed_at）を追加"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(post_content)')}
+        for column in ('checked_at', 'changed_at'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE post_content ADD COLUMN {column} TEXT')
+        conn.execute('''
+            UPDATE post_content
+            SET checked_at = COALESCE(checked_at, fetched_at), changed_at = COALESCE(changed_at, fetched_at)
+        ''')
+        # 再確認の順序（確認日時の古い順）
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_post_content_checked ON post_content (checked_at)')
+    
+    def _migrate_add_rendered_tweets(self, conn: sqlite3.Connection):
+        """v10: アカウントごとに整形したツイートと文字数の検証結果のテーブルを追加"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rendered_tweets (
+                post_id INTEGER NOT NULL,
+                account_key TEXT NOT NULL,
+                tweet_text TEXT NOT NULL,
+                weighted_length INTEGER NOT NULL,
+                is_valid INTEGER NOT NULL,
+                source_hash TEXT NOT NULL,
+                rendered_at TEXT NOT NULL,
+                PRIMARY KEY (post_id, account_key),
+                FOREIGN KEY (post_id) REFERENCES posts (id)
+            )
+        ''')
+    
+    def _migrate_add_tweet_fallback(self, conn: sqlite3.Connection):
+        """v11: 整形済みツイートに403エラー時の再試行用のツイート（文頭の1語を削ったもの）を追加"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(rendered_tweets)')}
+        if 'fallback_text' not in columns:
+            conn.execute('ALTER TABLE rendered_tweets ADD COLUMN fallback_text TEXT')
+    
+    def _migrate_restore_day_pattern(self, conn: sqlite3.Connection):
+        """v12: Day番号を従来の判定（「Day」+3桁）で再分類し、サイクルの対象件数を再計算"""
+        if self._reclassify_posts(conn):
+            self._refresh_eligible_totals(conn)
+    
+    def _migrate_add_tweet_rules_hash(self, conn: sqlite3.Connection):
+        """v13: 整形済みツイートに整形ルールのハッシュを追加（既存の行は次回の整形で整形し直す）"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(rendered_tweets)')}
+        if 'rules_hash' not in columns:
+            conn.execute('ALTER TABLE rendered_tweets ADD COLUMN rules_hash TEXT')
+    
+    def _reclassify_posts(self, conn: sqlite3.Connection) -> int:
+        """全投稿の分類カラムをタイトルから再計算（値が変わった行のみ更新）"""
+        rows = conn.execute(
+            f"SELECT id, title, {', '.join(CLASSIFICATION_COLUMNS)} FROM posts"
+        ).fetchall()
+        updates = []
+        for row in rows:
+            c = classify_title(row['title'])
+            values = tuple(c[column] for column in CLASSIFICATION_COLUMNS)
+            if values != tuple(row[column] for column in CLASSIFICATION_COLUMNS):
+                updates.append((*values, row['id']))
+        assignments = ', '.join(f'{column} = ?' for column in CLASSIFICATION_COLUMNS)
+        conn.executemany(f'UPDATE posts SET {assignments} WHERE id = ?', updates)
+        return len(updates)
+    
+    def reclassify_posts(self) -> int:
+        """
+        全投稿の分類カラム（Day番号・語録番号・索引・原書）を再計算
         
-        conn.commit()
-        conn.close()
-        logger.info(f"データベースを初期化しました: {self.db_path}")
+        分類ルールを変更した場合や、外部スクリプトでタイトルを直接更新した場合に使用する。
+        
+        Returns:
+            更新した投稿数
+        """
+        with self.session(write=True) as conn:
+            updated = self._reclassify_posts(conn)
+            if updated:
+                self._refresh_eligible_totals(conn)
+        logger.info(f"投稿の分類を再計算しました: {updated}件更新")
+        return updated
+    
+    def check_query_plans(self) -> List[str]:
+        """
+        頻出クエリの実行計画（EXPLAIN QUERY PLAN）を確認し、
+        インデックスを使わない全件スキャンになっているものを警告する
+        
+        Returns:
+            全件スキャンになっているクエリ名のリスト
+        """
+        full_scans = []
+        with self.session() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for name, (sql, params) in HOT_QUERIES.items():
+                try:
+                    plan = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning(f"実行計画の取得に失敗: {name}: {e}")
+                    continue
+                for row in plan:
+                    detail = row[-1]
+                    match = re.match(r'SCAN (\w+)', detail)
+                    # CTEやサブクエリの走査は対象外（実テーブルの全件スキャンのみ警告）
+                    if match and match.group(1) in tables and 'INDEX' not in detail:
+                        full_scans.append(name)
+                        logger.warning(f"クエリが全件スキャンになっています: {name} ({detail})")
+                        break
+        return full_scans
     
     def add_post(self, blog_url: str, post_data: Dict[str, str]) -> Optional[int]:
         """
@@ -85,43 +627,168 @@ class PostDatabase:
         Returns:
             投稿ID、または既に存在する場合はNone
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # 既存チェック
-            cursor.execute('SELECT id FROM posts WHERE link = ?', (post_data.get('link'),))
-            existing = cursor.fetchone()
-            if existing:
-                logger.debug(f"既存の投稿です（スキップ）: {post_data.get('link')}")
-                return existing[0]
-            
-            # 新規追加
-            now = datetime.now().isoformat()
-            cursor.execute('''
-                INSERT INTO posts (blog_url, title, content, link, published_date, author, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                blog_url,
-                post_data.get('title', ''),
-                post_data.get('content', ''),
-                post_data.get('link', ''),
-                post_data.get('published_date', ''),
-                post_data.get('author', ''),
-                now,
-                now
-            ))
-            
-            post_id = cursor.lastrowid
-            conn.commit()
+            with self.session(write=True) as conn:
+                cursor = conn.cursor()
+                
+                # 既存チェック
+                cursor.execute('SELECT id FROM posts WHERE link = ?', (post_data.get('link'),))
+                existing = cursor.fetchone()
+                if existing:
+                    logger.debug(f"既存の投稿です（スキップ）: {post_data.get('link')}")
+                    return existing[0]
+                
+                # 新規追加
+                now = datetime.now().isoformat()
+                c = classify_title(post_data.get('title', ''))
+                cursor.execute(f'''
+                    INSERT INTO posts (blog_url, title, content, link, published_date, author, created_at, updated_at,
+                                       {', '.join(CLASSIFICATION_COLUMNS)})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?{', ?' * len(CLASSIFICATION_COLUMNS)})
+                ''', (
+                    blog_url,
+                    post_data.get('title', ''),
+                    post_data.get('content', ''),
+                    post_data.get('link', ''),
+                    post_data.get('published_date', ''),
+                    post_data.get('author', ''),
+                    now,
+                    now,
+                    *(c[column] for column in CLASSIFICATION_COLUMNS),
+                ))
+                
+                post_id = cursor.lastrowid
+                self._refresh_eligible_totals(conn, blog_url)
             logger.info(f"投稿を追加しました: ID={post_id}, {post_data.get('title', '')[:50]}")
             return post_id
             
         except sqlite3.IntegrityError:
             logger.warning(f"投稿の追加に失敗（重複）: {post_data.get('link')}")
             return None
-        finally:
-            conn.close()
+    
+    def add_posts_bulk(self, blog_url: str, posts: List[Dict[str, str]]) -> Dict[str, int]:
+        """
+        投稿をまとめて追加・更新（1トランザクションでUPSERT）
+        
+        既存の投稿は、新しい値が空でなく内容が異なる項目のみ更新する。
+        
+        Args:
+            blog_url: ブログURL
+            posts: 投稿データのリスト（title, content, link, published_date, author）
+        
+        Returns:
+            件数の辞書（inserted, updated, unchanged）
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        now = datetime.now().isoformat()
+        
+        # リンクで重複を除外（同じリンクが複数ある場合は後のものを優先）
+        rows: Dict[str, tuple] = {}
+        for post in posts:
+            link = post.get('link') or ''
+            if not link:
+                continue
+            title = post.get('title', '') or ''
+            c = classify_title(title)
+            rows[link] = (
+                blog_url,
+                title,
+                post.get('content', '') or '',
+                link,
+                post.get('published_date', '') or '',
+                post.get('author', '') or '',
+                now,
+                now,
+                *(c[column] for column in CLASSIFICATION_COLUMNS),
+            )
+        if not rows:
+            return counts
+        
+        with self.session(write=True) as conn:
+            # 既存の投稿を一括取得（SQLiteの変数上限を超えないよう分割）
+            existing: Dict[str, sqlite3.Row] = {}
+            links = list(rows)
+            for i in range(0, len(links), SQL_VARIABLE_CHUNK):
+                chunk = links[i:i + SQL_VARIABLE_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                    f'SELECT link, title, content, published_date, author FROM posts WHERE link IN ({placeholders})',
+                    chunk
+                ):
+                    existing[row['link']] = row
+            
+            upserts = []
+            for link, values in rows.items():
+                current = existing.get(link)
+                if current is None:
+                    counts['inserted'] += 1
+                    upserts.append(values)
+                    continue
+                _, title, content, _, published_date, author = values[:6]
+                changed = any(
+                    new and new != (current[column] or '')
+                    for column, new in (
+                        ('title', title),
+                        ('content', content),
+                        ('published_date', published_date),
+                        ('author', author),
+                    )
+                )
+                if changed:
+                    counts['updated'] += 1
+                    upserts.append(values)
+                else:
+                    counts['unchanged'] += 1
+            
+            if upserts:
+                # タイトルが更新される場合のみ分類カラムも更新する
+                classification_updates = ''.join(
+                    f"{column} = CASE WHEN excluded.title != '' THEN excluded.{column} ELSE posts.{column} END,\n"
+                    for column in CLASSIFICATION_COLUMNS
+                )
+                conn.executemany(f'''
+                    INSERT INTO posts (blog_url, title, content, link, published_date, author, created_at, updated_at,
+                                       {', '.join(CLASSIFICATION_COLUMNS)})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?{', ?' * len(CLASSIFICATION_COLUMNS)})
+                    ON CONFLICT(link) DO UPDATE SET
+                        title = COALESCE(NULLIF(excluded.title, ''), posts.title),
+                        {classification_updates}
+                        content = COALESCE(NULLIF(excluded.content, ''), posts.content),
+                        published_date = COALESCE(NULLIF(excluded.published_date, ''), posts.published_date),
+                        author = COALESCE(NULLIF(excluded.author, ''), posts.author),
+                        updated_at = excluded.updated_at
+                ''', upserts)
+                self._refresh_eligible_totals(conn, blog_url)
+        
+        logger.info(
+            f"投稿を一括登録: {blog_url} "
+            f"(追加 {counts['inserted']} 件 / 更新 {counts['updated']} 件 / 変更なし {counts['unchanged']} 件)"
+        )
+        return counts
+    
+    def update_post_title(self, post_id: int, title: str) -> bool:
+        """
+        投稿のタイトルを更新（ページから取得した最新タイトルで上書き）
+        
+        Args:
+            post_id: 投稿ID
+            title: 新しいタイトル
+        
+        Returns:
+            更新した場合True
+        """
+        c = classify_title(title)
+        assignments = ', '.join(f'{column} = ?' for column in CLASSIFICATION_COLUMNS)
+        with self.session(write=True) as conn:
+            cursor = conn.execute(
+                f'UPDATE posts SET title = ?, updated_at = ?, {assignments} WHERE id = ?',
+                (title, datetime.now().isoformat(), *(c[column] for column in CLASSIFICATION_COLUMNS), post_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            row = conn.execute('SELECT blog_url FROM posts WHERE id = ?', (post_id,)).fetchone()
+            self._refresh_eligible_totals(conn, row['blog_url'])
+            return True
     
     def get_all_posts(self, blog_url: str) -> List[Dict]:
         """
@@ -133,16 +800,13 @@ class PostDatabase:
         Returns:
             投稿データのリスト
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM posts WHERE blog_url = ? ORDER BY published_date DESC, id DESC', (blog_url,))
-        rows = cursor.fetchall()
+        with self.session() as conn:
+            rows = conn.execute(
+                'SELECT * FROM posts WHERE blog_url = ? ORDER BY published_date DESC, id DESC',
+                (blog_url,)
+            ).fetchall()
         
-        posts = [dict(row) for row in rows]
-        conn.close()
-        return posts
+        return [dict(row) for row in rows]
     
     def get_current_cycle_number(self, blog_url: str, twitter_handle: str) -> int:
         """
@@ -155,22 +819,20 @@ class PostDatabase:
         Returns:
             現在のサイクル番号（未開始の場合は0）
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT MAX(cycle_number) FROM cycles 
-            WHERE blog_url = ? AND twitter_handle = ?
-        ''', (blog_url, twitter_handle))
-        
-        result = cursor.fetchone()
-        conn.close()
+        with self.session() as conn:
+            result = conn.execute('''
+                SELECT MAX(cycle_number) FROM cycles 
+                WHERE blog_url = ? AND twitter_handle = ?
+            ''', (blog_url, twitter_handle)).fetchone()
         
         return result[0] if result[0] is not None else 0
     
     def start_new_cycle(self, blog_url: str, twitter_handle: str) -> int:
         """
-        新しいサイクルを開始（前のサイクルの投稿履歴を削除して投稿済みフラグを解除）
+        新しいサイクルを開始
+        
+        投稿履歴はサイクル番号ごとに追記のみで、前のサイクルの履歴は削除しない
+        （未投稿の判定は現在のサイクル番号で絞り込む）。古いサイクルは archive_cycles で移動する。
         
         Args:
             blog_url: ブログURL
@@ -179,33 +841,62 @@ class PostDatabase:
         Returns:
             新しいサイクル番号
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cycle_number = self.get_current_cycle_number(blog_url, twitter_handle) + 1
-        now = datetime.now().isoformat()
+        with self.session(write=True) as conn:
+            cycle_number = self.get_current_cycle_number(blog_url, twitter_handle) + 1
+            now = datetime.now().isoformat()
+            
+            conn.execute('''
+                INSERT INTO cycles (blog_url, twitter_handle, cycle_number, started_at, eligible_total, posted_count)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (blog_url, twitter_handle, cycle_number, now,
+                  self._count_eligible(conn, blog_url, twitter_handle)))
         
-        # 前のサイクルの投稿履歴を削除（投稿済みフラグを解除）
-        prev_cycle = cycle_number - 1
-        if prev_cycle > 0:
-            cursor.execute('''
-                DELETE FROM post_history 
-                WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
-            ''', (blog_url, twitter_handle, prev_cycle))
-            deleted_count = cursor.rowcount
-            if deleted_count > 0:
-                logger.info(f"前のサイクル#{prev_cycle}の投稿履歴を削除（投稿済みフラグ解除）: {deleted_count}件")
-        
-        cursor.execute('''
-            INSERT INTO cycles (blog_url, twitter_handle, cycle_number, started_at)
-            VALUES (?, ?, ?, ?)
-        ''', (blog_url, twitter_handle, cycle_number, now))
-        
-        conn.commit()
-        conn.close()
         logger.info(f"新しいサイクルを開始: {blog_url} -> @{twitter_handle}, サイクル#{cycle_number}")
         return cycle_number
     
+    def archive_cycles(self, keep_cycles: int = 2) -> int:
+        """
+        古いサイクルの投稿履歴を post_history_archive に移動
+        
+        各ブログURL・アカウントについて、最新から keep_cycles 個のサイクルは post_history に残す。
+        アーカイブ済みの履歴も post_history_all ビューから参照できる。
+        
+        Args:
+            keep_cycles: post_history に残すサイクル数（現在のサイクルを含む、1以上）
+        
+        Returns:
+            移動した投稿履歴の件数
+        """
+        keep_cycles = max(1, keep_cycles)
+        now = datetime.now().isoformat()
+        moved = 0
+        with self.session(write=True) as conn:
+            current_cycles = conn.execute('''
+                SELECT blog_url, twitter_handle, MAX(cycle_number) AS current_cycle
+                FROM cycles
+                GROUP BY blog_url, twitter_handle
+            ''').fetchall()
+            for row in current_cycles:
+                params = (row['blog_url'], row['twitter_handle'], row['current_cycle'] - keep_cycles)
+                conn.execute('''
+                    INSERT INTO post_history_archive
+                        (id, post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number, archived_at)
+                    SELECT id, post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number, ?
+                    FROM post_history
+                    WHERE blog_url = ? AND twitter_handle = ? AND cycle_number <= ?
+                ''', (now, *params))
+                cursor = conn.execute('''
+                    DELETE FROM post_history
+                    WHERE blog_url = ? AND twitter_handle = ? AND cycle_number <= ?
+                ''', params)
+                if cursor.rowcount > 0:
+                    moved += cursor.rowcount
+                    logger.info(
+                        f"投稿履歴をアーカイブ: {row['blog_url']} -> @{row['twitter_handle']}, "
+                        f"サイクル#{params[2]}以前 {cursor.rowcount}件"
+                    )
+        return moved
+    
     def get_unposted_posts_in_cycle(
         self, 
         blog_url: str, 
@@ -223,38 +914,97 @@ class PostDatabase:
         Returns:
             未投稿の投稿データのリスト
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with self.session() as conn:
+            # 投稿履歴との反結合（投稿済みIDをPython側に読み込まない）
+            rows = conn.execute('''
+                SELECT p.* FROM posts p
+                WHERE p.blog_url = ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM post_history h
+                      WHERE h.blog_url = ? AND h.twitter_handle = ? AND h.cycle_number = ?
+                        AND h.post_id = p.id
+                  )
+                ORDER BY p.published_date DESC, p.id DESC
+            ''', (blog_url, blog_url, twitter_handle, cycle_number)).fetchall()
         
-        # このサイクルで既に投稿された投稿IDを取得
-        cursor.execute('''
-            SELECT DISTINCT post_id FROM post_history 
-            WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
-        ''', (blog_url, twitter_handle, cycle_number))
-        
-        posted_ids = [row[0] for row in cursor.fetchall()]
-        
-        # 未投稿の投稿を取得
-        if posted_ids:
-            placeholders = ','.join('?' * len(posted_ids))
-            cursor.execute(f'''
-                SELECT * FROM posts 
-                WHERE blog_url = ? AND id NOT IN ({placeholders})
-                ORDER BY published_date DESC, id DESC
-            ''', [blog_url] + posted_ids)
-        else:
-            cursor.execute('''
-                SELECT * FROM posts 
-                WHERE blog_url = ?
-                ORDER BY published_date DESC, id DESC
-            ''', (blog_url,))
+        return [dict(row) for row in rows]
+    
+    def _selection_conditions(self, blog_url: str, twitter_handle: str, filter_day_only: bool = True) -> List[str]:
+        """
+        投稿対象を絞り込むSQL条件（posts を p として参照）
         
-        rows = cursor.fetchall()
-        posts = [dict(row) for row in rows]
-        conn.close()
+        - 「索引」を含む投稿は全アカウントで除外
+        - 365botGary: Day001～Day365の投稿のみ
+        - pursahsgospel: 「語録」を含む投稿のみ（『原書』は除外）
+        """
+        conditions = ['p.is_index = 0']
+        if filter_day_only and 'notesofacim.blog.fc2.com' in blog_url:
+            conditions.append('p.day_number BETWEEN 1 AND 365')
+        if ('pursahs-gospel' in blog_url) or (twitter_handle.lower() == 'pursahsgospel'):
+            conditions.append('p.is_goroku = 1')
+        return conditions
+    
+    def _dedupes_days(self, blog_url: str, filter_day_only: bool = True) -> bool:
+        """同じDay番号の投稿を1件として扱うか（365botGary）"""
+        return filter_day_only and 'notesofacim.blog.fc2.com' in blog_url
+    
+    def _count_eligible(self, conn: sqlite3.Connection, blog_url: str, twitter_handle: str) -> int:
+        """選択と同じ条件で、1サイクルに投稿すべき件数を数える"""
+        conditions = self._selection_conditions(blog_url, twitter_handle)
+        target = 'COUNT(DISTINCT p.day_number)' if self._dedupes_days(blog_url) else 'COUNT(*)'
+        return conn.execute(
+            f"SELECT {target} FROM posts p WHERE p.blog_url = ? AND {' AND '.join(conditions)}",
+            (blog_url,)
+        ).fetchone()[0]
+    
+    def _count_posted(self, conn: sqlite3.Connection, blog_url: str, twitter_handle: str, cycle_number: int) -> int:
+        """サイクル内で投稿済みの対象投稿数を数える（カウンタの再構築用）"""
+        conditions = self._selection_conditions(blog_url, twitter_handle)
+        target = 'COUNT(DISTINCT p.day_number)' if self._dedupes_days(blog_url) else 'COUNT(DISTINCT p.id)'
+        return conn.execute(f'''
+            SELECT {target} FROM post_history h
+            JOIN posts p ON p.id = h.post_id
+            WHERE h.blog_url = ? AND h.twitter_handle = ? AND h.cycle_number = ?
+              AND p.blog_url = ? AND {' AND '.join(conditions)}
+        ''', (blog_url, twitter_handle, cycle_number, blog_url)).fetchone()[0]
+    
+    def _refresh_eligible_totals(self, conn: sqlite3.Connection, blog_url: Optional[str] = None):
+        """未完了サイクルの eligible_total を現在の投稿から再計算（投稿の追加・タイトル更新時）"""
+        sql = 'SELECT id, blog_url, twitter_handle FROM cycles WHERE completed_at IS NULL'
+        params: tuple = ()
+        if blog_url is not None:
+            sql += ' AND blog_url = ?'
+            params = (blog_url,)
+        for row in conn.execute(sql, params).fetchall():
+            conn.execute(
+                'UPDATE cycles SET eligible_total = ? WHERE id = ?',
+                (self._count_eligible(conn, row['blog_url'], row['twitter_handle']), row['id'])
+            )
+    
+    def _rebuild_cycle_counters(self, conn: sqlite3.Connection):
+        """未完了サイクルの eligible_total と posted_count を投稿・投稿履歴から集計し直す"""
+        # 完了済みサイクルは履歴がアーカイブされている場合があるため、完了時点の値を残す
+        for row in conn.execute(
+            'SELECT id, blog_url, twitter_handle, cycle_number FROM cycles WHERE completed_at IS NULL'
+        ).fetchall():
+            conn.execute(
+                'UPDATE cycles SET eligible_total = ?, posted_count = ? WHERE id = ?',
+                (
+                    self._count_eligible(conn, row['blog_url'], row['twitter_handle']),
+                    self._count_posted(conn, row['blog_url'], row['twitter_handle'], row['cycle_number']),
+                    row['id'],
+                )
+            )
+    
+    def rebuild_cycle_counters(self):
+        """
+        サイクルの進捗カウンタを集計し直す
         
-        return posts
+        外部スクリプトで post_history を直接削除・変更した場合に使用する。
+        """
+        with self.session(write=True) as conn:
+            self._rebuild_cycle_counters(conn)
+        logger.info("サイクルの進捗カウンタを再集計しました")
     
     def record_post(self, post_id: int, blog_url: str, twitter_handle: str, 
                    cycle_number: int, tweet_id: Optional[str] = None) -> bool:
@@ -271,28 +1021,44 @@ class PostDatabase:
         Returns:
             成功した場合True
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            now = datetime.now().isoformat()
-            cursor.execute('''
-                INSERT INTO post_history (post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (post_id, blog_url, twitter_handle, tweet_id, now, cycle_number))
+            conditions = self._selection_conditions(blog_url, twitter_handle)
+            # 同じ投稿（365botGaryは同じDay番号）がこのサイクルで未投稿の場合のみ進捗を進める
+            same_key = 'q.day_number = p.day_number' if self._dedupes_days(blog_url) else 'q.id = p.id'
+            with self.session(write=True) as conn:
+                counts_toward_cycle = conn.execute(f'''
+                    SELECT 1 FROM posts p
+                    WHERE p.id = ? AND p.blog_url = ? AND {' AND '.join(conditions)}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM post_history h
+                          JOIN posts q ON q.id = h.post_id
+                          WHERE h.blog_url = ? AND h.twitter_handle = ? AND h.cycle_number = ?
+                            AND {same_key}
+                      )
+                ''', (post_id, blog_url, blog_url, twitter_handle, cycle_number)).fetchone() is not None
+                
+                now = datetime.now().isoformat()
+                conn.execute('''
+                    INSERT INTO post_history (post_id, blog_url, twitter_handle, tweet_id, posted_at, cycle_number)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (post_id, blog_url, twitter_handle, tweet_id, now, cycle_number))
+                if counts_toward_cycle:
+                    conn.execute('''
+                        UPDATE cycles SET posted_count = posted_count + 1
+                        WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
+                    ''', (blog_url, twitter_handle, cycle_number))
             
-            conn.commit()
             logger.info(f"投稿履歴を記録: post_id={post_id}, @{twitter_handle}, cycle#{cycle_number}")
             return True
         except Exception as e:
             logger.error(f"投稿履歴の記録エラー: {e}")
             return False
-        finally:
-            conn.close()
     
     def check_cycle_complete(self, blog_url: str, twitter_handle: str, cycle_number: int) -> bool:
         """
-        サイクルが完了したかチェック（全ての投稿が投稿済みか）
+        サイクルが完了したかチェック（投稿対象が全て投稿済みか）
+        
+        cycles の進捗カウンタ（eligible_total, posted_count）を読むだけで判定する。
         
         Args:
             blog_url: ブログURL
@@ -302,122 +1068,641 @@ class PostDatabase:
         Returns:
             サイクルが完了している場合True
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.session() as conn:
+            row = conn.execute('''
+                SELECT eligible_total, posted_count, completed_at FROM cycles
+                WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
+            ''', (blog_url, twitter_handle, cycle_number)).fetchone()
         
-        # 全投稿数
-        cursor.execute('SELECT COUNT(*) FROM posts WHERE blog_url = ?', (blog_url,))
-        total_posts = cursor.fetchone()[0]
+        if row is None:
+            return False
+        
+        eligible_total = row['eligible_total']
+        posted_count = row['posted_count']
+        is_complete = eligible_total > 0 and posted_count >= eligible_total
         
-        # 投稿済み数
-        cursor.execute('''
-            SELECT COUNT(DISTINCT post_id) FROM post_history 
+        if is_complete and row['completed_at'] is None:
+            # サイクルの完了時刻を記録
+            with self.session(write=True) as conn:
+                conn.execute('''
+                    UPDATE cycles SET completed_at = ?
+                    WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ? AND completed_at IS NULL
+                ''', (datetime.now().isoformat(), blog_url, twitter_handle, cycle_number))
+            logger.info(f"サイクル完了: {blog_url} -> @{twitter_handle}, サイクル#{cycle_number} ({posted_count}/{eligible_total})")
+        
+        return is_complete
+    
+    def _is_cycle_complete(self, conn: sqlite3.Connection, blog_url: str, twitter_handle: str, cycle_number: int) -> bool:
+        """サイクルが完了しているか（check_cycle_complete と同じ判定。完了時刻は記録しない）"""
+        row = conn.execute('''
+            SELECT eligible_total, posted_count FROM cycles
             WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
-        ''', (blog_url, twitter_handle, cycle_number))
+        ''', (blog_url, twitter_handle, cycle_number)).fetchone()
+        return row is not None and row['eligible_total'] > 0 and row['posted_count'] >= row['eligible_total']
+    
+    def get_random_unposted_posts(
+        self,
+        blog_url: str,
+        twitter_handle: str,
+        limit: int = 1,
+        filter_day_only: bool = True,
+        account_key: Optional[str] = None,
+        prefer_cached: bool = False,
+        read_only: bool = False
+    ) -> List[Dict]:
+        """
+        未投稿の投稿をランダムに最大limit件取得
         
-        posted_count = cursor.fetchone()[0]
-        conn.close()
+        絞り込み（索引・Day番号・語録）、投稿履歴との反結合、ランダム選択を
+        1つのSQLで行い、Python側では選ばれた行のみを扱う。
         
-        is_complete = total_posts > 0 and posted_count >= total_posts
+        Args:
+            blog_url: ブログURL
+            twitter_handle: Twitterハンドル
+            limit: 取得する最大件数
+            filter_day_only: Trueの場合、Day001～Day365の投稿のみを対象とする
+            account_key: 指定した場合、このアカウントのブロックリストにある投稿と
+                文字数の検証（rendered_tweets）で上限を超えた投稿を除外する
+            prefer_cached: Trueの場合、ページコンテンツを取得済み（post_content）の投稿を優先する
+            read_only: Trueの場合、データベースに書き込まない（サイクルの開始・完了を記録しない。プレビュー用）
         
-        if is_complete:
-            logger.info(f"サイクル完了: {blog_url} -> @{twitter_handle}, サイクル#{cycle_number} ({posted_count}/{total_posts})")
+        Returns:
+            投稿データのリスト
+        """
+        conditions = self._selection_conditions(blog_url, twitter_handle, filter_day_only)
+        blocked_condition = ''
+        params = [blog_url, blog_url, twitter_handle]
+        if account_key is not None:
+            blocked_condition = '''
+                      AND NOT EXISTS (
+                          SELECT 1 FROM blocked_posts b
+                          WHERE b.post_id = p.id AND b.account_key = ?
+                      )
+                      AND NOT EXISTS (
+                          SELECT 1 FROM rendered_tweets r
+                          WHERE r.post_id = p.id AND r.account_key = ? AND r.is_valid = 0
+                      )'''
+            params += [account_key, account_key]
+        # 365botGary: 同じDay番号の投稿が複数ある場合は1件のみ（新しい順で先頭）を候補にする
+        dedupe_days = self._dedupes_days(blog_url, filter_day_only)
+        # 投稿済みの判定も同じ単位で行う（このサイクルで投稿済みのDay番号の投稿は別の投稿でも除外。record_post と同じ）
+        same_key = 'q.day_number = p.day_number' if dedupe_days else 'q.id = p.id'
+        order = 'RANDOM()'
+        if prefer_cached:
+            order = 'NOT EXISTS (SELECT 1 FROM post_content c WHERE c.post_id = unposted.id), RANDOM()'
+        
+        # サイクル確認と選択を1つのセッション（同一接続）で行う
+        with self.session(write=not read_only) as conn:
+            cycle_number = self.get_current_cycle_number(blog_url, twitter_handle)
             
-            # サイクルの完了時刻を記録
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            now = datetime.now().isoformat()
-            cursor.execute('''
-                UPDATE cycles SET completed_at = ? 
-                WHERE blog_url = ? AND twitter_handle = ? AND cycle_number = ?
-            ''', (now, blog_url, twitter_handle, cycle_number))
-            conn.commit()
-            conn.close()
+            if read_only:
+                # サイクルを開始せず、開始されるはずの新しいサイクル（投稿履歴がない）から選ぶ
+                if cycle_number == 0 or self._is_cycle_complete(conn, blog_url, twitter_handle, cycle_number):
+                    cycle_number += 1
+            # サイクルが未開始または完了している場合は新しいサイクルを開始
+            elif cycle_number == 0:
+                cycle_number = self.start_new_cycle(blog_url, twitter_handle)
+            else:
+                # 現在のサイクルが完了しているかチェック
+                if self.check_cycle_complete(blog_url, twitter_handle, cycle_number):
+                    cycle_number = self.start_new_cycle(blog_url, twitter_handle)
+            
+            rows = conn.execute(f'''
+                WITH unposted AS (
+                    SELECT p.*,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY p.day_number
+                               ORDER BY p.published_date DESC, p.id DESC
+                           ) AS day_rank
+                    FROM posts p
+                    WHERE p.blog_url = ?
+                      AND {' AND '.join(conditions)}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM post_history h
+                          JOIN posts q ON q.id = h.post_id
+                          WHERE h.blog_url = ? AND h.twitter_handle = ? AND h.cycle_number = ?
+                            AND {same_key}
+                      ){blocked_condition}
+                )
+                SELECT * FROM unposted
+                WHERE {'day_rank = 1' if dedupe_days else '1'}
+                ORDER BY {order}
+                LIMIT ?
+            ''', (*params[:3], cycle_number, *params[3:], limit)).fetchall()
         
-        return is_complete
+        posts = []
+        for row in rows:
+            post = dict(row)
+            post.pop('day_rank', None)
+            posts.append(post)
+        return posts
     
     def get_random_unposted_post(
         self, 
         blog_url: str, 
         twitter_handle: str,
-        filter_day_only: bool = True
+        filter_day_only: bool = True,
+        account_key: Optional[str] = None
     ) -> Optional[Dict]:
         """
-        未投稿の投稿をランダムに1件取得
+        未投稿の投稿をランダムに1件取得（ページコンテンツを先読み済みの投稿を優先）
         
         Args:
             blog_url: ブログURL
             twitter_handle: Twitterハンドル
             filter_day_only: Trueの場合、Day001～Day365の投稿のみを対象とする
+            account_key: 指定した場合、このアカウントのブロックリストにある投稿と
+                文字数の検証（rendered_tweets）で上限を超えた投稿を除外する
         
         Returns:
             投稿データ、または未投稿がない場合None
         """
-        import random
-        import re
+        posts = self.get_random_unposted_posts(
+            blog_url, twitter_handle, limit=1,
+            filter_day_only=filter_day_only, account_key=account_key, prefer_cached=True
+        )
+        if not posts:
+            conditions = self._selection_conditions(blog_url, twitter_handle, filter_day_only)
+            logger.warning(
+                f"未投稿の投稿がありません: {blog_url} -> @{twitter_handle} "
+                f"(条件: {' AND '.join(conditions)})"
+            )
+            return None
         
-        cycle_number = self.get_current_cycle_number(blog_url, twitter_handle)
+        selected_post = posts[0]
+        logger.info(f"投稿を選択: {selected_post.get('title', '')[:50]} (ID: {selected_post['id']})")
+        return selected_post
+    
+    def save_post_content(self, post_id: int, page_content: Dict[str, str]) -> bool:
+        """
+        ページから取得したコンテンツを post_content に保存
         
-        # サイクルが未開始または完了している場合は新しいサイクルを開始
-        if cycle_number == 0:
-            cycle_number = self.start_new_cycle(blog_url, twitter_handle)
-        else:
-            # 現在のサイクルが完了しているかチェック
-            if self.check_cycle_complete(blog_url, twitter_handle, cycle_number):
-                cycle_number = self.start_new_cycle(blog_url, twitter_handle)
+        内容（空白を正規化したハッシュ）が変わらない場合は確認日時（checked_at）のみ更新する。
+        変わった場合はコンテンツとハッシュを保存し、posts の本文・タイトルも更新する。
         
-        # 未投稿の投稿を取得
-        unposted_posts = self.get_unposted_posts_in_cycle(blog_url, twitter_handle, cycle_number)
+        Args:
+            post_id: 投稿ID
+            page_content: BlogFetcher.fetch_latest_post の結果（title, content, link, published_date, author）
         
-        if not unposted_posts:
-            logger.warning(f"未投稿の投稿がありません: {blog_url} -> @{twitter_handle}")
-            return None
+        Returns:
+            内容が変わった（または新規保存した）場合True
+        """
+        content = _normalize_page_content(page_content)
+        content_hash = _content_hash(content)
+        now = datetime.now().isoformat()
+        with self.session(write=True) as conn:
+            current = conn.execute(
+                'SELECT content_hash FROM post_content WHERE post_id = ?', (post_id,)
+            ).fetchone()
+            if current is not None and current['content_hash'] == content_hash:
+                conn.execute('UPDATE post_content SET checked_at = ? WHERE post_id = ?', (now, post_id))
+                return False
+            
+            conn.execute('''
+                INSERT INTO post_content
+                    (post_id, title, content, link, published_date, author, content_hash,
+                     fetched_at, checked_at, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(post_id) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    link = excluded.link,
+                    published_date = excluded.published_date,
+                    author = excluded.author,
+                    content_hash = excluded.content_hash,
+                    fetched_at = excluded.fetched_at,
+                    checked_at = excluded.checked_at,
+                    changed_at = excluded.changed_at
+            ''', (
+                post_id, content['title'], content['content'], content['link'],
+                content['published_date'], content['author'], content_hash, now, now, now,
+            ))
+            
+            # posts の本文を最新のページの内容にする（RSSの要約や空のままにしない）
+            if content['content']:
+                conn.execute(
+                    'UPDATE posts SET content = ?, updated_at = ? WHERE id = ?',
+                    (content['content'][:500], now, post_id)
+                )
+            
+            # データベースのタイトルを更新（ページの最新タイトル）
+            if content['title']:
+                row = conn.execute('SELECT title FROM posts WHERE id = ?', (post_id,)).fetchone()
+                if row is not None and row['title'] != content['title']:
+                    self.update_post_title(post_id, content['title'])
+        return True
+    
+    def get_post_content(self, post_id: int, max_age_hours: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """
+        先読み済みのページコンテンツを取得
         
-        # 「索引」を含む投稿は全アカウントで除外
-        unposted_posts = [p for p in unposted_posts if '索引' not in (p.get('title', '') or '')]
-        if not unposted_posts:
-            logger.warning(f"索引を除外した結果、未投稿がありません: {blog_url} -> @{twitter_handle}")
+        Args:
+            post_id: 投稿ID
+            max_age_hours: 指定した場合、これより前に確認（取得・再確認）したコンテンツは返さない
+        
+        Returns:
+            ページコンテンツ（title, content, link, published_date, author, content_hash,
+            fetched_at, checked_at, changed_at）またはNone
+        """
+        with self.session() as conn:
+            row = conn.execute('SELECT * FROM post_content WHERE post_id = ?', (post_id,)).fetchone()
+        if row is None:
             return None
-
-        # Day001～Day365の投稿のみをフィルタリング（365botGaryの場合）
-        if filter_day_only and 'notesofacim.blog.fc2.com' in blog_url:
-            # Day001～Day365のパターンに一致する投稿のみを選択（重複を除外）
-            day_pattern = re.compile(r'Day(\d{3})')
-            filtered_posts = []
-            seen_days = set()
-            for post in unposted_posts:
-                title = post.get('title', '')
-                match = day_pattern.search(title)
-                if match:
-                    day_num = int(match.group(1))
-                    if 1 <= day_num <= 365 and day_num not in seen_days:
-                        filtered_posts.append(post)
-                        seen_days.add(day_num)
-            
-            if filtered_posts:
-                unposted_posts = filtered_posts
-            else:
-                logger.warning(f"Day001～Day365の未投稿がありません: {blog_url} -> @{twitter_handle}")
+        if max_age_hours is not None:
+            age = datetime.now() - datetime.fromisoformat(row['checked_at'] or row['fetched_at'])
+            if age > timedelta(hours=max_age_hours):
                 return None
+        content = dict(row)
+        content.pop('post_id', None)
+        return content
+    
+    def get_post_titles(self, blog_url: str) -> Dict[str, str]:
+        """ブログの全投稿のリンクとタイトル（リンク -> タイトル）"""
+        with self.session() as conn:
+            rows = conn.execute('SELECT link, title FROM posts WHERE blog_url = ?', (blog_url,)).fetchall()
+        return {row['link']: row['title'] for row in rows}
+    
+    def get_tweet_sources(self, blog_url: str) -> List[Dict]:
+        """
+        ツイートの整形に使うブログの全投稿（索引を除く）
         
-        # 「語録」を含む投稿のみをフィルタリング（pursahsgospelの場合）
-        # ※『原書』と『索引』は除外
-        if ('pursahs-gospel' in blog_url) or (twitter_handle.lower() == 'pursahsgospel'):
-            filtered_posts = []
-            for post in unposted_posts:
-                title = post.get('title', '') or ''
-                if '語録' in title and '原書' not in title and '索引' not in title:
-                    filtered_posts.append(post)
-            
-            if filtered_posts:
-                unposted_posts = filtered_posts
-            else:
-                logger.warning(f"「語録」を含む未投稿がありません: {blog_url} -> @{twitter_handle}")
-                return None
+        ページコンテンツを取得済みの投稿は post_content のタイトル・本文を使う（投稿時と同じ内容）。
         
-        # ランダムに1件選択
-        selected_post = random.choice(unposted_posts)
-        logger.info(f"投稿を選択: {selected_post.get('title', '')[:50]} (ID: {selected_post['id']})")
-        return selected_post
-
-
+        Returns:
+            投稿のリスト（id, link, title, content, source_hash）
+        """
+        with self.session() as conn:
+            rows = conn.execute('''
+                SELECT p.id, p.link,
+                       COALESCE(c.title, p.title) AS title,
+                       COALESCE(c.content, p.content, '') AS content
+                FROM posts p
+                LEFT JOIN post_content c ON c.post_id = p.id
+                WHERE p.blog_url = ? AND p.is_index = 0
+                ORDER BY p.id
+            ''', (blog_url,)).fetchall()
+        sources = []
+        for row in rows:
+            source = dict(row)
+            source['source_hash'] = _content_hash(_normalize_page_content(source))
+            sources.append(source)
+        return sources
+    
+    def get_rendered_tweet(
+        self,
+        post_id: int,
+        account_key: str,
+        page_content: Optional[Dict[str, str]] = None,
+        rules_hash: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        整形済みのツイートを取得
+        
+        Args:
+            page_content: 指定した場合、このコンテンツから整形したもの（ハッシュが一致するもの）のみ返す
+            rules_hash: 指定した場合、この整形ルールで整形したもののみ返す
+        
+        Returns:
+            tweet_text, fallback_text, weighted_length, is_valid, source_hash, rules_hash, rendered_at の辞書、
+            またはNone
+        """
+        with self.session() as conn:
+            row = conn.execute(
+                'SELECT * FROM rendered_tweets WHERE post_id = ? AND account_key = ?', (post_id, account_key)
+            ).fetchone()
+        if row is None:
+            return None
+        if page_content is not None and row['source_hash'] != _content_hash(_normalize_page_content(page_content)):
+            return None
+        if rules_hash is not None and row['rules_hash'] != rules_hash:
+            return None
+        return dict(row)
+    
+    def get_rendered_tweets(self, account_key: str) -> Dict[int, Dict]:
+        """アカウントの整形済みツイート全件（投稿ID -> get_rendered_tweet と同じ辞書）"""
+        with self.session() as conn:
+            rows = conn.execute('SELECT * FROM rendered_tweets WHERE account_key = ?', (account_key,)).fetchall()
+        return {row['post_id']: dict(row) for row in rows}
+    
+    def save_rendered_tweets(self, account_key: str, tweets: List[Dict]) -> int:
+        """
+        アカウントの整形したツイートと文字数の検証結果をまとめて保存（1トランザクション）
+        
+        整形し直した投稿の行のみを渡す（変わっていない行は書き換えない）。
+        
+        Args:
+            account_key: アカウントキー
+            tweets: post_id, tweet_text, fallback_text, weighted_length, is_valid, source_hash, rules_hash の
+                辞書のリスト
+        
+        Returns:
+            保存した件数
+        """
+        if not tweets:
+            return 0
+        now = datetime.now().isoformat()
+        with self.session(write=True) as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO rendered_tweets
+                    (post_id, account_key, tweet_text, fallback_text, weighted_length, is_valid,
+                     source_hash, rules_hash, rendered_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (t['post_id'], account_key, t['tweet_text'], t.get('fallback_text'), t['weighted_length'],
+                 int(bool(t['is_valid'])), t['source_hash'], t.get('rules_hash'), now)
+                for t in tweets
+            ])
+        return len(tweets)
+    
+    def get_sync_state(self, blog_url: str) -> Optional[Dict]:
+        """
+        ブログの差分同期の状態を取得
+        
+        Returns:
+            source, last_entry_id, feed_updated, archive_hash, post_count, synced_at の辞書、またはNone
+        """
+        with self.session() as conn:
+            row = conn.execute('SELECT * FROM sync_state WHERE blog_url = ?', (blog_url,)).fetchone()
+        return dict(row) if row else None
+    
+    def save_sync_state(self, blog_url: str, state: Dict):
+        """ブログの差分同期の状態を保存（synced_at は現在時刻）"""
+        with self.session(write=True) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sync_state
+                    (blog_url, source, last_entry_id, feed_updated, archive_hash, post_count, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                blog_url,
+                state.get('source') or '',
+                state.get('last_entry_id'),
+                state.get('feed_updated'),
+                state.get('archive_hash'),
+                state.get('post_count') or 0,
+                datetime.now().isoformat(),
+            ))
+    
+    def get_revalidation_queue(
+        self,
+        upcoming_ids: List[int],
+        limit: int,
+        upcoming_max_age_hours: float,
+        recent_max_age_hours: float,
+        recent_window_hours: float,
+        max_age_hours: float,
+    ) -> List[Dict]:
+        """
+        ページコンテンツを再確認する投稿を優先度順に取得
+        
+        優先度（数値が小さいほど先）:
+            0: 次に投稿する候補（upcoming_ids）で、未取得または upcoming_max_age_hours 以上確認していないもの
+            1: recent_window_hours 以内に内容が変わった投稿で、recent_max_age_hours 以上確認していないもの
+            2: その他の取得済みの投稿で、max_age_hours 以上確認していないもの
+            3: まだ取得していない投稿（索引を除く）
+        同じ優先度の中では確認日時の古い順。
+        
+        Returns:
+            投稿のリスト（id, blog_url, link, title, checked_at, priority）
+        """
+        now = datetime.now()
+        
+        def before(hours: float) -> str:
+            return (now - timedelta(hours=hours)).isoformat()
+        
+        placeholders = ','.join('?' * len(upcoming_ids)) or 'NULL'
+        with self.session() as conn:
+            rows = conn.execute(f'''
+                WITH queue AS (
+                    SELECT p.id, p.blog_url, p.link, p.title, c.checked_at,
+                           CASE
+                               WHEN p.id IN ({placeholders}) THEN 0
+                               WHEN c.post_id IS NULL THEN 3
+                               WHEN c.changed_at >= ? THEN 1
+                               ELSE 2
+                           END AS priority
+                    FROM posts p
+                    LEFT JOIN post_content c ON c.post_id = p.id
+                    WHERE p.is_index = 0 AND p.link != ''
+                )
+                SELECT * FROM queue
+                WHERE priority = 3
+                   OR (priority = 0 AND (checked_at IS NULL OR checked_at < ?))
+                   OR (priority = 1 AND checked_at < ?)
+                   OR (priority = 2 AND checked_at < ?)
+                ORDER BY priority, checked_at, id
+                LIMIT ?
+            ''', (
+                *upcoming_ids, before(recent_window_hours),
+                before(upcoming_max_age_hours), before(recent_max_age_hours), before(max_age_hours),
+                limit,
+            )).fetchall()
+        return [dict(row) for row in rows]
+    
+    def add_failed_post(
+        self,
+        post_id: int,
+        account_key: str,
+        title: str = '',
+        link: str = '',
+        blog_url: str = '',
+        twitter_handle: str = '',
+        error_info: Optional[dict] = None,
+        tweet_preview: Optional[str] = None
+    ) -> int:
+        """
+        失敗した投稿を失敗キューに追加（既にある場合はリトライ回数を増やす）
+        
+        Args:
+            post_id: 投稿ID
+            account_key: アカウントキー（'365bot' / 'pursahs'）
+            title: タイトル
+            link: 投稿URL
+            blog_url: ブログURL
+            twitter_handle: Twitterハンドル
+            error_info: 投稿結果のエラー情報（status, reason など）
+            tweet_preview: 投稿しようとしたツイート本文
+        
+        Returns:
+            更新後のリトライ回数
+        """
+        now = datetime.now().isoformat()
+        with self.session(write=True) as conn:
+            conn.execute('''
+                INSERT INTO failed_posts
+                    (post_id, account_key, title, link, blog_url, twitter_handle,
+                     retry_count, first_failed, last_failed, tweet_preview, last_error)
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
+                ON CONFLICT(post_id, account_key) DO UPDATE SET
+                    retry_count = failed_posts.retry_count + 1,
+                    last_failed = excluded.last_failed,
+                    tweet_preview = COALESCE(excluded.tweet_preview, failed_posts.tweet_preview),
+                    last_error = COALESCE(excluded.last_error, failed_posts.last_error)
+            ''', (
+                post_id, account_key, title, link, blog_url, twitter_handle, now, now,
+                tweet_preview[:200] if tweet_preview else None,
+                _summarize_error(error_info),
+            ))
+            row = conn.execute(
+                'SELECT retry_count FROM failed_posts WHERE post_id = ? AND account_key = ?',
+                (post_id, account_key)
+            ).fetchone()
+        return row['retry_count']
+    
+    def update_failed_post_retry(
+        self,
+        post_id: int,
+        account_key: str,
+        error_info: Optional[dict] = None,
+        tweet_preview: Optional[str] = None
+    ) -> bool:
+        """
+        失敗キューにある投稿のリトライ回数を増やす
+        
+        Returns:
+            更新した場合True（失敗キューにない場合False）
+        """
+        with self.session(write=True) as conn:
+            cursor = conn.execute('''
+                UPDATE failed_posts SET
+                    retry_count = retry_count + 1,
+                    last_failed = ?,
+                    tweet_preview = COALESCE(?, tweet_preview),
+                    last_error = COALESCE(?, last_error)
+                WHERE post_id = ? AND account_key = ?
+            ''', (
+                datetime.now().isoformat(),
+                tweet_preview[:200] if tweet_preview else None,
+                _summarize_error(error_info),
+                post_id, account_key,
+            ))
+            return cursor.rowcount > 0
+    
+    def remove_failed_post(self, post_id: int, account_key: str) -> bool:
+        """失敗キューから投稿を削除（投稿成功時）"""
+        with self.session(write=True) as conn:
+            cursor = conn.execute(
+                'DELETE FROM failed_posts WHERE post_id = ? AND account_key = ?',
+                (post_id, account_key)
+            )
+            return cursor.rowcount > 0
+    
+    def mark_failed_post_exhausted(self, post_id: int, account_key: str):
+        """最大リトライ回数を超えた投稿に印を付ける（調査用に削除せず残す）"""
+        with self.session(write=True) as conn:
+            conn.execute('''
+                UPDATE failed_posts SET exhausted = 1, exhausted_at = COALESCE(exhausted_at, ?)
+                WHERE post_id = ? AND account_key = ?
+            ''', (datetime.now().isoformat(), post_id, account_key))
+    
+    def get_failed_posts(self, max_retry_count: Optional[int] = None) -> List[Dict]:
+        """
+        失敗キューの投稿を取得（古い順）
+        
+        Args:
+            max_retry_count: 指定した場合、リトライ回数がこの値未満の投稿のみ
+        
+        Returns:
+            失敗投稿のリスト（last_error は辞書に変換済み）
+        """
+        sql = 'SELECT * FROM failed_posts'
+        params: tuple = ()
+        if max_retry_count is not None:
+            sql += ' WHERE retry_count < ?'
+            params = (max_retry_count,)
+        with self.session() as conn:
+            rows = conn.execute(sql + ' ORDER BY first_failed, post_id', params).fetchall()
+        
+        failed_posts = []
+        for row in rows:
+            fp = dict(row)
+            fp['last_error'] = json.loads(fp['last_error']) if fp['last_error'] else None
+            fp['exhausted'] = bool(fp['exhausted'])
+            failed_posts.append(fp)
+        return failed_posts
+    
+    def add_blocked_post(self, post_id: int, account_key: str, title: str = '', link: str = '') -> bool:
+        """
+        403が発生した投稿をブロックリストに追加
+        
+        Returns:
+            新規に追加した場合True（既に登録済みの場合False）
+        """
+        with self.session(write=True) as conn:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO blocked_posts (post_id, account_key, title, link, blocked_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (post_id, account_key, title, link, datetime.now().isoformat()))
+            return cursor.rowcount > 0
+    
+    def is_blocked(self, post_id: int, account_key: str) -> bool:
+        """ブロックリストに含まれているか"""
+        with self.session() as conn:
+            row = conn.execute(
+                'SELECT 1 FROM blocked_posts WHERE post_id = ? AND account_key = ?',
+                (post_id, account_key)
+            ).fetchone()
+        return row is not None
+    
+    def clear_blocked_posts(self, account_key: str) -> int:
+        """
+        指定アカウントのブロックリストを全解除
+        
+        Returns:
+            解除した件数
+        """
+        with self.session(write=True) as conn:
+            cursor = conn.execute('DELETE FROM blocked_posts WHERE account_key = ?', (account_key,))
+            return cursor.rowcount
+    
+    def import_failure_json(self, failed_posts: List[Dict], blocked_posts: List[Dict]) -> Dict[str, int]:
+        """
+        旧形式（failed_posts.json / blocked_posts.json）の内容を取り込む
+        
+        既にテーブルにある投稿は、リトライ回数の大きい方・新しい失敗日時を残す。
+        
+        Args:
+            failed_posts: failed_posts.json の内容
+            blocked_posts: blocked_posts.json の内容
+        
+        Returns:
+            件数の辞書（failed, blocked）
+        """
+        now = datetime.now().isoformat()
+        failed_rows = [
+            (
+                fp['post_id'], fp['account_key'], fp.get('title', ''), fp.get('link', ''),
+                fp.get('blog_url', ''), fp.get('twitter_handle', ''), fp.get('retry_count', 0),
+                fp.get('first_failed') or now, fp.get('last_failed') or now,
+                fp.get('tweet_preview'), _summarize_error(fp.get('last_error')),
+                1 if fp.get('exhausted') else 0, fp.get('exhausted_at'),
+            )
+            for fp in failed_posts
+            if fp.get('post_id') is not None and fp.get('account_key')
+        ]
+        blocked_rows = [
+            (b['post_id'], b['account_key'], b.get('title', ''), b.get('link', ''), b.get('blocked_at') or now)
+            for b in blocked_posts
+            if b.get('post_id') is not None and b.get('account_key')
+        ]
+        with self.session(write=True) as conn:
+            conn.executemany('''
+                INSERT INTO failed_posts
+                    (post_id, account_key, title, link, blog_url, twitter_handle, retry_count,
+                     first_failed, last_failed, tweet_preview, last_error, exhausted, exhausted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(post_id, account_key) DO UPDATE SET
+                    retry_count = MAX(failed_posts.retry_count, excluded.retry_count),
+                    first_failed = MIN(failed_posts.first_failed, excluded.first_failed),
+                    last_failed = MAX(failed_posts.last_failed, excluded.last_failed),
+                    tweet_preview = COALESCE(failed_posts.tweet_preview, excluded.tweet_preview),
+                    last_error = COALESCE(failed_posts.last_error, excluded.last_error),
+                    exhausted = MAX(failed_posts.exhausted, excluded.exhausted),
+                    exhausted_at = COALESCE(failed_posts.exhausted_at, excluded.exhausted_at)
+            ''', failed_rows)
+            conn.executemany('''
+                INSERT OR IGNORE INTO blocked_posts (post_id, account_key, title, link, blocked_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', blocked_rows)
+        
+        logger.info(f"失敗投稿・ブロックリストを取り込みました: 失敗 {len(failed_rows)}件 / ブロック {len(blocked_rows)}件")
+        return {'failed': len(failed_rows), 'blocked': len(blocked_rows)}
@@ -1,5 +1,6 @@
 """語録111の投稿履歴を削除"""
 import sqlite3
+from database import PostDatabase
 
 conn = sqlite3.connect('posts.db')
 cursor = conn.cursor()
@@ -38,3 +39,7 @@ else:
     print("\n削除対象なし")
 
 conn.close()
+
+if rows:
+    # 投稿履歴を直接削除したため、サイクルの進捗カウンタを集計し直す
+    PostDatabase().rebuild_cycle_counters()
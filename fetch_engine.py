@@ -0,0 +1,170 @@
+"""
+並列ページ取得モジュール
+スレッドプールで複数URLを並列に取得し、ホストごとに同時接続数とリクエスト頻度（トークンバケット）を制限する
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+from config import Config
+from http_session import get_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# 再試行するHTTPステータス（レート制限・一時的なサーバーエラー）
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """トークンバケット（rate: 1秒あたりの補充数、capacity: 連続で使える最大数）"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得する（なければ補充されるまで待機）"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """
+    ホストごとの制限付きでページを並列取得するエンジン
+
+    - max_workers: 全体の並列数
+    - per_host: ホストごとの同時接続数
+    - rate_per_host: ホストごとの1秒あたりのリクエスト数（トークンバケット）
+    - retries / backoff: 接続エラー・429・5xx の再試行回数と初回待機秒数（指数バックオフ）
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        max_workers: Optional[int] = None,
+        per_host: Optional[int] = None,
+        rate_per_host: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 30,
+    ):
+        self.session = session or get_session()
+        self.max_workers = max_workers or Config.FETCH_MAX_WORKERS
+        self.per_host = per_host or Config.FETCH_PER_HOST
+        self.rate_per_host = rate_per_host or Config.FETCH_RATE_PER_HOST
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._hosts_lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    def _host_limits(self, url: str):
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.Semaphore(self.per_host)
+                self._host_buckets[host] = TokenBucket(self.rate_per_host, max(1.0, float(self.per_host)))
+            return self._host_semaphores[host], self._host_buckets[host]
+
+    def _retry_after(self, response: requests.Response, attempt: int) -> float:
+        """
+        Retry-After ヘッダー（秒数または日時）があれば優先し、なければ指数バックオフ
+
+        待機秒数は Config.FETCH_MAX_RETRY_AFTER を上限とする（長い Retry-After でスレッドを止め続けない）
+        """
+        wait = self.backoff * (2 ** attempt)
+        value = response.headers.get('Retry-After') if response is not None else None
+        if value:
+            if value.isdigit():
+                wait = float(value)
+            else:
+                try:
+                    wait = max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        return min(wait, Config.FETCH_MAX_RETRY_AFTER)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        ホストごとの制限を守ってURLを取得（接続エラー・429・5xx は再試行）
+
+        Returns:
+            requests.Response（最後の試行のレスポンス。raise_for_status は呼び出し側で行う）
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        semaphore, bucket = self._host_limits(url)
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                with semaphore:
+                    bucket.acquire()
+                    response = self.session.get(url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                logger.warning(f"再試行します（HTTP {response.status_code}）: {url}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"再試行します（{type(e).__name__}）: {url}")
+            time.sleep(self._retry_after(response, attempt))
+        raise RuntimeError("unreachable")
+
+    def map(self, func: Callable[[str], T], urls: Iterable[str], return_exceptions: bool = False) -> List[T]:
+        """
+        URLごとに func を並列実行し、入力と同じ順序で結果を返す
+
+        func の中で engine.get を使うと、ホストごとの制限が適用される。
+
+        Args:
+            func: URLを受け取る関数
+            urls: URLのリスト
+            return_exceptions: Trueの場合、例外を結果として返す（Falseの場合は最初の例外を送出）
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            futures = [executor.submit(func, url) for url in urls]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+        return results
+
+
+_default_engine: Optional[FetchEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """プロセス共通の FetchEngine を取得"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = FetchEngine()
+        return _default_engine
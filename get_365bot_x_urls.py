@@ -5,13 +5,19 @@ import io
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.insert(0, '.')
+from database import PostDatabase
+
+# アーカイブ用テーブル・ビュー（post_history_all）のマイグレーションを適用しておく
+PostDatabase()
+
 conn = sqlite3.connect('posts.db')
 cur = conn.cursor()
 
 # 2026年の投稿履歴を取得
 rows = cur.execute('''
     SELECT ph.posted_at, ph.post_id, ph.tweet_id, ph.cycle_number, p.title
-    FROM post_history ph
+    FROM post_history_all ph
     JOIN posts p ON ph.post_id = p.id
     WHERE ph.twitter_handle = '365botGary' 
     AND ph.posted_at LIKE '2026%'
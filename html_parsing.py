@@ -0,0 +1,234 @@
+"""
+HTML解析モジュール
+BeautifulSoup のパーサー（lxml を優先し、なければ html.parser）と、
+リンクだけを抽出する軽量な解析を提供する
+（サイトごとのセレクタは site_profiles.py）
+"""
+import importlib.util
+import logging
+from collections import deque
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# lxml がインストールされているか（import はせずに確認する。BeautifulSoup が必要なときに読み込む）
+HAS_LXML = importlib.util.find_spec('lxml') is not None
+
+
+def default_parser() -> str:
+    """使用するパーサー名（Config.HTML_PARSER が auto の場合は lxml を優先）"""
+    parser = Config.HTML_PARSER
+    if parser == 'auto':
+        return 'lxml' if HAS_LXML else 'html.parser'
+    if parser == 'lxml' and not HAS_LXML:
+        logger.warning("lxml がインストールされていないため html.parser を使用します")
+        return 'html.parser'
+    return parser
+
+
+def make_soup(markup, parser: Optional[str] = None) -> BeautifulSoup:
+    """設定されたパーサーで BeautifulSoup を作成"""
+    return BeautifulSoup(markup, parser or default_parser())
+
+
+def extract_links(markup: str) -> List[Tuple[str, str]]:
+    """
+    ページ内のすべてのリンクを (href, テキスト) で返す（文書順）
+
+    索引・アーカイブのようにリンクだけが必要なページ向け。
+    lxml が使える場合は BeautifulSoup の木を作らずに XPath で直接抽出する。
+    テキストは BeautifulSoup の get_text(strip=True) と同じく、各文字列を strip して連結する。
+    """
+    if HAS_LXML and default_parser() == 'lxml':
+        import lxml.html
+        if not markup.strip():
+            return []
+        try:
+            tree = lxml.html.fromstring(markup)
+        except ValueError:
+            # XML宣言（encoding指定）付きの文字列は lxml がそのまま受け付けないため bytes で渡す
+            tree = lxml.html.fromstring(markup.encode('utf-8'))
+        return [
+            (a.get('href'), ''.join(text.strip() for text in a.itertext()))
+            for a in tree.xpath('//a[@href]')
+        ]
+    soup = make_soup(markup)
+    return [(a.get('href'), a.get_text(strip=True)) for a in soup.find_all('a', href=True)]
+
+
+# <link rel="alternate"> のうちフィードとして扱う type
+FEED_TYPES = frozenset(['application/rss+xml', 'application/atom+xml', 'application/rdf+xml'])
+
+
+def extract_feed_links(markup: str, base_url: Optional[str] = None) -> List[str]:
+    """ページの <link rel="alternate"> で告知されたフィードのURL（文書順、絶対URL）"""
+    soup = make_soup(markup)
+    urls = []
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        rel = rel.split() if isinstance(rel, str) else rel
+        if 'alternate' not in [r.lower() for r in rel]:
+            continue
+        if (link.get('type') or '').split(';')[0].strip().lower() not in FEED_TYPES:
+            continue
+        url = urljoin(base_url, link['href']) if base_url else link['href']
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+class HarvestedLink(NamedTuple):
+    """iter_links が返すリンク"""
+    url: str  # 絶対URL（クエリ・フラグメントを除去）
+    text: str  # リンクテキスト（get_text(strip=True) と同じ形式）
+    context: str  # 親要素のテキスト（リンクテキストを含む。get_text(strip=True) と同じ形式）
+
+
+def normalize_url(href: str, base_url: Optional[str] = None) -> str:
+    """相対URLを絶対URLに変換し、クエリとフラグメントを除去"""
+    url = urljoin(base_url, href) if base_url else href
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path}" if parsed.scheme else parsed.path
+
+
+# 子要素を持たない要素（終了タグがない）
+_VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+])
+# テキストに含めない要素（BeautifulSoup の get_text と同じ）
+_SKIP_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+# 同じ要素の開始タグで暗黙に閉じる要素と、その探索を打ち切る要素
+_IMPLICIT_CLOSE_TAGS = frozenset(['li', 'dt', 'dd', 'p', 'tr', 'td', 'th', 'option'])
+_SCOPE_TAGS = frozenset(['ul', 'ol', 'dl', 'table', 'tbody', 'thead', 'select', 'div', 'body'])
+
+
+class _LinkHarvester(HTMLParser):
+    """
+    アンカー要素だけを集めるイベント駆動のパーサー（木を作らない）
+
+    開いている要素のスタックとテキストだけを保持し、親要素が閉じた時点でリンクを確定する。
+    """
+
+    def __init__(self, base_url: Optional[str], href_contains: Optional[str]):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.href_contains = href_contains
+        # [タグ名, テキスト断片のリスト, 直下のリンクのリスト]
+        self.stack = [['#root', [], []]]
+        self.anchor = None  # 解析中の <a>: [href, テキスト断片のリスト, 連番]
+        self.skip_depth = 0
+        self.seq = 0
+        # 文書順に返すための待ち行列: [連番, url, text, context（確定前はNone）]
+        self.pending = deque()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        if tag in _SKIP_TEXT_TAGS:
+            self.skip_depth += 1
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href and self.anchor is None and (self.href_contains is None or self.href_contains in href):
+                self.anchor = [href, [], self.seq]
+                self.seq += 1
+            return
+        if tag in _IMPLICIT_CLOSE_TAGS:
+            for i in range(len(self.stack) - 1, 0, -1):
+                open_tag = self.stack[i][0]
+                if open_tag == tag:
+                    self._close_to(i)
+                    break
+                if open_tag in _SCOPE_TAGS:
+                    break
+        self.stack.append([tag, [], []])
+
+    def handle_startendtag(self, tag, attrs):
+        # <br /> などの自己終了タグは子要素を持たない
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TEXT_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        if tag == 'a':
+            if self.anchor is not None:
+                href, parts, seq = self.anchor
+                self.anchor = None
+                text = ''.join(parts)
+                frame = self.stack[-1]
+                frame[1].append(text)
+                item = [seq, normalize_url(href, self.base_url), text, None]
+                frame[2].append(item)
+                self.pending.append(item)
+            return
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i][0] == tag:
+                self._close_to(i)
+                break
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        data = data.strip()
+        if not data:
+            return
+        if self.anchor is not None:
+            self.anchor[1].append(data)
+        else:
+            self.stack[-1][1].append(data)
+
+    def _close_to(self, index: int):
+        """スタックの index 以降の要素を閉じ、テキストを親要素に渡してリンクの context を確定"""
+        while len(self.stack) > index:
+            tag, parts, links = self.stack.pop()
+            text = ''.join(parts)
+            for item in links:
+                item[3] = text
+            self.stack[-1][1].append(text)
+
+    def finish(self):
+        """文書の終わり: 開いている要素をすべて閉じる"""
+        self.close()
+        if self.anchor is not None:
+            self.handle_endtag('a')
+        self._close_to(1)
+        _, parts, links = self.stack[0]
+        for item in links:
+            item[3] = ''.join(parts)
+
+    def ready(self) -> Iterator[HarvestedLink]:
+        """context が確定したリンクを文書順に返す"""
+        while self.pending and self.pending[0][3] is not None:
+            _, url, text, context = self.pending.popleft()
+            yield HarvestedLink(url, text, context)
+
+
+def iter_links(
+    markup: Union[str, Iterable[str]],
+    base_url: Optional[str] = None,
+    href_contains: Optional[str] = None,
+) -> Iterator[HarvestedLink]:
+    """
+    アンカー要素だけを解析して (url, text, context) を文書順に返すジェネレーター
+
+    索引・アーカイブのようにリンクだけが必要なページ向け。ページ全体の木を作らず、
+    文字列のチャンク（response.iter_content(decode_unicode=True) など）を順に渡すこともできる。
+
+    Args:
+        markup: HTML文字列、または文字列のチャンクのイテラブル
+        base_url: 相対URLの基準
+        href_contains: 指定した場合、href にこの文字列を含むリンクのみ（'entry-' など）
+    """
+    harvester = _LinkHarvester(base_url, href_contains)
+    chunks = [markup] if isinstance(markup, str) else markup
+    for chunk in chunks:
+        harvester.feed(chunk)
+        yield from harvester.ready()
+    harvester.finish()
+    yield from harvester.ready()
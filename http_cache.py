@@ -0,0 +1,329 @@
+"""
+HTTPキャッシュモジュール
+ETag / Last-Modified を保存して条件付きGET（If-None-Match / If-Modified-Since）を行い、
+未変更（304）のページは保存済みの本文と解析結果を再利用する
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 本文とともに保存するレスポンスヘッダー
+# （本文は展開済みで保存するため Content-Encoding は保存しない）
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class HttpCache:
+    """
+    SQLiteに保存するHTTPレスポンスキャッシュ（URL単位、サイズ上限付きLRU）
+
+    解析結果（派生データ）は本文のハッシュとともに保存し、本文が変わらない限り再利用する。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.db_path = db_path or Config.HTTP_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else Config.HTTP_CACHE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    body_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache (last_access)')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache_derived (
+                    url TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    body_hash TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (url, name)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS feed_endpoints (
+                    blog_url TEXT NOT NULL,
+                    feed_url TEXT NOT NULL,
+                    ok INTEGER NOT NULL,
+                    checked_at REAL NOT NULL,
+                    PRIMARY KEY (blog_url, feed_url)
+                )
+            ''')
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """キャッシュされたレスポンスを取得（なければNone）"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM http_cache WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['headers'] = json.loads(entry['headers'])
+        return entry
+
+    def touch(self, url: str):
+        """最終アクセス時刻を更新（LRUの順序に反映）"""
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE http_cache SET last_access = ? WHERE url = ?', (time.time(), url))
+
+    def store(self, url: str, response: requests.Response):
+        """200レスポンスを保存し、サイズ上限を超えた分を古い順に削除"""
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT INTO http_cache
+                    (url, status, headers, body, body_hash, etag, last_modified, size, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    headers = excluded.headers,
+                    body = excluded.body,
+                    body_hash = excluded.body_hash,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    size = excluded.size,
+                    fetched_at = excluded.fetched_at,
+                    last_access = excluded.last_access
+            ''', (
+                url, response.status_code, json.dumps(headers), body,
+                hashlib.sha256(body).hexdigest(),
+                response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                len(body), now, now,
+            ))
+            self._evict()
+
+    def _evict(self):
+        """合計サイズが上限を超えている間、最終アクセスが古いエントリから削除（ロック取得済みで呼ぶ）"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for row in self._conn.execute('SELECT url, size FROM http_cache ORDER BY last_access'):
+            if total <= self.max_bytes:
+                break
+            evicted.append((row['url'],))
+            total -= row['size']
+        self._conn.executemany('DELETE FROM http_cache WHERE url = ?', evicted)
+        self._conn.executemany('DELETE FROM http_cache_derived WHERE url = ?', evicted)
+        logger.debug(f"HTTPキャッシュを削除: {len(evicted)}件")
+
+    def get_derived(self, url: str, name: str) -> Optional[Any]:
+        """本文が変わっていない場合のみ、保存済みの解析結果を返す"""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT d.value FROM http_cache_derived d
+                JOIN http_cache c ON c.url = d.url AND c.body_hash = d.body_hash
+                WHERE d.url = ? AND d.name = ?
+            ''', (url, name)).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def set_derived(self, url: str, name: str, value: Any):
+        """解析結果を現在の本文のハッシュとともに保存（本文がキャッシュにない場合は何もしない）"""
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO http_cache_derived (url, name, body_hash, value)
+                SELECT url, ?, body_hash, ? FROM http_cache WHERE url = ?
+            ''', (name, json.dumps(value, ensure_ascii=False), url))
+
+    def get_feed_endpoints(self, blog_url: str) -> List[Dict[str, Any]]:
+        """ブログのフィードURLの確認結果（feed_url, ok, checked_at。新しい順）"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT feed_url, ok, checked_at FROM feed_endpoints
+                WHERE blog_url = ? ORDER BY checked_at DESC
+            ''', (blog_url,)).fetchall()
+        return [{'feed_url': row['feed_url'], 'ok': bool(row['ok']), 'checked_at': row['checked_at']} for row in rows]
+
+    def set_feed_endpoint(self, blog_url: str, feed_url: str, ok: bool):
+        """フィードURLの確認結果を記録（ok=False は無効なURLとして一定期間試さない）"""
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO feed_endpoints (blog_url, feed_url, ok, checked_at)
+                VALUES (?, ?, ?, ?)
+            ''', (blog_url, feed_url, int(ok), time.time()))
+
+    def stats(self) -> Dict[str, int]:
+        """件数と合計サイズ"""
+        with self._lock:
+            row = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache').fetchone()
+        return {'entries': row[0], 'bytes': row[1], 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.execute('DELETE FROM http_cache_derived')
+            self._conn.execute('DELETE FROM feed_endpoints')
+
+
+def _cached_response(entry: Dict[str, Any], url: str, request: Optional[requests.PreparedRequest]) -> requests.Response:
+    """キャッシュのエントリから requests.Response を組み立てる"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = 'OK'
+    response._content = entry['body']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = url
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+class CachingSession(requests.Session):
+    """
+    GETレスポンスを HttpCache に保存し、条件付きGETで再検証する requests.Session
+
+    レスポンスには以下の属性を付ける:
+    - from_cache: 本文をキャッシュから返した場合True（304 またはオフライン）
+    - cache_key: キャッシュのキー（クエリパラメータを含むリクエストしたURL）
+    - http_cache: 保存先の HttpCache
+    """
+
+    def __init__(self, cache: Optional[HttpCache] = None, offline: Optional[bool] = None):
+        super().__init__()
+        self.cache = cache or get_http_cache()
+        self._offline = offline
+
+    @property
+    def offline(self) -> bool:
+        """オフラインモード（作成時に指定がなければ Config.HTTP_CACHE_OFFLINE に従う）"""
+        return Config.HTTP_CACHE_OFFLINE if self._offline is None else self._offline
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET' or kwargs.get('stream'):
+            return super().request(method, url, *args, **kwargs)
+
+        # クエリパラメータを含めたURLをキャッシュのキーにする（params 違いのリクエストを区別する）
+        params = kwargs.pop('params', None)
+        if args:
+            # requests.Session.request の位置引数は params から始まる
+            params, args = args[0], args[1:]
+        if params:
+            prepared = requests.PreparedRequest()
+            prepared.prepare_url(url, params)
+            url = prepared.url
+        entry = self.cache.get(url)
+        if self.offline:
+            if entry is None:
+                raise requests.ConnectionError(f"オフラインモード: キャッシュにありません: {url}")
+            self.cache.touch(url)
+            response = _cached_response(entry, url, None)
+            response.cache_key = url
+            response.http_cache = self.cache
+            return response
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry['etag']:
+                headers.setdefault('If-None-Match', entry['etag'])
+            if entry['last_modified']:
+                headers.setdefault('If-Modified-Since', entry['last_modified'])
+
+        response = super().request(method, url, *args, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            # 未変更: 保存済みの本文を返す（304で返った新しいヘッダーは反映しない）
+            self.cache.touch(url)
+            cached = _cached_response(entry, url, response.request)
+            cached.cache_key = url
+            cached.http_cache = self.cache
+            logger.debug(f"HTTPキャッシュ（304）: {url}")
+            return cached
+
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        response.from_cache = False
+        response.cache_key = url
+        response.http_cache = self.cache
+        return response
+
+
+_default_cache: Optional[HttpCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """プロセス共通の HttpCache を取得"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
+
+
+def set_offline_mode(offline: bool = True):
+    """CachingSession をオフライン（キャッシュのみ）にする（offline を指定して作成したものを除く）"""
+    Config.HTTP_CACHE_OFFLINE = offline
+
+
+def cached_parse(response: requests.Response, name: str, parse):
+    """
+    レスポンスの解析結果をキャッシュする
+
+    本文がキャッシュから返された場合は保存済みの解析結果を使い、再解析しない。
+
+    Args:
+        response: CachingSession のレスポンス（それ以外の場合は常に parse() を実行）
+        name: 解析結果の名前（同じURLで複数の解析を区別する）
+        parse: 解析関数（JSONに変換できる値を返す）
+    """
+    cache_key = getattr(response, 'cache_key', None)
+    cache = getattr(response, 'http_cache', None)
+    if cache_key is None or cache is None:
+        return parse()
+    if getattr(response, 'from_cache', False):
+        value = cache.get_derived(cache_key, name)
+        if value is not None:
+            return value
+    value = parse()
+    cache.set_derived(cache_key, name, value)
+    return value
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    parser = argparse.ArgumentParser(description='HTTPキャッシュの確認・削除・再生')
+    parser.add_argument('--stats', action='store_true', help='件数と合計サイズを表示')
+    parser.add_argument('--clear', action='store_true', help='キャッシュを全削除')
+    parser.add_argument('--fetch', metavar='URL', help='URLを取得してステータスとキャッシュ利用を表示')
+    parser.add_argument('--offline', action='store_true', help='ネットワークに接続せずキャッシュのみから返す')
+    args = parser.parse_args()
+
+    cache = get_http_cache()
+    if args.clear:
+        cache.clear()
+        print("HTTPキャッシュを削除しました")
+    if args.fetch:
+        session = CachingSession(cache, offline=args.offline)
+        res = session.get(args.fetch, timeout=30)
+        print(f"{res.status_code} {args.fetch} ({len(res.content)} bytes, キャッシュ: {'あり' if res.from_cache else 'なし'})")
+    if args.stats or not (args.clear or args.fetch):
+        stats = cache.stats()
+        print(f"エントリ: {stats['entries']}件 / {stats['bytes']:,} bytes（上限 {stats['max_bytes']:,} bytes）")
@@ -0,0 +1,126 @@
+"""
+共通HTTPセッションモジュール
+プロセス全体で1つのセッション（接続プール・keep-alive・圧縮・User-Agent を設定済み）を共有し、
+取得ごとのDNS解決・TCP/TLS接続を省く
+"""
+import argparse
+import importlib.util
+import logging
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from http_cache import CachingSession
+
+logger = logging.getLogger(__name__)
+
+# urllib3 は brotli があれば br を展開できる（import はせずにインストールされているかだけ確認する）
+if importlib.util.find_spec('brotli') is not None:
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """接続プールの利用状況（リクエスト数・新規接続数）を集計する HTTPAdapter"""
+
+    def __init__(self, *args, **kwargs):
+        self._pools: List = []
+        self._pools_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        response = super().send(request, *args, **kwargs)
+        pool = getattr(response.raw, '_pool', None)
+        if pool is not None:
+            with self._pools_lock:
+                if not any(p is pool for p in self._pools):
+                    self._pools.append(pool)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """
+        接続の再利用状況
+
+        Returns:
+            requests: 送信したリクエスト数
+            connections: 新規に張った接続数
+            reused: 既存の接続を再利用したリクエスト数
+        """
+        with self._pools_lock:
+            requests_count = sum(p.num_requests for p in self._pools)
+            connections = sum(p.num_connections for p in self._pools)
+        return {
+            'requests': requests_count,
+            'connections': connections,
+            'reused': max(0, requests_count - connections),
+        }
+
+
+def create_session(cache=None, offline: Optional[bool] = None) -> CachingSession:
+    """
+    接続プール・keep-alive・圧縮・User-Agent を設定した CachingSession を作成
+
+    通常は get_session() の共有セッションを使う。
+    """
+    session = CachingSession(cache, offline=offline)
+    adapter = CountingHTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': Config.HTTP_USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+_shared_session: Optional[CachingSession] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_session() -> CachingSession:
+    """プロセス共通のセッションを取得（BlogFetcher・IndexExtractor・FetchEngine などで共有）"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+def connection_stats(session=None) -> Dict[str, int]:
+    """セッション（省略時は共有セッション）の接続再利用状況"""
+    session = session or get_session()
+    adapter = session.get_adapter('https://')
+    if not isinstance(adapter, CountingHTTPAdapter):
+        return {'requests': 0, 'connections': 0, 'reused': 0}
+    return adapter.stats()
+
+
+def log_connection_stats(session=None):
+    """接続再利用状況をログに出力"""
+    stats = connection_stats(session)
+    if stats['requests']:
+        logger.info(
+            f"HTTP接続: リクエスト {stats['requests']}件 / 新規接続 {stats['connections']}件"
+            f"（再利用 {stats['reused']}件）"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    parser = argparse.ArgumentParser(description='共通セッションでURLを取得し、接続の再利用状況を表示')
+    parser.add_argument('urls', nargs='+', help='取得するURL')
+    args = parser.parse_args()
+
+    session = get_session()
+    for url in args.urls:
+        res = session.get(url, timeout=30)
+        print(f"{res.status_code} {url} ({len(res.content)} bytes)")
+    log_connection_stats(session)
@@ -0,0 +1,56 @@
+"""
+旧形式の失敗投稿・ブロックリスト（failed_posts.json / blocked_posts.json）を
+posts.db の failed_posts / blocked_posts テーブルに取り込むスクリプト
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from database import PostDatabase
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def load_json_list(path: str) -> list:
+    """JSONファイル（リスト）を読み込む（存在しない・壊れている場合は空リスト）"""
+    if not os.path.exists(path):
+        return []
+    try:
+        # WindowsのOut-File等でUTF-8 BOM付きになることがあるため utf-8-sig を使用
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning(f"読み込みに失敗: {path} ({e})")
+        return []
+    return data if isinstance(data, list) else []
+
+
+def main(failed_path: str = "failed_posts.json", blocked_path: str = "blocked_posts.json", db_path: str = "posts.db"):
+    """メイン関数"""
+    logger.info("=" * 60)
+    logger.info("失敗投稿・ブロックリストの取り込み")
+    logger.info("=" * 60)
+    
+    failed_posts = load_json_list(failed_path)
+    blocked_posts = load_json_list(blocked_path)
+    logger.info(f"{failed_path}: {len(failed_posts)}件 / {blocked_path}: {len(blocked_posts)}件")
+    
+    counts = PostDatabase(db_path).import_failure_json(failed_posts, blocked_posts)
+    logger.info(f"取り込み完了: 失敗 {counts['failed']}件 / ブロック {counts['blocked']}件")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='failed_posts.json / blocked_posts.json を posts.db に取り込む')
+    parser.add_argument('--failed', default='failed_posts.json', help='失敗投稿JSONのパス')
+    parser.add_argument('--blocked', default='blocked_posts.json', help='ブロックリストJSONのパス')
+    parser.add_argument('--db', default='posts.db', help='データベースファイルのパス')
+    args = parser.parse_args()
+    main(failed_path=args.failed, blocked_path=args.blocked, db_path=args.db)
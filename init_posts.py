@@ -5,7 +5,7 @@
 import logging
 import sys
 from database import PostDatabase
-from blog_fetcher import BlogFetcher
+from blog_sync import sync_blog
 from config import Config
 
 logging.basicConfig(
@@ -32,31 +32,20 @@ def init_posts_for_blog(blog_url: str, blog_name: str):
     logger.info(f"{'='*60}")
     
     db = PostDatabase()
-    fetcher = BlogFetcher(blog_url)
     
-    # 全投稿を取得
+    # 全投稿を取得して登録（同期の状態も保存し、次回からは差分のみ取得する）
     logger.info("ブログから全投稿を取得中...")
-    posts = fetcher.fetch_all_posts(max_posts=500)
+    result = sync_blog(blog_url, db, full=True)
     
-    if not posts:
+    all_posts = db.get_all_posts(blog_url)
+    if not all_posts:
         logger.error(f"投稿を取得できませんでした: {blog_url}")
         return
     
-    logger.info(f"{len(posts)}件の投稿を取得しました")
-    
-    # データベースに保存
-    saved_count = 0
-    for i, post in enumerate(posts, 1):
-        post_id = db.add_post(blog_url, post)
-        if post_id:
-            saved_count += 1
-        if i % 10 == 0:
-            logger.info(f"進捗: {i}/{len(posts)} 件処理完了")
-    
-    logger.info(f"\n{blog_name}: {saved_count}/{len(posts)} 件の投稿をデータベースに保存しました")
+    logger.info(f"\n{blog_name}: 追加 {len(result['added'])} 件 / 更新 {len(result['changed'])} 件"
+                f"（リクエスト {result['requests']} 件）")
     
     # データベース内の投稿数を確認
-    all_posts = db.get_all_posts(blog_url)
     logger.info(f"データベース内の総投稿数: {len(all_posts)} 件")
 
 
@@ -85,6 +74,13 @@ def main():
 
 
 if __name__ == "__main__":
+    import argparse
+    from http_cache import set_offline_mode
+    parser = argparse.ArgumentParser(description='投稿データベースの初期化')
+    parser.add_argument('--offline', action='store_true', help='ネットワークに接続せずHTTPキャッシュのみから取得')
+    args = parser.parse_args()
+    if args.offline:
+        set_offline_mode(True)
     main()
 
 
@@ -1,152 +1,68 @@
 """
 ブログからランダムに1つ投稿を選び、両方のアカウントで投稿を実施するスクリプト
 """
+import asyncio
 import logging
 import sys
 import os
-import sqlite3
 import time
-import json
 from datetime import datetime, timedelta
+from typing import Dict, List
 from database import PostDatabase
 from blog_fetcher import BlogFetcher
-from twitter_poster import TwitterPoster
+from blog_sync import sync_blog
+from http_session import log_connection_stats
+from twitter_poster import get_poster
+from validate_tweets import load_tweet
 from config import Config
-from rate_limit_checker import check_and_wait_for_account, record_rate_limit_reason, clear_rate_limit_state
+from rate_limit_checker import check_and_wait_for_account, get_not_before, record_rate_limit_reason, clear_rate_limit_state
 import tweepy
 
-# 失敗した投稿を保存するJSONファイル
-FAILED_POSTS_FILE = "failed_posts.json"
-BLOCKED_POSTS_FILE = "blocked_posts.json"
-
-
-def load_failed_posts():
-    """失敗した投稿を読み込む"""
-    if os.path.exists(FAILED_POSTS_FILE):
-        try:
-            # WindowsのOut-File等でUTF-8 BOM付きになることがあるため utf-8-sig を使用
-            with open(FAILED_POSTS_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    return []
-
-
-def load_blocked_posts():
-    """403でブロック候補に入れた投稿を読み込む"""
-    if os.path.exists(BLOCKED_POSTS_FILE):
-        try:
-            with open(BLOCKED_POSTS_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    return []
-
-
-def save_blocked_posts(blocked_posts):
-    """ブロック候補を保存"""
-    try:
-        with open(BLOCKED_POSTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(blocked_posts, f, ensure_ascii=False, indent=2)
-    except IOError as e:
-        logger.error(f"ブロックリストの保存に失敗: {e}")
+# 失敗した投稿・ブロックリストは posts.db の failed_posts / blocked_posts テーブルで管理する
+# （旧 failed_posts.json / blocked_posts.json は import_failure_json.py で取り込み）
 
 
 def add_blocked_post(post_data, account_key):
     """403が発生した投稿をブロックリストに追加"""
-    blocked = load_blocked_posts()
-    for b in blocked:
-        if b.get('post_id') == post_data.get('id') and b.get('account_key') == account_key:
-            return
-    blocked.append({
-        'post_id': post_data.get('id'),
-        'title': post_data.get('title', ''),
-        'link': post_data.get('link', ''),
-        'account_key': account_key,
-        'blocked_at': datetime.now().isoformat()
-    })
-    save_blocked_posts(blocked)
-    logger.info(f"403のためブロックリストに追加: post_id={post_data.get('id')}, account={account_key}")
+    added = PostDatabase().add_blocked_post(
+        post_data.get('id'), account_key,
+        title=post_data.get('title', ''), link=post_data.get('link', '')
+    )
+    if added:
+        logger.info(f"403のためブロックリストに追加: post_id={post_data.get('id')}, account={account_key}")
 
 
 def clear_blocked_posts(account_key: str) -> int:
     """指定アカウントのブロックリストを全解除"""
-    blocked = load_blocked_posts()
-    kept = [b for b in blocked if b.get('account_key') != account_key]
-    if len(kept) != len(blocked):
-        save_blocked_posts(kept)
-    return len(blocked) - len(kept)
+    return PostDatabase().clear_blocked_posts(account_key)
 
 
 def is_blocked(post_data, account_key) -> bool:
     """ブロックリストに含まれているか"""
-    blocked = load_blocked_posts()
-    return any(b.get('post_id') == post_data.get('id') and b.get('account_key') == account_key for b in blocked)
-
-
-def save_failed_posts(failed_posts):
-    """失敗した投稿を保存する"""
-    try:
-        with open(FAILED_POSTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(failed_posts, f, ensure_ascii=False, indent=2)
-    except IOError as e:
-        logger.error(f"失敗投稿の保存に失敗: {e}")
+    return PostDatabase().is_blocked(post_data.get('id'), account_key)
 
 
 def add_failed_post(post_data, page_content, blog_url, twitter_handle, account_key, error_info: dict = None, tweet_preview: str = None):
-    """失敗した投稿を追加する"""
-    failed_posts = load_failed_posts()
-    
-    # 同じ投稿が既に存在するかチェック
-    for fp in failed_posts:
-        if fp['post_id'] == post_data['id'] and fp['account_key'] == account_key:
-            # リトライ回数を増やす
-            fp['retry_count'] = fp.get('retry_count', 0) + 1
-            fp['last_failed'] = datetime.now().isoformat()
-            if tweet_preview is not None:
-                fp['tweet_preview'] = tweet_preview[:200]
-            if error_info:
-                fp['last_error'] = {
-                    'status': error_info.get('status'),
-                    'reason': error_info.get('reason'),
-                    'transaction_id': error_info.get('transaction_id'),
-                    'headers': error_info.get('headers'),
-                    'error_message': error_info.get('error_message'),
-                }
-            save_failed_posts(failed_posts)
-            logger.info(f"失敗投稿を更新: post_id={post_data['id']}, account={account_key}, retry_count={fp['retry_count']}")
-            return
-    
-    # 新規追加
-    failed_post = {
-        'post_id': post_data['id'],
-        'title': post_data.get('title', ''),
-        'link': page_content.get('link', post_data.get('link', '')),
-        'blog_url': blog_url,
-        'twitter_handle': twitter_handle,
-        'account_key': account_key,
-        'retry_count': 0,
-        'first_failed': datetime.now().isoformat(),
-        'last_failed': datetime.now().isoformat(),
-        'tweet_preview': (tweet_preview[:200] if tweet_preview else None),
-        'last_error': (None if not error_info else {
-            'status': error_info.get('status'),
-            'reason': error_info.get('reason'),
-            'transaction_id': error_info.get('transaction_id'),
-            'headers': error_info.get('headers'),
-            'error_message': error_info.get('error_message'),
-        }),
-    }
-    failed_posts.append(failed_post)
-    save_failed_posts(failed_posts)
-    logger.info(f"失敗投稿を記録: post_id={post_data['id']}, account={account_key}")
+    """失敗した投稿を追加する（既にある場合はリトライ回数を増やす）"""
+    retry_count = PostDatabase().add_failed_post(
+        post_id=post_data['id'],
+        account_key=account_key,
+        title=post_data.get('title', ''),
+        link=page_content.get('link', post_data.get('link', '')),
+        blog_url=blog_url,
+        twitter_handle=twitter_handle,
+        error_info=error_info,
+        tweet_preview=tweet_preview,
+    )
+    if retry_count > 0:
+        logger.info(f"失敗投稿を更新: post_id={post_data['id']}, account={account_key}, retry_count={retry_count}")
+    else:
+        logger.info(f"失敗投稿を記録: post_id={post_data['id']}, account={account_key}")
 
 
 def remove_failed_post(post_id, account_key):
     """成功した投稿を失敗リストから削除する"""
-    failed_posts = load_failed_posts()
-    failed_posts = [fp for fp in failed_posts if not (fp['post_id'] == post_id and fp['account_key'] == account_key)]
-    save_failed_posts(failed_posts)
+    PostDatabase().remove_failed_post(post_id, account_key)
 
 
 # Windowsでの文字化け対策（環境変数を設定）
@@ -197,25 +113,19 @@ def post_blog_post_to_account(
         logger.info(f"@{twitter_handle} への投稿開始")
         logger.info(f"{'='*60}")
         
-        # 待機時間をチェック
-        if not check_and_wait_for_account(account_key, twitter_handle, skip_wait=False):
+        # 待機時間をチェック（待機はしない。待機が必要な場合は呼び出し側が投稿可能な時刻に再実行する）
+        if not check_and_wait_for_account(account_key, twitter_handle, skip_wait=True):
             logger.warning(f"@{twitter_handle}: 待機時間中のため、処理をスキップします")
             return False, None
         
-        poster = TwitterPoster(credentials, account_key=account_key, account_name=twitter_handle)
+        poster = get_poster(credentials, account_key=account_key, account_name=twitter_handle)
         
-        # ツイートテキストをフォーマット
-        tweet_text = poster.format_blog_post(
-            title=page_content.get('title', ''),
-            content=page_content.get('content', ''),
-            link=page_content.get('link', post_data.get('link', ''))
-        )
+        # 事前に整形済みのツイート（validate_tweets.py）を使う。未整形または内容・整形ルールが変わった場合はここで整形する
+        rendered = load_tweet(PostDatabase(), post_data['id'], account_key, page_content, post_data.get('link', ''))
+        tweet_text = rendered['tweet_text']
         
-        # リンク付きツイートを投稿（1回目）
-        result = poster.post_tweet_with_link(
-            text=tweet_text,
-            link=page_content.get('link', post_data.get('link', ''))
-        )
+        # ツイートを投稿（1回目）
+        result = poster.post_tweet(tweet_text)
 
         def on_success(res):
             clear_rate_limit_state(account_key)
@@ -269,98 +179,16 @@ def post_blog_post_to_account(
             )
             return False, status_code
 
-        def trim_first_word(text: str) -> str:
-            # 先頭に「…」がなければ付与（既にあれば増やさない）
-            has_leading_ellipsis = text.startswith("…")
-            body = text[1:] if has_leading_ellipsis else text
-            import re
-            # 語録番号が先頭にある場合は保持し、その後の先頭1語を削る
-            goroku_match = re.match(r"\s*(語録(?:\s*\([^)]+\)\s*)?[０-９0-9]+)\s*(.*)", body)
-            if goroku_match:
-                goroku = goroku_match.group(1)
-                rest = goroku_match.group(2).lstrip()
-                # 最初の単語を削除（英語・日本語両対応）
-                # パターン1: 「Ｊは言った。」のような場合、「Ｊは」だけを削除
-                # パターン2: 「J said,」のような場合、「J」だけを削除
-                # パターン3: 「said,」のような場合、「said,」を削除
-                
-                # まず「Ｊは」または「Jは」のパターンをチェック（空白がない場合も対応）
-                if rest.startswith('Ｊは') or rest.startswith('Jは'):
-                    # 「Ｊは」または「Jは」を削除
-                    trimmed_rest = rest[2:].lstrip()
-                    first_word = rest[:2]
-                    logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-                else:
-                    # 空白で区切られる単語を探す
-                    m2 = re.match(r"\s*([^\s]+)\s+(.*)", rest)
-                    if m2:
-                        first_word = m2.group(1)
-                        trimmed_rest = m2.group(2)
-                        # 1文字の英語の場合は、そのまま削除（「J」->「said,」）
-                        if len(first_word) == 1 and first_word.isalpha() and trimmed_rest:
-                            pass
-                        logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-                    else:
-                        # 空白がない場合、1単語を削除
-                        # 英語: 英単語1つ / 日本語: 助詞(は、が、の等)や句読点までの短い単位(最大5文字)
-                        m3 = re.match(r'^([A-Za-z]+[、，,。.]?|.{1,5}?[はがのをにで、，,。.「」]|.{1,3})', rest)
-                        if m3:
-                            first_word = m3.group(1)
-                            trimmed_rest = rest[len(first_word):]
-                            logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-                        else:
-                            # フォールバック: 最初の3文字を削除
-                            first_word = rest[:3] if len(rest) >= 3 else rest
-                            trimmed_rest = rest[len(first_word):]
-                            logger.warning(f"403エラー: フォールバック削除: '{first_word}'")
-                trimmed_rest = trimmed_rest.lstrip()
-                if trimmed_rest:
-                    if not trimmed_rest.startswith("…"):
-                        trimmed_rest = f"…{trimmed_rest}"
-                    return f"{goroku}\n{trimmed_rest}"
-                return goroku
-            # 語録番号がない場合
-            # まず「Ｊは」または「Jは」のパターンをチェック
-            if body.startswith('Ｊは') or body.startswith('Jは'):
-                # 「Ｊは」または「Jは」を削除
-                trimmed = body[2:].lstrip()
-                first_word = body[:2]
-                logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-            else:
-                # 空白で区切られる単語を探す
-                m = re.match(r"\s*([^\s]+)\s+(.*)", body)
-                if m:
-                    first_word = m.group(1)
-                    trimmed = m.group(2)
-                    logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-                else:
-                    # 空白がない場合、1単語を削除
-                    # 英語: 英単語1つ / 日本語: 助詞(は、が、の等)や句読点までの短い単位(最大5文字)
-                    m3 = re.match(r'^([A-Za-z]+[、，,。.]?|.{1,5}?[はがのをにで、，,。.「」]|.{1,3})', body)
-                    if m3:
-                        first_word = m3.group(1)
-                        trimmed = body[len(first_word):]
-                        logger.warning(f"403エラー: 削除された最初の単語: '{first_word}'")
-                    else:
-                        # フォールバック: 最初の3文字を削除
-                        first_word = body[:3] if len(body) >= 3 else body
-                        trimmed = body[len(first_word):]
-                        logger.warning(f"403エラー: フォールバック削除: '{first_word}'")
-            trimmed = trimmed.lstrip()
-            return ("…" if not has_leading_ellipsis else "…") + trimmed if trimmed else ("…" if not has_leading_ellipsis else body)
-
         if result and result.get('success'):
             return on_success(result)
         else:
             status_code = result.get("status") if isinstance(result, dict) else None
             if status_code == 403:
-                # 差し替えず、同一投稿で文頭を1語削って1回だけ再試行
-                trimmed_text = trim_first_word(tweet_text)
-                logger.warning("403のため、同一投稿で文頭1語削って再試行します (pursahs)")
-                retry_res = poster.post_tweet_with_link(
-                    text=trimmed_text,
-                    link=page_content.get('link', post_data.get('link', ''))
-                )
+                # 差し替えず、同一投稿で文頭を1語削って1回だけ再試行（再試行用のツイートは整形時に作成済み）
+                trimmed_text = rendered['fallback_text']
+                logger.warning(f"403のため、同一投稿で文頭1語削って再試行します (@{twitter_handle})")
+                logger.warning(f"403エラー: 再試行するツイート: {trimmed_text.splitlines()[0] if trimmed_text else ''}")
+                retry_res = poster.post_tweet(trimmed_text)
                 if retry_res and retry_res.get("success"):
                     unblocked = clear_blocked_posts(account_key)
                     if unblocked:
@@ -377,8 +205,168 @@ def post_blog_post_to_account(
         return False, None
 
 
-def main(only_account: str = None):
-    """メイン関数 - 両方のアカウントで投稿"""
+# 投稿するアカウント（この順に準備を始める）
+# (アカウントキー, 表示名, ブログ名, ブログURL, Twitterハンドル, 認証情報の取得関数)
+ACCOUNTS = [
+    ('pursahs', 'pursahsgospel', 'pursahsgospel (Ameba)',
+     Config.BLOG_PURSAHS_URL, Config.TWITTER_PURSAHS_HANDLE, Config.get_twitter_credentials_pursahs),
+    ('365bot', '365botGary', '365botGary (notesofacim.blog.fc2.com)',
+     Config.BLOG_365BOT_URL, Config.TWITTER_365BOT_HANDLE, Config.get_twitter_credentials_365bot),
+]
+
+
+def pick_post(db: PostDatabase, blog_url: str, handle: str, account_key: str):
+    # ブロックリストの投稿は選択クエリ内で除外する
+    return db.get_random_unposted_post(blog_url, handle, account_key=account_key)
+
+
+def refresh_posts_for_blog(db: PostDatabase, blog_url: str, blog_name: str) -> int:
+    """投稿リストを更新（前回の同期以降に追加・変更された投稿だけを取得してDBへ反映）"""
+    logger.info(f"\n{'='*60}")
+    logger.info(f"{blog_name} の投稿リストを更新: {blog_url}")
+    logger.info(f"{'='*60}")
+    result = sync_blog(blog_url, db)
+    logger.info(
+        f"{blog_name}: 追加 {len(result['added'])} 件 / 変更 {len(result['changed'])} 件"
+        f"（{result['source']}、リクエスト {result['requests']} 件）"
+    )
+    return len(result['added'])
+
+
+def load_page_content(db: PostDatabase, post_data: dict, label: str) -> dict:
+    """投稿のページコンテンツを取得（先読み済みのキャッシュを優先し、なければページを取得）"""
+    page_url = post_data.get('link', '')
+    cached = db.get_post_content(post_data['id'], max_age_hours=Config.POST_CONTENT_MAX_AGE_HOURS)
+    if cached:
+        logger.info(f"\n{label}用のコンテンツを先読みキャッシュから取得（取得日時: {cached['fetched_at']}）")
+        page_content = cached
+    else:
+        logger.info(f"\n{label}用のページからコンテンツを取得中...")
+        page_content = BlogFetcher(page_url).fetch_latest_post()
+        if not page_content:
+            logger.warning(f"ページコンテンツを取得できませんでした: {page_url}")
+            page_content = {
+                'title': post_data.get('title', ''),
+                'content': '',
+                'link': page_url,
+                'published_date': '',
+                'author': '',
+            }
+        else:
+            # キャッシュに保存（タイトルが変わった場合はデータベースのタイトルも更新）
+            db.save_post_content(post_data['id'], page_content)
+    logger.info(f"取得した投稿 ({label}): {page_content.get('title', 'タイトルなし')}")
+    return page_content
+
+
+class PostSpacer:
+    """
+    アカウント間の投稿間隔（連続投稿による一時ブロック防止）
+    
+    投稿のたびに（成功・失敗にかかわらず）前の投稿の開始から spacing 秒後以降の枠を予約する。
+    ロックは枠の予約の間だけ保持し、待機（asyncio.sleep）と投稿はロックの外で行うため、
+    その間も他のアカウントの候補選択・ページ取得・整形は進む。
+    """
+    
+    def __init__(self, spacing: float):
+        self.spacing = spacing
+        self._lock = asyncio.Lock()
+        self._not_before = 0.0
+    
+    async def post(self, label: str, func):
+        """予約した時刻まで待ってから func（同期関数、(成功, ステータス) を返す）をスレッドで実行"""
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._not_before)
+            self._not_before = start + self.spacing
+        wait = start - now
+        if wait > 0:
+            logger.info(f"{label}: {wait:.0f}秒待機してから投稿します（連続投稿防止）")
+            await asyncio.sleep(wait)
+        return await asyncio.to_thread(func)
+
+
+async def _prepare_account(db: PostDatabase, account: tuple):
+    """投稿を選択してページコンテンツを取得（投稿対象がない場合はNone）"""
+    account_key, label, blog_name, blog_url, twitter_handle, _ = account
+    logger.info(f"\n{label}用の投稿を検索中...")
+    post_data = await asyncio.to_thread(pick_post, db, blog_url, twitter_handle, account_key)
+    if not post_data:
+        logger.warning(f"未投稿のURLがありません: {blog_url} -> @{twitter_handle}")
+        await asyncio.to_thread(refresh_posts_for_blog, db, blog_url, blog_name)
+        post_data = await asyncio.to_thread(pick_post, db, blog_url, twitter_handle, account_key)
+        if not post_data:
+            logger.warning(f"再作成後も未投稿のURLがありません: {blog_url} -> @{twitter_handle}")
+            return None
+    page_url = post_data.get('link', '')
+    if not page_url:
+        logger.warning(f"URLが取得できませんでした: post_id={post_data.get('id')}")
+        return None
+    logger.info(f"選択したURL ({label}): {page_url}")
+    logger.info(f"投稿ID: {post_data['id']}")
+    page_content = await asyncio.to_thread(load_page_content, db, post_data, label)
+    return post_data, page_content
+
+
+async def _run_account(db: PostDatabase, account: tuple, spacer: PostSpacer):
+    """
+    1つのアカウントの準備と投稿
+    
+    Returns:
+        成功したか（投稿対象がない場合None、レート制限で延期した場合は投稿可能になる時刻）
+    """
+    account_key, label, _, blog_url, twitter_handle, get_credentials = account
+    # レート制限中のアカウントは待たずに延期する（他のアカウントの投稿は止めない）
+    not_before = await asyncio.to_thread(get_not_before, account_key, twitter_handle)
+    if not_before is not None:
+        logger.warning(f"{label}: レート制限中のため {not_before.strftime('%Y-%m-%d %H:%M:%S')} 以降に延期します")
+        return not_before
+    prepared = await _prepare_account(db, account)
+    if prepared is None:
+        logger.warning(f"{label}は投稿対象なしのためスキップします")
+        return None
+    post_data, page_content = prepared
+    success, _ = await spacer.post(label, lambda: post_blog_post_to_account(
+        post_data=post_data,
+        page_content=page_content,
+        blog_url=blog_url,
+        twitter_handle=twitter_handle,
+        credentials=get_credentials(),
+        account_key=account_key
+    ))
+    return success
+
+
+async def post_accounts(db: PostDatabase, accounts: List[tuple], spacing: float) -> Dict[str, object]:
+    """
+    複数のアカウントの投稿を並行して実行
+    
+    候補選択・ページ取得・整形はアカウントごとに並行して進め、投稿だけを PostSpacer で間隔をあけて1件ずつ行う。
+    
+    Returns:
+        アカウントキー -> 成功したか（投稿対象なしの場合None、延期した場合は投稿可能になる時刻）
+    """
+    spacer = PostSpacer(spacing)
+    results = await asyncio.gather(
+        *(_run_account(db, account, spacer) for account in accounts), return_exceptions=True
+    )
+    outcome = {}
+    for account, result in zip(accounts, results):
+        if isinstance(result, Exception):
+            logger.error(f"処理エラー ({account[1]}): {result}", exc_info=result)
+            result = False
+        outcome[account[0]] = result
+    return outcome
+
+
+def run_posts(only_account: str = None) -> Dict[str, object]:
+    """
+    両方のアカウントで投稿（only_account を指定した場合はそのアカウントのみ）
+    
+    Returns:
+        アカウントキー -> 成功したか（投稿対象なしの場合None、レート制限で延期した場合は投稿可能になる時刻）。
+        認証情報が設定されていない・処理エラーの場合は空の辞書
+    """
     logger.info("=" * 60)
     logger.info("ブログ→Twitter自動投稿ボット開始（両アカウント）")
     logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -386,305 +374,43 @@ def main(only_account: str = None):
     
     try:
         db = PostDatabase()
-        
-        # 365botGary用の認証情報とブログURL
-        credentials_365bot = Config.get_twitter_credentials_365bot()
-        blog_url_365bot = Config.BLOG_365BOT_URL
-        twitter_handle_365bot = Config.TWITTER_365BOT_HANDLE
-        
-        # pursahsgospel用の認証情報とブログURL
-        credentials_pursahs = Config.get_twitter_credentials_pursahs()
-        blog_url_pursahs = Config.BLOG_PURSAHS_URL
-        twitter_handle_pursahs = Config.TWITTER_PURSAHS_HANDLE
+        accounts = [account for account in ACCOUNTS if only_account in (None, account[0])]
         
         # 認証情報の確認
-        if not credentials_365bot.get('api_key') or not credentials_365bot.get('access_token'):
-            logger.error("Twitter API認証情報が設定されていません（365botGary）")
-            return False
-        
-        if not credentials_pursahs.get('api_key') or not credentials_pursahs.get('access_token'):
-            logger.error("Twitter API認証情報が設定されていません（pursahsgospel）")
-            return False
-        
-        def pick_post(blog_url, handle, account_key, max_try=10):
-            for _ in range(max_try):
-                cand = db.get_random_unposted_post(blog_url, handle)
-                if not cand:
-                    return None
-                if is_blocked(cand, account_key):
-                    logger.warning(f"ブロック対象のためスキップ: post_id={cand.get('id')}, account={account_key}")
-                    continue
-                return cand
-            return None
-
-        def refresh_posts_for_blog(blog_url: str, blog_name: str, max_posts: int = 500) -> int:
-            """投稿リストを再作成（ブログから全投稿を再取得してDBへ追加）"""
-            logger.info(f"\n{'='*60}")
-            logger.info(f"{blog_name} の投稿リストを再作成: {blog_url}")
-            logger.info(f"{'='*60}")
-            fetcher = BlogFetcher(blog_url)
-            posts = fetcher.fetch_all_posts(max_posts=max_posts)
-            if not posts:
-                logger.warning(f"投稿リストの再作成に失敗: {blog_url}")
-                return 0
-            saved_count = 0
-            for post in posts:
-                post_id = db.add_post(blog_url, post)
-                if post_id:
-                    saved_count += 1
-            logger.info(f"{blog_name}: 追加 {saved_count} 件 / 取得 {len(posts)} 件")
-            return saved_count
-
-        # 365botGaryのみ実行
-        if only_account == "365bot":
-            logger.info("\n[365botGaryのみ] 投稿を検索中...")
-            post_data_365bot = pick_post(blog_url_365bot, twitter_handle_365bot, '365bot')
-            if not post_data_365bot:
-                logger.warning(f"未投稿のURLがありません: {blog_url_365bot} -> @{twitter_handle_365bot}")
-                refresh_posts_for_blog(blog_url_365bot, "365botGary (notesofacim.blog.fc2.com)")
-                post_data_365bot = pick_post(blog_url_365bot, twitter_handle_365bot, '365bot')
-                if not post_data_365bot:
-                    logger.warning(f"再作成後も未投稿のURLがありません: {blog_url_365bot} -> @{twitter_handle_365bot}")
-                    return False
-            page_url_365bot = post_data_365bot.get('link', '')
-            if not page_url_365bot:
-                logger.warning(f"URLが取得できませんでした: post_id={post_data_365bot.get('id')}")
-                return False
-            logger.info(f"選択したURL (365botGary): {page_url_365bot}")
-            logger.info(f"投稿ID: {post_data_365bot['id']}")
-
-            logger.info(f"\n365botGary用のページからコンテンツを取得中...")
-            fetcher_365bot = BlogFetcher(page_url_365bot)
-            page_content_365bot = fetcher_365bot.fetch_latest_post()
-            if not page_content_365bot:
-                logger.warning(f"ページコンテンツを取得できませんでした: {page_url_365bot}")
-                page_content_365bot = {
-                    'title': post_data_365bot.get('title', ''),
-                    'content': '',
-                    'link': page_url_365bot,
-                    'published_date': '',
-                    'author': '',
-                }
-            else:
-                if page_content_365bot.get('title'):
-                    conn = sqlite3.connect(db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE posts SET title = ?, updated_at = ? WHERE id = ?',
-                                 (page_content_365bot.get('title'), datetime.now().isoformat(), post_data_365bot['id']))
-                    conn.commit()
-                    conn.close()
-
-            logger.info(f"取得した投稿 (365botGary): {page_content_365bot.get('title', 'タイトルなし')}")
-            success_365bot, _ = post_blog_post_to_account(
-                post_data=post_data_365bot,
-                page_content=page_content_365bot,
-                blog_url=blog_url_365bot,
-                twitter_handle=twitter_handle_365bot,
-                credentials=credentials_365bot,
-                account_key='365bot'
-            )
-            logger.info("\n" + "=" * 60)
-            logger.info("処理完了（365botGaryのみ）")
-            logger.info(f"365botGary: {'成功' if success_365bot else '失敗'}")
-            logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info("=" * 60)
-            return success_365bot
-
-        # pursahsgospelのみ実行
-        if only_account == "pursahs":
-            logger.info("\n[pursahsgospelのみ] 投稿を検索中...")
-            post_data_pursahs = pick_post(blog_url_pursahs, twitter_handle_pursahs, 'pursahs')
-            if not post_data_pursahs:
-                logger.warning(f"未投稿のURLがありません: {blog_url_pursahs} -> @{twitter_handle_pursahs}")
-                refresh_posts_for_blog(blog_url_pursahs, "pursahsgospel (Ameba)")
-                post_data_pursahs = pick_post(blog_url_pursahs, twitter_handle_pursahs, 'pursahs')
-                if not post_data_pursahs:
-                    logger.warning(f"再作成後も未投稿のURLがありません: {blog_url_pursahs} -> @{twitter_handle_pursahs}")
-                    return False
-            page_url_pursahs = post_data_pursahs.get('link', '')
-            if not page_url_pursahs:
-                logger.warning(f"URLが取得できませんでした: post_id={post_data_pursahs.get('id')}")
-                return False
-            logger.info(f"選択したURL (pursahsgospel): {page_url_pursahs}")
-            logger.info(f"投稿ID: {post_data_pursahs['id']}")
-
-            logger.info(f"\npursahsgospel用のページからコンテンツを取得中...")
-            fetcher_pursahs = BlogFetcher(page_url_pursahs)
-            page_content_pursahs = fetcher_pursahs.fetch_latest_post()
-            if not page_content_pursahs:
-                logger.warning(f"ページコンテンツを取得できませんでした: {page_url_pursahs}")
-                page_content_pursahs = {
-                    'title': post_data_pursahs.get('title', ''),
-                    'content': '',
-                    'link': page_url_pursahs,
-                    'published_date': '',
-                    'author': '',
-                }
-            else:
-                if page_content_pursahs.get('title'):
-                    conn = sqlite3.connect(db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE posts SET title = ?, updated_at = ? WHERE id = ?',
-                                 (page_content_pursahs.get('title'), datetime.now().isoformat(), post_data_pursahs['id']))
-                    conn.commit()
-                    conn.close()
-
-            logger.info(f"取得した投稿 (pursahsgospel): {page_content_pursahs.get('title', 'タイトルなし')}")
-            success_pursahs, _ = post_blog_post_to_account(
-                post_data=post_data_pursahs,
-                page_content=page_content_pursahs,
-                blog_url=blog_url_pursahs,
-                twitter_handle=twitter_handle_pursahs,
-                credentials=credentials_pursahs,
-                account_key='pursahs'
-            )
-            logger.info("\n" + "=" * 60)
-            logger.info("処理完了（pursahsgospelのみ）")
-            logger.info(f"pursahsgospel: {'成功' if success_pursahs else '失敗'}")
-            logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info("=" * 60)
-            return success_pursahs
-
-        # 365botGary用の投稿をランダムに1件取得（ブロック済みを除外）
-        logger.info(f"\n365botGary用の投稿を検索中...")
-        post_data_365bot = pick_post(blog_url_365bot, twitter_handle_365bot, '365bot')
-
-        if not post_data_365bot:
-            logger.warning(f"未投稿のURLがありません: {blog_url_365bot} -> @{twitter_handle_365bot}")
-            refresh_posts_for_blog(blog_url_365bot, "365botGary (notesofacim.blog.fc2.com)")
-            post_data_365bot = pick_post(blog_url_365bot, twitter_handle_365bot, '365bot')
-            if not post_data_365bot:
-                logger.warning(f"再作成後も未投稿のURLがありません: {blog_url_365bot} -> @{twitter_handle_365bot}")
-                return False
-        
-        page_url_365bot = post_data_365bot.get('link', '')
-        if not page_url_365bot:
-            logger.warning(f"URLが取得できませんでした: post_id={post_data_365bot.get('id')}")
-            return False
-        
-        logger.info(f"選択したURL (365botGary): {page_url_365bot}")
-        logger.info(f"投稿ID: {post_data_365bot['id']}")
-        
-        # pursahsgospel用の投稿をランダムに1件取得（ブロック済みを除外）
-        logger.info(f"\npursahsgospel用の投稿を検索中...")
-        post_data_pursahs = pick_post(blog_url_pursahs, twitter_handle_pursahs, 'pursahs')
-        
-        skip_pursahs = False
-        page_url_pursahs = ""
-        if not post_data_pursahs:
-            logger.warning(f"未投稿のURLがありません: {blog_url_pursahs} -> @{twitter_handle_pursahs}")
-            refresh_posts_for_blog(blog_url_pursahs, "pursahsgospel (Ameba)")
-            post_data_pursahs = pick_post(blog_url_pursahs, twitter_handle_pursahs, 'pursahs')
-            if not post_data_pursahs:
-                logger.warning(f"再作成後も未投稿のURLがありません: {blog_url_pursahs} -> @{twitter_handle_pursahs}")
-                skip_pursahs = True
-        else:
-            page_url_pursahs = post_data_pursahs.get('link', '')
-            if not page_url_pursahs:
-                logger.warning(f"URLが取得できませんでした: post_id={post_data_pursahs.get('id')}")
-                skip_pursahs = True
-            else:
-                logger.info(f"選択したURL (pursahsgospel): {page_url_pursahs}")
-                logger.info(f"投稿ID: {post_data_pursahs['id']}")
-        
-        # ページからコンテンツを取得（365botGary）
-        logger.info(f"\n365botGary用のページからコンテンツを取得中...")
-        fetcher_365bot = BlogFetcher(page_url_365bot)
-        page_content_365bot = fetcher_365bot.fetch_latest_post()
-        
-        if not page_content_365bot:
-            logger.warning(f"ページコンテンツを取得できませんでした: {page_url_365bot}")
-            page_content_365bot = {
-                'title': post_data_365bot.get('title', ''),
-                'content': '',
-                'link': page_url_365bot,
-                'published_date': '',
-                'author': '',
-            }
-        else:
-            # データベースのタイトルを更新
-            if page_content_365bot.get('title'):
-                conn = sqlite3.connect(db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('UPDATE posts SET title = ?, updated_at = ? WHERE id = ?', 
-                             (page_content_365bot.get('title'), datetime.now().isoformat(), post_data_365bot['id']))
-                conn.commit()
-                conn.close()
-        
-        logger.info(f"取得した投稿 (365botGary): {page_content_365bot.get('title', 'タイトルなし')}")
+        for account_key, label, _, _, _, get_credentials in accounts:
+            credentials = get_credentials()
+            if not credentials.get('api_key') or not credentials.get('access_token'):
+                logger.error(f"Twitter API認証情報が設定されていません（{label}）")
+                return {}
         
-        # ページからコンテンツを取得（pursahsgospel）
-        page_content_pursahs = None
-        if not skip_pursahs:
-            logger.info(f"\npursahsgospel用のページからコンテンツを取得中...")
-            fetcher_pursahs = BlogFetcher(page_url_pursahs)
-            page_content_pursahs = fetcher_pursahs.fetch_latest_post()
-            
-            if not page_content_pursahs:
-                logger.warning(f"ページコンテンツを取得できませんでした: {page_url_pursahs}")
-                page_content_pursahs = {
-                    'title': post_data_pursahs.get('title', ''),
-                    'content': '',
-                    'link': page_url_pursahs,
-                    'published_date': '',
-                    'author': '',
-                }
-            else:
-                # データベースのタイトルを更新
-                if page_content_pursahs.get('title'):
-                    conn = sqlite3.connect(db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE posts SET title = ?, updated_at = ? WHERE id = ?', 
-                                 (page_content_pursahs.get('title'), datetime.now().isoformat(), post_data_pursahs['id']))
-                    conn.commit()
-                    conn.close()
-            
-            logger.info(f"取得した投稿 (pursahsgospel): {page_content_pursahs.get('title', 'タイトルなし')}")
-        
-        # 両方のアカウントで投稿（順番を pursahs → 365bot に変更）
-        if skip_pursahs:
-            success_pursahs, status_pursahs = False, None
-            logger.warning("pursahsgospelは投稿対象なしのためスキップします")
-        else:
-            success_pursahs, status_pursahs = post_blog_post_to_account(
-                post_data=post_data_pursahs,
-                page_content=page_content_pursahs,
-                blog_url=blog_url_pursahs,
-                twitter_handle=twitter_handle_pursahs,
-                credentials=credentials_pursahs,
-                account_key='pursahs'
-            )
-
-        # pursahs → 365bot の間に60秒待機（連続投稿による一時ブロック防止）
-        if success_pursahs:
-            logger.info("60秒待機中（連続投稿防止）...")
-            time.sleep(60)
-
-        success_365bot, status_365bot = post_blog_post_to_account(
-            post_data=post_data_365bot,
-            page_content=page_content_365bot,
-            blog_url=blog_url_365bot,
-            twitter_handle=twitter_handle_365bot,
-            credentials=credentials_365bot,
-            account_key='365bot'
-        )
+        start = time.monotonic()
+        results = asyncio.run(post_accounts(db, accounts, Config.POST_SPACING_SECONDS))
         
         # 結果サマリー
         logger.info("\n" + "=" * 60)
-        logger.info("処理完了（両アカウント）")
-        logger.info(f"365botGary: {'成功' if success_365bot else '失敗'}")
-        if skip_pursahs:
-            logger.info("pursahsgospel: スキップ")
-        else:
-            logger.info(f"pursahsgospel: {'成功' if success_pursahs else '失敗'}")
+        logger.info(f"処理完了（{'両アカウント' if only_account is None else f'{only_account}のみ'}、{time.monotonic() - start:.0f}秒）")
+        for account_key, label, *_ in accounts:
+            result = results[account_key]
+            if isinstance(result, datetime):
+                status = f"延期（{result.strftime('%Y-%m-%d %H:%M:%S')} 以降）"
+            else:
+                status = 'スキップ' if result is None else '成功' if result else '失敗'
+            logger.info(f"{label}: {status}")
         logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log_connection_stats()
         logger.info("=" * 60)
-        
-        return success_365bot if skip_pursahs else (success_365bot and success_pursahs)
+        return results
         
     except Exception as e:
         logger.error(f"処理エラー: {e}", exc_info=True)
-        return False
+        return {}
+
+
+def main(only_account: str = None):
+    """メイン関数 - 両方のアカウントで投稿（延期したアカウントは失敗として扱う）"""
+    results = run_posts(only_account)
+    posted = [result for result in results.values() if result is not None]
+    return bool(posted) and all(result is True for result in posted)
 
 
 if __name__ == "__main__":
@@ -709,13 +435,3 @@ if __name__ == "__main__":
             if isinstance(handler, logging.FileHandler):
                 handler.flush()
                 handler.close()
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,83 @@
+"""
+投稿タイトルの分類モジュール
+Day番号・語録番号・索引・原書の判定を1か所にまとめる（全角数字・全角括弧に対応）
+"""
+import re
+from typing import Dict, Optional
+
+# 全角数字・全角括弧・全角空白を半角に正規化する変換表
+_NORMALIZE_TABLE = str.maketrans('０１２３４５６７８９（）　', '0123456789() ')
+
+# Day番号: 「Day001」～「Day365」（従来どおり大文字小文字を区別し、3桁の番号のみ）
+_DAY_PATTERN = re.compile(r'Day(\d{3})')
+
+# 語録番号: 「語録１」「語録 (Logion) １」「語録(１)」など（正規化後の文字列に適用）
+_GOROKU_PATTERNS = [
+    re.compile(r'語録\s*(?:\([^)]*\)\s*)?(\d{1,3})(?!\d)'),
+    re.compile(r'語録\s*\(\s*(\d{1,3})\s*\)'),
+]
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """全角数字・全角括弧・全角空白を半角に変換"""
+    return (text or '').translate(_NORMALIZE_TABLE)
+
+
+def extract_day_number(text: Optional[str]) -> Optional[int]:
+    """
+    テキストからDay番号を抽出
+
+    Args:
+        text: タイトルなど
+
+    Returns:
+        Day番号、見つからない場合None
+    """
+    match = _DAY_PATTERN.search(normalize_text(text))
+    return int(match.group(1)) if match else None
+
+
+def extract_goroku_number(text: Optional[str]) -> Optional[int]:
+    """
+    テキストから語録番号を抽出（全角数字は半角に変換）
+
+    Args:
+        text: タイトルやリンクテキストなど
+
+    Returns:
+        語録番号、見つからない場合None
+    """
+    normalized = normalize_text(text)
+    if '語録' not in normalized:
+        return None
+    for pattern in _GOROKU_PATTERNS:
+        match = pattern.search(normalized)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def classify_title(title: Optional[str]) -> Dict[str, object]:
+    """
+    タイトルから投稿の分類を求める（posts テーブルの分類カラムに保存する値）
+
+    Args:
+        title: 投稿タイトル
+
+    Returns:
+        以下のキーを持つ辞書
+        - is_index: 「索引」を含む場合1
+        - day_number: Day番号（なければNone）
+        - goroku_number: 語録番号（なければNone）
+        - is_goroku: 「語録」を含み『原書』を含まない場合1
+        - is_original_text: 『原書』を含む場合1
+    """
+    title = title or ''
+    is_original_text = '原書' in title
+    return {
+        'is_index': 1 if '索引' in title else 0,
+        'day_number': extract_day_number(title),
+        'goroku_number': extract_goroku_number(title),
+        'is_goroku': 1 if ('語録' in title and not is_original_text) else 0,
+        'is_original_text': 1 if is_original_text else 0,
+    }
@@ -0,0 +1,103 @@
+"""
+次に投稿する候補のページコンテンツを先読みするスクリプト
+各アカウントの未投稿の候補を選び、ページを取得して post_content テーブルに保存する
+（投稿時はこのキャッシュを使い、ページ取得を待たない）
+"""
+import argparse
+import logging
+import sys
+from typing import Optional
+from database import PostDatabase
+from blog_fetcher import BlogFetcher
+from config import Config
+from http_cache import set_offline_mode
+from http_session import get_session, log_connection_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def prefetch_for_account(
+    db: PostDatabase,
+    blog_url: str,
+    twitter_handle: str,
+    account_key: str,
+    count: int,
+    max_age_hours: float,
+    session=None
+) -> int:
+    """
+    アカウントの次の候補をcount件選び、コンテンツが未取得または古いものを取得する
+    
+    Returns:
+        取得・保存した件数
+    """
+    candidates = db.get_random_unposted_posts(
+        blog_url, twitter_handle, limit=count, account_key=account_key, prefer_cached=True
+    )
+    fetched = 0
+    for post in candidates:
+        if db.get_post_content(post['id'], max_age_hours=max_age_hours):
+            logger.info(f"@{twitter_handle}: 取得済み post_id={post['id']} {post.get('title', '')[:40]}")
+            continue
+        link = post.get('link', '')
+        if not link:
+            continue
+        page_content = BlogFetcher(link, session=session).fetch_latest_post()
+        if not page_content:
+            logger.warning(f"@{twitter_handle}: ページコンテンツを取得できませんでした: {link}")
+            continue
+        page_content['link'] = link
+        changed = db.save_post_content(post['id'], page_content)
+        fetched += 1
+        logger.info(
+            f"@{twitter_handle}: 先読み post_id={post['id']} {page_content.get('title', '')[:40]}"
+            f"{'' if changed else '（変更なし）'}"
+        )
+    return fetched
+
+
+def main(count: Optional[int] = None, only_account: Optional[str] = None, max_age_hours: Optional[float] = None):
+    """メイン関数"""
+    count = count if count is not None else Config.PREFETCH_COUNT
+    max_age_hours = max_age_hours if max_age_hours is not None else Config.POST_CONTENT_MAX_AGE_HOURS
+    logger.info("=" * 60)
+    logger.info(f"投稿候補の先読み（各アカウント {count}件）")
+    logger.info("=" * 60)
+    
+    db = PostDatabase()
+    session = get_session()
+    accounts = [
+        ('365bot', Config.BLOG_365BOT_URL, Config.TWITTER_365BOT_HANDLE),
+        ('pursahs', Config.BLOG_PURSAHS_URL, Config.TWITTER_PURSAHS_HANDLE),
+    ]
+    total = 0
+    for account_key, blog_url, twitter_handle in accounts:
+        if only_account and account_key != only_account:
+            continue
+        try:
+            total += prefetch_for_account(db, blog_url, twitter_handle, account_key, count, max_age_hours, session)
+        except Exception as e:
+            logger.error(f"@{twitter_handle}: 先読みエラー: {e}", exc_info=True)
+    
+    logger.info(f"先読み完了: {total}件取得")
+    log_connection_stats(session)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='投稿候補のページコンテンツを先読み')
+    parser.add_argument('--count', type=int, default=None, help='アカウントごとの候補数')
+    parser.add_argument('--account', choices=['pursahs', '365bot'], help='指定アカウントのみ')
+    parser.add_argument('--max-age-hours', type=float, default=None, help='これより古い取得済みコンテンツは取得し直す')
+    parser.add_argument('--offline', action='store_true', help='ネットワークに接続せずHTTPキャッシュのみから取得')
+    args = parser.parse_args()
+    if args.offline:
+        set_offline_mode(True)
+    main(count=args.count, only_account=args.account, max_age_hours=args.max_age_hours)
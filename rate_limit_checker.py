@@ -2,11 +2,15 @@
 レート制限待機時間チェックモジュール
 すべてのスクリプトで共通して使用する
 """
+import copy
 import json
 import os
+import tempfile
+import threading
 import time
 import sys
-from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import logging
 
 # Windowsでの文字化け対策（環境変数を設定）
@@ -17,44 +21,146 @@ logger = logging.getLogger(__name__)
 
 # 待機時間管理ファイル
 RATE_LIMIT_STATE_FILE = "rate_limit_state.json"
+# 読み込み・更新を排他するためのロックファイル（スケジューラとリトライが同時に更新しても失われないようにする）
+RATE_LIMIT_LOCK_FILE = RATE_LIMIT_STATE_FILE + ".lock"
 
+# アカウントごとの状態の項目
+STATE_FIELDS = (
+    'wait_until', 'reset_time', 'reason', 'error_time', 'api_endpoint', 'error_message',
+    'rate_limit_limit', 'rate_limit_remaining', 'used_count',
+)
 
-def load_rate_limit_state():
-    """待機時間の状態を読み込む"""
-    if os.path.exists(RATE_LIMIT_STATE_FILE):
+# プロセス内キャッシュ（ファイルの更新時刻・サイズが変わったら読み直す）
+_state_cache = {'stamp': None, 'state': None}
+_state_lock = threading.Lock()
+
+
+def _empty_account_state() -> dict:
+    """空の（待機なしの）アカウント状態"""
+    return {field: None for field in STATE_FIELDS}
+
+
+def _default_state() -> dict:
+    return {
+        '365bot': _empty_account_state(),
+        'pursahs': _empty_account_state(),
+    }
+
+
+@contextmanager
+def _state_file_lock():
+    """状態ファイルの排他ロック（プロセス間はアドバイザリロック、プロセス内はスレッドロック）"""
+    with _state_lock:
+        with open(RATE_LIMIT_LOCK_FILE, 'a+b') as lock_file:
+            if sys.platform == 'win32':
+                import msvcrt
+                lock_file.seek(0)
+                # LK_LOCK は取得できるまで再試行する
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _file_stamp():
+    """状態ファイルの更新時刻とサイズ（存在しない場合None）"""
+    try:
+        st = os.stat(RATE_LIMIT_STATE_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_state_file() -> dict:
+    """状態ファイルを読み込む（キャッシュが最新ならファイルを読まない）"""
+    stamp = _file_stamp()
+    if stamp is not None and stamp == _state_cache['stamp']:
+        return copy.deepcopy(_state_cache['state'])
+    
+    state = None
+    if stamp is not None:
         try:
             # WindowsのOut-File等でUTF-8 BOM付きになることがあるため utf-8-sig を使用
             with open(RATE_LIMIT_STATE_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
+                state = json.load(f)
         except Exception as e:
             logger.warning(f"状態ファイルの読み込みエラー: {e}")
-    return {
-        '365bot': {
-            'wait_until': None,
-            'reset_time': None,
-            'reason': None,
-            'error_time': None,
-            'api_endpoint': None,
-            'error_message': None
-        },
-        'pursahs': {
-            'wait_until': None,
-            'reset_time': None,
-            'reason': None,
-            'error_time': None,
-            'api_endpoint': None,
-            'error_message': None
-        }
-    }
+    if not isinstance(state, dict):
+        state = _default_state()
+    
+    _state_cache['stamp'] = stamp
+    _state_cache['state'] = copy.deepcopy(state)
+    return state
 
 
-def save_rate_limit_state(state):
-    """待機時間の状態を保存する"""
+def _write_state_file(state: dict):
+    """状態ファイルを一時ファイル経由で置き換える（書き込み途中の内容を他プロセスに読ませない）"""
+    directory = os.path.dirname(os.path.abspath(RATE_LIMIT_STATE_FILE))
+    fd, tmp_path = tempfile.mkstemp(prefix='.rate_limit_state.', suffix='.tmp', dir=directory)
     try:
-        with open(RATE_LIMIT_STATE_FILE, 'w', encoding='utf-8') as f:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
             json.dump(state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, RATE_LIMIT_STATE_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _state_cache['stamp'] = _file_stamp()
+    _state_cache['state'] = copy.deepcopy(state)
+
+
+def load_rate_limit_state():
+    """待機時間の状態を読み込む"""
+    return _read_state_file()
+
+
+def save_rate_limit_state(state):
+    """待機時間の状態を保存する（全体を置き換え）"""
+    try:
+        with _state_file_lock():
+            _write_state_file(state)
+    except Exception as e:
+        logger.error(f"状態ファイルの保存エラー: {e}")
+
+
+def update_rate_limit_state(account_key: str, patch: dict) -> bool:
+    """
+    アカウントの状態のうち指定した項目だけを更新する
+    
+    ロックを取得してから最新のファイルを読み直し、他アカウントや他の項目はそのまま残す。
+    値が変わらない場合はファイルを書き込まない。
+    
+    Args:
+        account_key: アカウントキー（'365bot' または 'pursahs'）
+        patch: 更新する項目と値
+    
+    Returns:
+        ファイルを更新した場合True
+    """
+    try:
+        with _state_file_lock():
+            state = _read_state_file()
+            account_state = state.get(account_key) or _empty_account_state()
+            if all(account_state.get(key) == value for key, value in patch.items()):
+                return False
+            account_state.update(patch)
+            state[account_key] = account_state
+            _write_state_file(state)
+            return True
     except Exception as e:
         logger.error(f"状態ファイルの保存エラー: {e}")
+        return False
 
 
 def clear_rate_limit_state(account_key: str):
@@ -64,20 +170,10 @@ def clear_rate_limit_state(account_key: str):
     Args:
         account_key: アカウントキー（'365bot' または 'pursahs'）
     """
-    state = load_rate_limit_state()
-    if account_key in state:
-        state[account_key] = {
-            'wait_until': None,
-            'reset_time': None,
-            'reason': None,
-            'error_time': None,
-            'api_endpoint': None,
-            'error_message': None,
-            'rate_limit_limit': None,
-            'rate_limit_remaining': None,
-            'used_count': None
-        }
-        save_rate_limit_state(state)
+    if account_key not in load_rate_limit_state():
+        return
+    # 既にクリア済みの場合はファイルを書き換えない
+    if update_rate_limit_state(account_key, _empty_account_state()):
         logger.info(f"{account_key} アカウント: レート制限状態をクリアしました（投稿成功のため）")
 
 
@@ -105,14 +201,13 @@ def record_rate_limit_reason(
         rate_limit_limit: レート制限の上限（x-rate-limit-limit）
         rate_limit_remaining: 残りのリクエスト数（x-rate-limit-remaining）
     """
-    state = load_rate_limit_state()
     now = datetime.now()
     
     used_count = None
     if rate_limit_limit is not None and rate_limit_remaining is not None:
         used_count = rate_limit_limit - rate_limit_remaining
     
-    state[account_key] = {
+    update_rate_limit_state(account_key, {
         'wait_until': wait_until.isoformat() if wait_until else None,
         'reset_time': reset_time.isoformat() if reset_time else None,
         'reason': reason,
@@ -122,9 +217,7 @@ def record_rate_limit_reason(
         'rate_limit_limit': rate_limit_limit,
         'rate_limit_remaining': rate_limit_remaining,
         'used_count': used_count  # 15分間のウィンドウ内でカウントされているリクエスト数
-    }
-    
-    save_rate_limit_state(state)
+    })
     logger.warning(f"{account_name}: レート制限の原因を記録しました。")
     logger.warning(f"  APIエンドポイント: {api_endpoint}")
     logger.warning(f"  エラー発生時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -137,13 +230,70 @@ def record_rate_limit_reason(
         logger.warning(f"    15分間のウィンドウ内で {used_count} リクエストがカウントされています")
 
 
+# 429でリセット時刻が不明な場合に投稿を再開するまでの時間（秒）
+UNKNOWN_RESET_WAIT_SECONDS = 900
+
+
+def _to_local(value: datetime) -> datetime:
+    """タイムゾーン付きの時刻をローカル時刻（タイムゾーンなし）に揃える"""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def get_not_before(account_key: str, account_name: str):
+    """
+    アカウントが次に投稿できる時刻（待機しない）
+    
+    保存された状態（rate_limit_state.json）のみを確認する
+    （create_tweetでレート制限を確認すると実際に投稿されてしまうため）。
+    - reset_time（XのAPIから取得した実際のリセット時刻）があればその時刻
+    - reset_time がなければ wait_until
+    - 429でどちらも不明な場合は UNKNOWN_RESET_WAIT_SECONDS 秒後（その時刻を wait_until として記録し、
+      次回の確認で待機が延び続けないようにする）
+    - 文字数由来のエラー（length_error）は待っても改善しないため待機しない
+    
+    Returns:
+        投稿可能になる時刻（ローカル時刻）。今すぐ投稿できる場合はNone
+    """
+    account_state = load_rate_limit_state().get(account_key, {})
+    reason = account_state.get('reason')
+    if reason == 'length_error':
+        logger.warning(f"{account_name} アカウント: 文字数由来のエラー（length_error）として記録されています。待機せず続行します。")
+        return None
+    
+    now = datetime.now()
+    reset_time_str = account_state.get('reset_time')
+    wait_until_str = account_state.get('wait_until')
+    if reset_time_str:
+        not_before = _to_local(datetime.fromisoformat(reset_time_str))
+    elif wait_until_str and wait_until_str != 'None':
+        not_before = _to_local(datetime.fromisoformat(wait_until_str))
+    elif reason == '429 Too Many Requests':
+        logger.warning(f"{account_name} アカウント: レート制限が発生しましたが、リセット時刻が不明です。")
+        logger.warning(f"  {UNKNOWN_RESET_WAIT_SECONDS // 60}分後まで投稿を延期します（実際のリセット時刻と異なる可能性があります）。")
+        not_before = now + timedelta(seconds=UNKNOWN_RESET_WAIT_SECONDS)
+        update_rate_limit_state(account_key, {'wait_until': not_before.isoformat()})
+    else:
+        # レート制限が発生していない（429以外の 403 などはここではブロックしない）
+        return None
+    
+    if not_before <= now:
+        logger.info(f"{account_name} アカウント: 待機時刻を過ぎています。投稿可能です。")
+        return None
+    remaining = (not_before - now).total_seconds()
+    logger.warning(
+        f"{account_name} アカウント: レート制限待機中（{not_before.strftime('%Y-%m-%d %H:%M:%S')} まで、"
+        f"残り {int(remaining)} 秒（{int(remaining // 60)} 分））"
+    )
+    return not_before
+
+
 def check_and_wait_for_account(account_key: str, account_name: str, skip_wait: bool = False, credentials: dict = None):
     """
     アカウントの待機時間をチェックし、必要に応じて待機する
     
-    注意: create_tweetでレート制限を確認すると実際に投稿されてしまうため、
-    保存された状態（rate_limit_state.json）のみを確認する。
-    実際のレート制限は、投稿時に429エラーが発生した際に記録される。
+    スケジューラからは待機せず（skip_wait=True、または get_not_before で投稿可能な時刻を取得して
+    その時刻に再実行する）、他のアカウントの処理を止めないようにする。
+    skip_wait=False の待機は手動実行用。
     
     Args:
         account_key: アカウントキー（'365bot' または 'pursahs'）
@@ -155,292 +305,12 @@ def check_and_wait_for_account(account_key: str, account_name: str, skip_wait: b
         True: 待機が完了した、または待機不要（投稿可能）
         False: 待機中（投稿不可）
     """
-    # 保存された状態を確認（create_tweetで確認すると投稿されてしまうため、保存された状態のみ確認）
-    state = load_rate_limit_state()
-    account_state = state.get(account_key, {})
-    reason = account_state.get('reason')
-    if reason == 'length_error':
-        # 文字数由来なら待っても改善しない（ユーザー要望）
-        logger.warning(f"{account_name} アカウント: 文字数由来のエラー（length_error）として記録されています。待機せず続行します。")
+    not_before = get_not_before(account_key, account_name)
+    if not_before is None:
         return True
-    
-    # reset_timeを優先的に確認（XのAPIから取得した実際のリセット時刻）
-    reset_time_str = account_state.get('reset_time')
-    
-    # reset_timeがNoneの場合、wait_untilを確認（過去の時刻なら問題なし）
-    if not reset_time_str:
-        # wait_untilを確認（過去の時刻なら問題なし）
-        wait_until_str = account_state.get('wait_until')
-        if wait_until_str and wait_until_str != 'None':
-            wait_until = datetime.fromisoformat(wait_until_str)
-            if wait_until.tzinfo is not None:
-                now = datetime.now(timezone.utc)
-            else:
-                now = datetime.now()
-            
-            if wait_until <= now:
-                # wait_untilが過去の時刻なら、問題なし（投稿可能）
-                logger.info(f"{account_name} アカウント: 待機時刻を過ぎています。投稿可能です。")
-                return True
-            # wait_until が未来なら、その時刻まで待機 or スキップ
-            wait_seconds = (wait_until - now).total_seconds()
-            if skip_wait:
-                logger.warning(f"{account_name} アカウント: 待機中のためスキップします（残り {int(wait_seconds)} 秒）")
-                return False
-            logger.info(f"{account_name} アカウント: 待機中（{int(wait_seconds)} 秒）...")
-            time.sleep(max(0, int(wait_seconds)))
-            return True
-        
-        # 429（レート制限）の場合のみ、reset_time不明時の保守的待機/スキップを行う
-        if reason == '429 Too Many Requests':
-            logger.warning(f"{account_name} アカウント: レート制限が発生しましたが、リセット時刻が不明です。")
-            logger.warning(f"  15分待っても、実際のリセット時刻が15分後ではない可能性があります。")
-            logger.warning(f"  安全のため、投稿をスキップします。")
-            if skip_wait:
-                return False  # 不明のため、投稿不可
-            else:
-                # 不明の場合は、実際のAPIを呼び出してreset_timeを取得する必要がある
-                # しかし、APIを呼び出すとレート制限を消費する可能性があるため、
-                # 安全のため、15分待機してから再試行（ただし、正確ではない可能性がある）
-                logger.warning(f"  注意: 15分待機しますが、実際のリセット時刻が15分後ではない可能性があります。")
-                logger.warning(f"  再試行時に429エラーが発生した場合は、その時点でreset_timeを取得します。")
-                time.sleep(900)  # 15分 = 900秒
-                return True
-        
-        # 429以外（例: 403など）はレート制限ではないので、ここではブロックしない
-        return True
-    
-    if reset_time_str:
-        reset_time = datetime.fromisoformat(reset_time_str)
-        # reset_timeがUTCタイムゾーン付きの場合は、UTCで比較
-        # そうでない場合は、ローカルタイムゾーンで比較
-        if reset_time.tzinfo is not None:
-            now = datetime.now(timezone.utc)
-        else:
-            now = datetime.now()
-        
-        if reset_time > now:
-            # reset_timeがまだ来ていない場合は、reset_timeまで待機
-            wait_seconds = (reset_time - now).total_seconds()
-            
-            if skip_wait:
-                logger.warning(f"{account_name} アカウント: レート制限待機中（待機時間をスキップします）")
-                logger.warning(f"  リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.warning(f"  残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-                return False
-            
-            print(f"\n{'='*60}")
-            print(f"{account_name} アカウント: レート制限待機中（XのAPIリセット時刻まで）")
-            print(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-            print(f"{'='*60}")
-            sys.stdout.flush()
-            logger.info(f"\n{'='*60}")
-            logger.info(f"{account_name} アカウント: レート制限待機中（XのAPIリセット時刻まで）")
-            logger.info(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-            logger.info(f"{'='*60}")
-            
-            # 待機時間が長い場合（5分以上）は、定期的に残り時間を表示しながら待機
-            if wait_seconds > 300:  # 5分以上
-                logger.info("待機中にコードを修正できます。")
-                logger.info("修正が完了したら、このスクリプトを再実行してください。")
-                logger.info(f"待機時間が終わったら自動的に再実行されます。")
-                logger.info(f"{'='*60}\n")
-                
-                # 待機中に修正を行えるように、待機時間を表示しながら待機
-                last_logged = 0
-                while wait_seconds > 0:
-                    time.sleep(60)  # 1分ごとにチェック
-                    if reset_time.tzinfo is not None:
-                        wait_seconds = (reset_time - datetime.now(timezone.utc)).total_seconds()
-                    else:
-                        wait_seconds = (reset_time - datetime.now()).total_seconds()
-                    
-                    # 5分ごとにログを出力
-                    if int(wait_seconds) % 300 < 60 and int(wait_seconds) != last_logged:
-                        logger.info(f"待機中... 残り {int(wait_seconds // 60)} 分")
-                        last_logged = int(wait_seconds)
-                
-                logger.info(f"待機時間が終了しました。続行します。")
-                return True
-            else:
-                # 5分未満の場合は、そのまま待機
-                logger.info(f"待機中... 残り {int(wait_seconds // 60)} 分")
-                time.sleep(int(wait_seconds))
-                logger.info(f"待機時間が終了しました。続行します。")
-                return True
-        else:
-            # reset_timeが過ぎている場合は、待機不要
-            logger.info(f"{account_name} アカウント: リセット時刻を過ぎています。投稿可能です。")
-            return True
-    
-    # reset_timeがない場合は、wait_untilを確認（後方互換性のため）
-    # ただし、wait_untilがNoneの場合は不明として扱う
-    wait_until_str = account_state.get('wait_until')
-    if wait_until_str and wait_until_str != 'None':
-        wait_until = datetime.fromisoformat(wait_until_str)
-        # wait_untilがUTCタイムゾーン付きの場合は、UTCで比較
-        # そうでない場合は、ローカルタイムゾーンで比較
-        if wait_until.tzinfo is not None:
-            now = datetime.now(timezone.utc)
-        else:
-            now = datetime.now()
-        
-        if wait_until > now:
-            # まだ待機中
-            wait_seconds = (wait_until - now).total_seconds()
-            
-            if skip_wait:
-                logger.warning(f"{account_name} アカウント: レート制限待機中（待機時間をスキップします）")
-                logger.warning(f"  待機終了時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.warning(f"  残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-                return False
-            
-            print(f"\n{'='*60}")
-            print(f"{account_name} アカウント: レート制限待機中")
-            print(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"待機終了時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-            print(f"{'='*60}")
-            sys.stdout.flush()
-            logger.info(f"\n{'='*60}")
-            logger.info(f"{account_name} アカウント: レート制限待機中")
-            logger.info(f"現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"待機終了時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-            logger.info(f"{'='*60}")
-            
-            # 待機時間が長い場合（5分以上）は、定期的に残り時間を表示しながら待機
-            if wait_seconds > 300:  # 5分以上
-                logger.info("待機中にコードを修正できます。")
-                logger.info("修正が完了したら、このスクリプトを再実行してください。")
-                logger.info(f"待機時間が終わったら自動的に再実行されます。")
-                logger.info(f"{'='*60}\n")
-                
-                # 待機中に修正を行えるように、待機時間を表示しながら待機
-                last_logged = 0
-                while wait_until > (datetime.now(timezone.utc) if wait_until.tzinfo is not None else datetime.now()):
-                    if wait_until.tzinfo is not None:
-                        remaining = (wait_until - datetime.now(timezone.utc)).total_seconds()
-                    else:
-                        remaining = (wait_until - datetime.now()).total_seconds()
-                    if remaining > 0:
-                        # 1分ごとに残り時間を表示
-                        if int(remaining) != last_logged and (int(remaining) % 60 == 0 or remaining < 60):
-                            logger.info(f"残り待機時間: {int(remaining)} 秒（{int(remaining // 60)} 分）")
-                            logger.info(f"次の実行予定時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-                            last_logged = int(remaining)
-                        time.sleep(min(60, remaining))  # 最大60秒待機
-                    else:
-                        break
-            else:
-                # 短い待機時間の場合は、そのまま待機
-                print(f"短い待機時間のため、自動的に待機します。")
-                print(f"次の実行予定時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"{'='*60}\n")
-                sys.stdout.flush()
-                logger.info(f"短い待機時間のため、自動的に待機します。")
-                logger.info(f"次の実行予定時刻: {wait_until.strftime('%Y-%m-%d %H:%M:%S')}")
-                logger.info(f"{'='*60}\n")
-                time.sleep(wait_seconds)
-            
-            logger.info(f"\n{'='*60}")
-            logger.info(f"待機時間が終了しました。{account_name} アカウントの投稿を再試行します。")
-            logger.info(f"{'='*60}")
-            # 待機時間をクリア（最新の状態を読み込んでからクリア）
-            state = load_rate_limit_state()  # 最新の状態を読み込む
-            reset_time_str = state.get(account_key, {}).get('reset_time')
-            
-            # リセット時刻を確認（Twitter API側で実際にリセットされるまで待機）
-            if reset_time_str:
-                reset_time = datetime.fromisoformat(reset_time_str)
-                if reset_time.tzinfo is not None:
-                    now = datetime.now(timezone.utc)
-                else:
-                    now = datetime.now()
-                if reset_time > now:
-                    # リセット時刻がまだ来ていない場合は、リセット時刻まで待機
-                    wait_seconds = (reset_time - now).total_seconds()
-                    logger.info(f"{account_name}: リセット時刻まで待機します。")
-                    logger.info(f"  リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                    logger.info(f"  現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-                    logger.info(f"  残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-                    # 10秒の余裕を持たせる
-                    wait_until_reset = reset_time + timedelta(seconds=10)
-                    if wait_until_reset > now:
-                        wait_seconds = (wait_until_reset - now).total_seconds()
-                        time.sleep(wait_seconds)
-                        logger.info(f"{account_name}: リセット時刻が過ぎました。投稿を再試行します。")
-            
-            # 待機時間をクリア
-            state = load_rate_limit_state()  # 最新の状態を読み込む
-            state[account_key] = {
-                'wait_until': None,
-                'reset_time': None
-            }
-            save_rate_limit_state(state)
-            logger.info(f"{account_name}: 待機時間をクリアしました")
-            return True  # 待機完了、投稿可能
-        else:
-            # wait_untilが過ぎているが、reset_timeをチェックする必要がある
-            reset_time_str = account_state.get('reset_time')
-            if reset_time_str:
-                reset_time = datetime.fromisoformat(reset_time_str)
-                now = datetime.now()
-                if reset_time > now:
-                    # reset_timeがまだ来ていない場合は、reset_timeまで待機する必要がある
-                    wait_seconds = (reset_time - now).total_seconds()
-                    logger.warning(f"{account_name}: wait_untilは過ぎていますが、reset_timeがまだ来ていません。")
-                    logger.warning(f"  リセット時刻: {reset_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                    logger.warning(f"  現在時刻: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-                    logger.warning(f"  残り時間: {int(wait_seconds)} 秒（{int(wait_seconds // 60)} 分）")
-                    logger.warning(f"  reset_timeまで待機する必要があります。")
-                    
-                    if skip_wait:
-                        return False  # 待機中（投稿不可）
-                    
-                    # reset_time + 10秒まで待機
-                    wait_until_reset = reset_time + timedelta(seconds=10)
-                    if wait_until_reset > now:
-                        wait_seconds = (wait_until_reset - now).total_seconds()
-                        logger.info(f"{account_name}: reset_timeまで待機します。")
-                        time.sleep(wait_seconds)
-                        logger.info(f"{account_name}: reset_timeが過ぎました。")
-            
-            # 待機時間が過ぎている（reset_timeも過ぎている、またはreset_timeが設定されていない）
-            logger.info(f"{account_name}: 以前の待機時間は既に過ぎています。クリアします。")
-            state[account_key] = {
-                'wait_until': None,
-                'reset_time': None,
-                'reason': None,
-                'error_time': None,
-                'api_endpoint': None,
-                'error_message': None
-            }
-            save_rate_limit_state(state)
-            return True  # 待機不要、投稿可能
-    else:
-        # reset_timeもwait_untilも設定されていない場合
-        # reset_timeが取得できなかった場合は不明として扱う
-        if account_state.get('reason') == '429 Too Many Requests':
-            # 429エラーが発生したが、reset_timeが取得できなかった場合は不明
-            logger.warning(f"{account_name} アカウント: レート制限が発生しましたが、リセット時刻が不明です。")
-            logger.warning(f"  15分待っても、実際のリセット時刻が15分後ではない可能性があります。")
-            logger.warning(f"  安全のため、投稿をスキップします。")
-            if skip_wait:
-                return False  # 不明のため、投稿不可
-            else:
-                # 不明の場合は、実際のAPIを呼び出してreset_timeを取得する必要がある
-                # しかし、APIを呼び出すとレート制限を消費する可能性があるため、
-                # 安全のため、15分待機してから再試行（ただし、正確ではない可能性がある）
-                logger.warning(f"  注意: 15分待機しますが、実際のリセット時刻が15分後ではない可能性があります。")
-                logger.warning(f"  再試行時に429エラーが発生した場合は、その時点でreset_timeを取得します。")
-                time.sleep(900)  # 15分 = 900秒
-                return True
-        else:
-            # レート制限が発生していない場合は、投稿可能
-            return True  # 待機不要、投稿可能
-
+    if skip_wait:
+        logger.warning(f"{account_name} アカウント: 待機中のためスキップします")
+        return False
+    time.sleep(max(0.0, (not_before - datetime.now()).total_seconds()))
+    logger.info(f"{account_name} アカウント: 待機時間が終了しました。続行します。")
+    return True
@@ -40,22 +40,21 @@ def refresh_pursahsgospel_posts():
     
     logger.info(f"{len(urls)}件のURLを抽出しました")
     
-    # データベースに保存
-    saved_count = 0
-    for i, url_data in enumerate(urls, 1):
-        post_id = db.add_post(Config.BLOG_PURSAHS_URL, {
+    # データベースに保存（1トランザクションで一括登録）
+    counts = db.add_posts_bulk(Config.BLOG_PURSAHS_URL, [
+        {
             'title': url_data.get('title', ''),
             'content': '',
             'link': url_data.get('link', ''),
             'published_date': '',
             'author': '',
-        })
-        if post_id:
-            saved_count += 1
-        if i % 20 == 0:
-            logger.info(f"進捗: {i}/{len(urls)} 件処理完了")
+        }
+        for url_data in urls
+    ])
+    saved_count = counts['inserted'] + counts['updated']
     
-    logger.info(f"\npursahsgospel: {saved_count}/{len(urls)} 件の投稿をデータベースに保存しました")
+    logger.info(f"\npursahsgospel: {saved_count}/{len(urls)} 件の投稿をデータベースに保存しました"
+                f"（追加 {counts['inserted']} 件 / 更新 {counts['updated']} 件 / 変更なし {counts['unchanged']} 件）")
     
     # データベース内の投稿数を確認
     all_posts = db.get_all_posts(Config.BLOG_PURSAHS_URL)
@@ -5,13 +5,15 @@
 import logging
 import sys
 import os
-import json
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 from database import PostDatabase
 from blog_fetcher import BlogFetcher
-from twitter_poster import TwitterPoster
+from twitter_poster import get_poster
 from config import Config
-from rate_limit_checker import check_and_wait_for_account, clear_rate_limit_state
+from rate_limit_checker import check_and_wait_for_account, clear_rate_limit_state, get_not_before
+from validate_tweets import load_tweet
 
 # Windowsでの文字化け対策
 if sys.platform == 'win32':
@@ -28,58 +30,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 失敗した投稿を保存するJSONファイル
-FAILED_POSTS_FILE = "failed_posts.json"
 MAX_RETRY_COUNT = 3  # 最大リトライ回数
 
 
 def load_failed_posts():
-    """失敗した投稿を読み込む"""
-    if os.path.exists(FAILED_POSTS_FILE):
-        try:
-            # WindowsのOut-File等でUTF-8 BOM付きになることがあるため utf-8-sig を使用
-            with open(FAILED_POSTS_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    return []
-
-
-def save_failed_posts(failed_posts):
-    """失敗した投稿を保存する"""
-    try:
-        with open(FAILED_POSTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(failed_posts, f, ensure_ascii=False, indent=2)
-    except IOError as e:
-        logger.error(f"失敗投稿の保存に失敗: {e}")
+    """失敗した投稿を読み込む（posts.db の failed_posts テーブル）"""
+    return PostDatabase().get_failed_posts()
 
 
 def remove_failed_post(post_id, account_key):
     """成功した投稿を失敗リストから削除する"""
-    failed_posts = load_failed_posts()
-    failed_posts = [fp for fp in failed_posts if not (fp['post_id'] == post_id and fp['account_key'] == account_key)]
-    save_failed_posts(failed_posts)
+    PostDatabase().remove_failed_post(post_id, account_key)
 
 
 def update_retry_count(post_id, account_key, error_info: dict = None, tweet_preview: str = None):
     """リトライ回数を更新する"""
-    failed_posts = load_failed_posts()
-    for fp in failed_posts:
-        if fp['post_id'] == post_id and fp['account_key'] == account_key:
-            fp['retry_count'] = fp.get('retry_count', 0) + 1
-            fp['last_failed'] = datetime.now().isoformat()
-            if tweet_preview is not None:
-                fp['tweet_preview'] = tweet_preview[:200]
-            if error_info:
-                fp['last_error'] = {
-                    'status': error_info.get('status'),
-                    'reason': error_info.get('reason'),
-                    'transaction_id': error_info.get('transaction_id'),
-                    'headers': error_info.get('headers'),
-                    'error_message': error_info.get('error_message'),
-                }
-            break
-    save_failed_posts(failed_posts)
+    PostDatabase().update_failed_post_retry(post_id, account_key, error_info=error_info, tweet_preview=tweet_preview)
 
 
 def retry_post(failed_post):
@@ -99,7 +65,7 @@ def retry_post(failed_post):
     
     try:
         # レート制限チェック
-        if not check_and_wait_for_account(account_key, twitter_handle, skip_wait=False):
+        if not check_and_wait_for_account(account_key, twitter_handle, skip_wait=True):
             logger.warning(f"@{twitter_handle}: 待機時間中のため、リトライをスキップします")
             return False
         
@@ -116,21 +82,23 @@ def retry_post(failed_post):
         
         if not page_content:
             logger.warning(f"コンテンツ取得失敗、DBの情報を使用")
-            page_content = {
+            # 取得済みのページコンテンツ（整形済みのツイートの整形元）があればそれを使う
+            page_content = PostDatabase().get_post_content(post_id) or {
                 'title': failed_post.get('title', ''),
                 'content': '',
                 'link': link
             }
         
-        # ツイート投稿
-        poster = TwitterPoster(credentials, account_key=account_key, account_name=twitter_handle)
-        tweet_text = poster.format_blog_post(
-            title=page_content.get('title', ''),
-            content=page_content.get('content', ''),
-            link=link
-        )
+        # ツイート投稿（通常の投稿と同じく整形済みのツイートを使い、403エラー時は文頭を1語削って1回だけ再試行）
+        poster = get_poster(credentials, account_key=account_key, account_name=twitter_handle)
+        rendered = load_tweet(PostDatabase(), post_id, account_key, page_content, link)
+        tweet_text = rendered['tweet_text']
         
-        result = poster.post_tweet_with_link(text=tweet_text, link=link)
+        result = poster.post_tweet(tweet_text)
+        if isinstance(result, dict) and result.get('status') == 403:
+            tweet_text = rendered['fallback_text']
+            logger.warning(f"403のため、文頭1語削って再試行します (@{twitter_handle})")
+            result = poster.post_tweet(tweet_text)
         
         if result and result.get('success'):
             # 投稿成功
@@ -163,24 +131,39 @@ def retry_post(failed_post):
         return False
 
 
-def main():
-    """メイン関数 - 失敗した投稿をリトライ"""
+def run_retries(slot_start: Optional[datetime] = None) -> Dict:
+    """
+    失敗した投稿をリトライ（連続投稿防止のため、1回の実行でリトライするのは1件のみ）
+    
+    待機はしない。残りのリトライは、次にリトライできる時刻（前のリトライから POST_SPACING_SECONDS 秒後、
+    レート制限中のアカウントは投稿可能になる時刻）に呼び出し側が再実行する。
+    1つのリトライ枠（slot_start 以降）で各投稿をリトライするのは1回のみ
+    （この枠で既にリトライした投稿＝最終失敗日時が slot_start 以降の投稿は、次のリトライ枠に回す）。
+    
+    Args:
+        slot_start: リトライ枠の開始時刻（省略時は現在時刻。同じ枠の再実行では最初の実行の時刻を渡す）
+    
+    Returns:
+        結果の辞書（success, failed, skipped, deferred: 件数、spaced: 連続投稿防止で延期した件数、
+        next_run: 残りのリトライを実行できる時刻。残りがない場合はNone）
+    """
+    slot_start = slot_start or datetime.now()
     logger.info("=" * 60)
     logger.info("失敗投稿リトライ開始")
     logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     
+    result = {'success': 0, 'failed': 0, 'skipped': 0, 'deferred': 0, 'spaced': 0, 'next_run': None}
     failed_posts = load_failed_posts()
     
     if not failed_posts:
         logger.info("リトライ対象の失敗投稿はありません")
-        return True
+        return result
     
     logger.info(f"リトライ対象: {len(failed_posts)}件")
     
-    success_count = 0
-    skip_count = 0
-    fail_count = 0
+    retried = False
+    next_times = []
     
     # リトライ対象をコピー（ループ中に変更されるため）
     posts_to_retry = list(failed_posts)
@@ -192,40 +175,70 @@ def main():
         if retry_count >= MAX_RETRY_COUNT:
             logger.warning(f"最大リトライ回数超過、スキップ（調査のため保持）: post_id={fp['post_id']}, account={fp['account_key']}")
             # 印だけ付けて残す
-            fp['exhausted'] = True
-            fp['exhausted_at'] = datetime.now().isoformat()
-            # リスト内を更新
-            current = load_failed_posts()
-            for i, cur in enumerate(current):
-                if cur.get('post_id') == fp.get('post_id') and cur.get('account_key') == fp.get('account_key'):
-                    current[i] = fp
-                    break
-            save_failed_posts(current)
-            skip_count += 1
+            PostDatabase().mark_failed_post_exhausted(fp['post_id'], fp['account_key'])
+            result['skipped'] += 1
+            continue
+        
+        # このリトライ枠で既にリトライした投稿は次のリトライ枠で再試行する
+        if fp.get('last_failed') and datetime.fromisoformat(fp['last_failed']) >= slot_start:
+            continue
+        
+        # レート制限中のアカウントは待たずに投稿可能な時刻へ延期する（他のアカウントのリトライは止めない）
+        not_before = get_not_before(fp['account_key'], fp['account_key'])
+        if not_before is not None:
+            logger.warning(f"レート制限中のため延期: post_id={fp['post_id']}, account={fp['account_key']}")
+            result['deferred'] += 1
+            next_times.append(not_before)
+            continue
+        
+        # 2件目以降は連続投稿防止のため、前のリトライから POST_SPACING_SECONDS 秒後に延期する
+        if retried:
+            result['deferred'] += 1
+            result['spaced'] += 1
+            next_times.append(datetime.now() + timedelta(seconds=Config.POST_SPACING_SECONDS))
             continue
         
         # リトライ実行
+        retried = True
         if retry_post(fp):
-            success_count += 1
+            result['success'] += 1
         else:
-            fail_count += 1
-        
-        # 複数のリトライ間に60秒待機（連続投稿防止）
-        remaining = [p for p in load_failed_posts() if p.get('retry_count', 0) < MAX_RETRY_COUNT]
-        if remaining:
-            logger.info("60秒待機中（連続投稿防止）...")
-            import time
-            time.sleep(60)
+            result['failed'] += 1
+    
+    result['next_run'] = min(next_times) if next_times else None
     
     # 結果サマリー
     logger.info("\n" + "=" * 60)
     logger.info("リトライ完了")
-    logger.info(f"成功: {success_count}件")
-    logger.info(f"失敗: {fail_count}件")
-    logger.info(f"スキップ（最大回数超過）: {skip_count}件")
+    logger.info(f"成功: {result['success']}件")
+    logger.info(f"失敗: {result['failed']}件")
+    logger.info(f"スキップ（最大回数超過）: {result['skipped']}件")
+    logger.info(f"延期（連続投稿防止・レート制限中）: {result['deferred']}件")
+    if result['next_run'] is not None:
+        logger.info(f"残りのリトライ: {result['next_run'].strftime('%Y-%m-%d %H:%M:%S')} 以降")
     logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     
+    return result
+
+
+def main():
+    """
+    メイン関数 - 失敗した投稿をリトライ（単体実行用）
+    
+    リトライの間は POST_SPACING_SECONDS 秒待機する（連続投稿防止）。
+    レート制限中のアカウントの投稿は待たずに次回の実行に回す。
+    """
+    slot_start = datetime.now()
+    fail_count = 0
+    while True:
+        result = run_retries(slot_start)
+        fail_count += result['failed']
+        if not result['spaced']:
+            break
+        wait = max(0.0, (result['next_run'] - datetime.now()).total_seconds())
+        logger.info(f"{wait:.0f}秒待機中（連続投稿防止）...")
+        time.sleep(wait)
     return fail_count == 0
 
 
@@ -0,0 +1,116 @@
+"""
+取得済みページコンテンツの再確認スクリプト
+投稿のページを優先度順（次に投稿する候補 → 最近内容が変わった投稿 → 確認日時の古い投稿 → 未取得の投稿）に
+条件付きGETで再確認し、内容のハッシュが変わった場合のみ post_content と posts を更新する
+（投稿時はこの結果を使い、ページ取得を待たない）
+"""
+import argparse
+import logging
+import sys
+from typing import Dict, List, Optional
+
+from blog_fetcher import BlogFetcher
+from config import Config
+from database import PostDatabase
+from fetch_engine import get_fetch_engine
+from http_cache import set_offline_mode
+from http_session import log_connection_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+ACCOUNTS = [
+    ('365bot', Config.BLOG_365BOT_URL, Config.TWITTER_365BOT_HANDLE),
+    ('pursahs', Config.BLOG_PURSAHS_URL, Config.TWITTER_PURSAHS_HANDLE),
+]
+
+
+def upcoming_post_ids(db: PostDatabase, count: int) -> List[int]:
+    """各アカウントで次に投稿される候補（先読み済みを優先して選ばれるもの）のID"""
+    ids = []
+    for account_key, blog_url, twitter_handle in ACCOUNTS:
+        try:
+            candidates = db.get_random_unposted_posts(
+                blog_url, twitter_handle, limit=count, account_key=account_key, prefer_cached=True
+            )
+        except Exception as e:
+            logger.error(f"@{twitter_handle}: 候補の取得エラー: {e}")
+            continue
+        ids += [post['id'] for post in candidates]
+    return ids
+
+
+def revalidate(db: PostDatabase, limit: Optional[int] = None, upcoming: Optional[int] = None) -> Dict[str, int]:
+    """
+    優先度の高い投稿から limit 件のページを再確認
+
+    ページは FetchEngine でホストごとの制限付きで並列に取得する。
+    未変更のページは条件付きGET（304）1回で済み、解析もキャッシュした結果を使う。
+
+    Returns:
+        件数の辞書（checked, changed, unchanged, failed）
+    """
+    limit = limit if limit is not None else Config.REVALIDATE_BATCH
+    upcoming = upcoming if upcoming is not None else Config.PREFETCH_COUNT
+    queue = db.get_revalidation_queue(
+        upcoming_post_ids(db, upcoming),
+        limit=limit,
+        upcoming_max_age_hours=Config.REVALIDATE_UPCOMING_HOURS,
+        recent_max_age_hours=Config.REVALIDATE_RECENT_HOURS,
+        recent_window_hours=Config.REVALIDATE_RECENT_WINDOW_HOURS,
+        max_age_hours=Config.POST_CONTENT_MAX_AGE_HOURS,
+    )
+    counts = {'checked': 0, 'changed': 0, 'unchanged': 0, 'failed': 0}
+    if not queue:
+        logger.info("再確認が必要な投稿はありません")
+        return counts
+
+    engine = get_fetch_engine()
+
+    def fetch(post: Dict) -> Optional[Dict[str, str]]:
+        response = engine.get(post['link'], timeout=30)
+        response.raise_for_status()
+        return BlogFetcher(post['link'], session=engine.session).parse_page_response(response)
+
+    results = engine.map(fetch, queue, return_exceptions=True)
+    for post, page_content in zip(queue, results):
+        counts['checked'] += 1
+        if isinstance(page_content, Exception) or not page_content:
+            counts['failed'] += 1
+            logger.warning(f"再確認に失敗: post_id={post['id']} {post['link']} ({page_content})")
+            continue
+        page_content['link'] = post['link']
+        if db.save_post_content(post['id'], page_content):
+            counts['changed'] += 1
+            logger.info(f"内容が変わりました（優先度 {post['priority']}）: post_id={post['id']} {page_content.get('title', '')[:40]}")
+        else:
+            counts['unchanged'] += 1
+
+    logger.info(
+        f"再確認完了: {counts['checked']}件（変更 {counts['changed']}件 / 変更なし {counts['unchanged']}件"
+        f" / 失敗 {counts['failed']}件）"
+    )
+    log_connection_stats(engine.session)
+    return counts
+
+
+def main(limit: Optional[int] = None, upcoming: Optional[int] = None) -> Dict[str, int]:
+    """メイン関数"""
+    return revalidate(PostDatabase(), limit=limit, upcoming=upcoming)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='取得済みページコンテンツを優先度順に再確認')
+    parser.add_argument('--limit', type=int, default=None, help='1回に確認する件数')
+    parser.add_argument('--upcoming', type=int, default=None, help='アカウントごとに優先する次の投稿候補の数')
+    parser.add_argument('--offline', action='store_true', help='ネットワークに接続せずHTTPキャッシュのみから取得')
+    args = parser.parse_args()
+    if args.offline:
+        set_offline_mode(True)
+    main(limit=args.limit, upcoming=args.upcoming)
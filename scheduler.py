@@ -9,9 +9,13 @@ import logging
 import os
 import sys
 import atexit
+import threading
 from datetime import datetime, time as dt_time, timedelta
-from post_both_accounts import main
-from retry_failed_posts import main as retry_main
+from post_both_accounts import run_posts
+from retry_failed_posts import run_retries
+from prefetch_posts import main as prefetch_main
+from revalidate_posts import main as revalidate_main
+from validate_tweets import main as validate_tweets_main
 
 logging.basicConfig(
     level=logging.INFO,
@@ -49,19 +53,132 @@ def run_scheduled_task():
     logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     try:
-        main()
+        # レート制限中のアカウントは待たずに延期し、投稿可能な時刻に再実行する
+        enqueue_deferred_posts(run_posts())
     except Exception as e:
         logger.error(f"スケジュール実行エラー: {e}", exc_info=True)
+    # 先読み・再確認・事前整形はスケジューラのスレッドの外で行う（延期した投稿のジョブを遅らせない）
+    start_maintenance()
 
 
-def run_retry_task():
-    """失敗した投稿のリトライタスクを実行"""
+# 先読み・再確認・事前整形（同時に1つのみ実行する）
+_maintenance_lock = threading.Lock()
+
+
+def run_maintenance():
+    """次の投稿に備えた先読み・再確認・事前整形"""
+    # 次の投稿に備えて候補のページコンテンツを先読みしておく
+    try:
+        prefetch_main()
+    except Exception as e:
+        logger.error(f"先読みエラー: {e}", exc_info=True)
+    # 取得済みのページコンテンツを優先度順に再確認（変更があった投稿のみ更新）
+    try:
+        revalidate_main()
+    except Exception as e:
+        logger.error(f"再確認エラー: {e}", exc_info=True)
+    # 内容か整形ルールが変わった投稿のツイートを事前に整形して文字数を検証（次回の投稿は整形済みのツイートを使う）
+    try:
+        validate_tweets_main()
+    except Exception as e:
+        logger.error(f"ツイートの事前整形エラー: {e}", exc_info=True)
+
+
+def start_maintenance():
+    """先読み・再確認・事前整形をバックグラウンドのスレッドで開始（前回の実行中はスキップ）"""
+    if not _maintenance_lock.acquire(blocking=False):
+        logger.info("前回の先読み・再確認・事前整形が実行中のため、今回はスキップします")
+        return None
+
+    def run():
+        try:
+            run_maintenance()
+        finally:
+            _maintenance_lock.release()
+
+    thread = threading.Thread(target=run, name='maintenance', daemon=True)
+    thread.start()
+    return thread
+
+
+# 延期した投稿・リトライのジョブ（アカウントごと・リトライで1つ）
+_deferred_jobs = {}
+
+
+def _schedule_once(key, not_before, job_func, *args):
+    """not_before 以降に1回だけ実行するジョブを登録（同じキーの登録済みのジョブは置き換える）"""
+    previous = _deferred_jobs.pop(key, None)
+    if previous is not None:
+        schedule.cancel_job(previous)
+    seconds = max(1, int((not_before - datetime.now()).total_seconds()) + 1)
+    _deferred_jobs[key] = schedule.every(seconds).seconds.do(job_func, *args).tag('deferred')
+    return seconds
+
+
+def enqueue_deferred_posts(results):
+    """
+    レート制限で延期したアカウントの投稿を、投稿可能な時刻に1回だけ実行するジョブとして登録
+    
+    Args:
+        results: run_posts の結果（延期したアカウントの値は投稿可能になる時刻）
+    """
+    for account_key, not_before in results.items():
+        if not isinstance(not_before, datetime):
+            continue
+        seconds = _schedule_once(account_key, not_before, run_deferred_post, account_key)
+        logger.info(f"延期した投稿を登録: {account_key} {not_before.strftime('%Y-%m-%d %H:%M:%S')} 以降（{seconds}秒後）")
+
+
+def run_deferred_post(account_key):
+    """延期した投稿を実行（1回限りのジョブ。再び延期された場合は新しいジョブを登録する）"""
+    _deferred_jobs.pop(account_key, None)
+    logger.info("=" * 60)
+    logger.info(f"延期した投稿を実行します: {account_key}")
+    logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("=" * 60)
+    try:
+        enqueue_deferred_posts(run_posts(account_key))
+    except Exception as e:
+        logger.error(f"延期した投稿の実行エラー: {e}", exc_info=True)
+    return schedule.CancelJob
+
+
+def enqueue_deferred_retry(result, slot_start):
+    """
+    残りのリトライを、次にリトライできる時刻に1回だけ実行するジョブとして登録
+    
+    Args:
+        result: run_retries の結果（next_run が残りのリトライを実行できる時刻。残りがない場合はNone）
+        slot_start: リトライ枠の開始時刻（同じ枠の中では各投稿を1回だけリトライする）
+    """
+    not_before = result['next_run']
+    if not_before is None:
+        return
+    seconds = _schedule_once('retry', not_before, run_deferred_retry, slot_start)
+    logger.info(f"残りのリトライを登録: {not_before.strftime('%Y-%m-%d %H:%M:%S')} 以降（{seconds}秒後）")
+
+
+def run_deferred_retry(slot_start):
+    """残りのリトライを実行（1回限りのジョブ。まだ残りがある場合は新しいジョブを登録する）"""
+    _deferred_jobs.pop('retry', None)
+    run_retry_task(slot_start)
+    return schedule.CancelJob
+
+
+def run_retry_task(slot_start=None):
+    """
+    失敗した投稿のリトライタスクを実行（1件ずつ。残りは連続投稿防止の間隔を空けて再実行する）
+    
+    Args:
+        slot_start: リトライ枠の開始時刻（定時のリトライでは省略して現在時刻、延期したリトライでは最初の実行の時刻）
+    """
+    slot_start = slot_start or datetime.now()
     logger.info("=" * 60)
     logger.info("リトライ実行を開始します")
     logger.info(f"実行時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     try:
-        retry_main()
+        enqueue_deferred_retry(run_retries(slot_start), slot_start)
     except Exception as e:
         logger.error(f"リトライ実行エラー: {e}", exc_info=True)
 
@@ -86,13 +203,13 @@ def schedule_daily_posts():
     
     # 通常投稿スケジュール
     for hour, minute in post_times:
-        job = schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(run_scheduled_task)
+        job = schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(run_scheduled_task).tag('daily')
         created_jobs.append(job)
         logger.info(f"投稿スケジュール登録: 毎日 {hour:02d}:{minute:02d}")
     
     # リトライスケジュール
     for hour, minute in retry_times:
-        job = schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(run_retry_task)
+        job = schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(run_retry_task).tag('daily')
         created_jobs.append(job)
         logger.info(f"リトライスケジュール登録: 毎日 {hour:02d}:{minute:02d}")
     
@@ -161,7 +278,8 @@ def start_scheduler(temp_hourly_count=0, shift_daily_to_tomorrow=False):
             now = datetime.now()
             if now.hour == 0 and now.minute == 0:
                 logger.info("新しい日のスケジュールを再生成します")
-                schedule.clear()
+                # 延期した投稿のジョブは残す
+                schedule.clear('daily')
                 schedule_daily_posts()
                 # 以降は通常サイクルに戻すため、初日のみシフト
     except KeyboardInterrupt:
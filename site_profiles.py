@@ -0,0 +1,318 @@
+"""
+サイトプロファイルモジュール
+ブログごとの抽出ルール（タイトル・本文・リンク・日付のセレクタと除去ルール）を宣言的に定義し、
+ホスト単位でプロファイルを照合する。
+各項目のセレクタは先頭から順に試し、実際に一致したセレクタを記録して次のページでは最初に試す。
+"""
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+import soupsieve
+
+logger = logging.getLogger(__name__)
+
+# 解析結果のキャッシュ名に付けるバージョン（プロファイルの抽出ルールを変えたら上げる）
+PROFILE_VERSION = 1
+
+# プロファイル定義
+# - hosts: 対象ホスト（末尾一致。最も長く一致したプロファイルを使う）
+# - extends: 継承するプロファイル（指定した項目だけ上書き）
+# - entry_path: 個別ページのURLに含まれる文字列
+# - archive_path: 全記事一覧ページ（base_url からの相対パス）
+# - feeds: ページでフィードが告知されていない場合に試すフィードURL（base_url からの相対パス）
+# - listing_pages: 一覧の次のページのURL形式（base_url からの相対パス。{} にページ番号）
+# - listing_page_start: 2ページ目のページ番号
+# - page: 個別ページの項目ごとのセレクタ（先頭から順に試す。最後のセレクタは最終手段で、先頭には移さない）
+# - listing: 一覧ページの記事エントリ（entries）と、エントリ内の項目ごとのセレクタ
+# - strip: 項目ごとの除去・置換ルール（正規表現, 置換後の文字列）
+# （[class*=x i] はクラス名に x を含む要素、大文字小文字を区別しない）
+PROFILES: List[Dict[str, Any]] = [
+    {
+        'name': 'generic',
+        'hosts': [],
+        'entry_path': None,
+        'archive_path': None,
+        'feeds': ['rss.xml', 'feed', '?feed=rss2'],
+        'listing_pages': 'page/{}/',
+        'listing_page_start': 2,
+        'page': {
+            'title': ['h1, title'],
+            'body': [
+                'article[class*=content i], article[class*=entry i], article[class*=post i], '
+                'main[class*=content i], main[class*=entry i], main[class*=post i], '
+                'div[class*=content i], div[class*=entry i], div[class*=post i]',
+                'main',
+                'article',
+            ],
+            'date': ['time[datetime]'],
+        },
+        'listing': {
+            'entries': [
+                'article[class*=entry i], article[class*=post i], article[class*=article i], '
+                'div[class*=entry i], div[class*=post i], div[class*=article i]',
+            ],
+            'title': ['h1, h2, h3, a'],
+            'link': [],
+            'body': ['div, p, section'],
+            'date': ['time[datetime]'],
+        },
+        'strip': {},
+    },
+    {
+        'name': 'fc2',
+        'hosts': ['fc2.com'],
+        'entry_path': '/blog-entry-',
+        'archive_path': 'archives.html',
+        'feeds': ['?xml', 'rss.xml', 'index.rdf'],
+        'listing_pages': 'page-{}.html',
+        'listing_page_start': 1,
+        'page': {
+            'title': ['h1[class*=title i], h2[class*=title i], h3[class*=title i]', 'h2.entry_header', 'title'],
+            'body': ['div.entry_body', 'div[class*=entry_body i]', 'div.content[id^=e]'],
+            'date': ['time[datetime]', '.entry_date', '[class*=entry_date i]'],
+        },
+        'listing': {
+            'entries': [
+                'article[class*=entry i], article[class*=post i], div[class*=entry i], div[class*=post i]',
+                'div[id*=entry i]',
+            ],
+            'title': ['h2[class*=title i], h3[class*=title i], a[class*=title i]', 'a[href*="/blog-entry-"]'],
+            'link': ['a[href*="/blog-entry-"]'],
+            'body': [
+                'div[class*=content i], div[class*=entry i], div[class*=text i], '
+                'p[class*=content i], p[class*=entry i], p[class*=text i]',
+                'div[id*=entry_body i]',
+            ],
+            'date': ['time[datetime]', '.entry_date', '[class*=entry_date i]'],
+        },
+        'strip': {
+            # 本文末尾の共有ボタン（「Tweet」以降）
+            'body': [(r'Tweet[\s\S]*$', '')],
+        },
+    },
+    {
+        'name': 'notesofacim',
+        'extends': 'fc2',
+        'hosts': ['notesofacim.blog.fc2.com'],
+        'strip': {
+            # 「ACIM学習ガイド」「ACIM学習ノート」を削除し、「神の使い」を「神の使者」に修正
+            # （（）は残す。例：Day246（神の使者:P.359、ACIM:T-01.II.05:04-05））
+            'title': [
+                (r'^ACIM学習(ガイド|ノート)\s*[-|]?\s*', ''),
+                (r'\s*[-|]?\s*ACIM学習(ガイド|ノート)$', ''),
+                (r'ACIM学習(ガイド|ノート)', ''),
+                (r'神の使い', '神の使者'),
+            ],
+            'body': [(r'Tweet[\s\S]*$', '')],
+        },
+    },
+    {
+        'name': 'ameba',
+        'hosts': ['ameba.jp'],
+        'entry_path': '/entry-',
+        'archive_path': None,
+        'feeds': ['rss20.xml', '?xml'],
+        'listing_pages': 'entrylist-{}.html',
+        'listing_page_start': 2,
+        'page': {
+            'title': ['h1[class*=title i], h2[class*=title i], h3[class*=title i]', 'title'],
+            'body': [
+                'div[class*=entry i], div[class*=content i], div[class*=body i], div[class*=text i], '
+                'article[class*=entry i], article[class*=content i], article[class*=body i], article[class*=text i], '
+                'section[class*=entry i], section[class*=content i], section[class*=body i], section[class*=text i]',
+                'div.skin-entryBody',
+            ],
+            'date': ['time[datetime]', '[class*=pubdate i]'],
+        },
+        'listing': {
+            'entries': [
+                'article[class*=entry i], article[class*=article i], article[class*=post i], '
+                'div[class*=entry i], div[class*=article i], div[class*=post i]',
+                'div[id*=entry i], div[id*=article i]',
+            ],
+            'title': ['h2[class*=title i], h3[class*=title i], h4[class*=title i], a[class*=title i]', 'a'],
+            'link': ['a[href*="/entry-"]'],
+            'body': [
+                'div[class*=content i], div[class*=text i], div[class*=body i], '
+                'p[class*=content i], p[class*=text i], p[class*=body i], '
+                'section[class*=content i], section[class*=text i], section[class*=body i]',
+                'div.skin-entryBody',
+            ],
+            'date': ['time[datetime]', '[class*=pubdate i]'],
+        },
+        'strip': {},
+    },
+]
+
+
+class SiteProfile:
+    """1つのブログ（ホスト）の抽出ルール"""
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.name: str = definition['name']
+        self.hosts: List[str] = definition['hosts']
+        self.entry_path: Optional[str] = definition.get('entry_path')
+        self.archive_path: Optional[str] = definition.get('archive_path')
+        self.feeds: List[str] = list(definition.get('feeds') or [])
+        self.listing_pages: Optional[str] = definition.get('listing_pages')
+        self.listing_page_start: int = definition.get('listing_page_start', 2)
+        self._selectors: Dict[Tuple[str, str], List[str]] = {}
+        self._compiled: Dict[Tuple[str, str], List[Any]] = {}
+        for mode in ('page', 'listing'):
+            for field, selectors in definition.get(mode, {}).items():
+                self._selectors[(mode, field)] = list(selectors)
+                self._compiled[(mode, field)] = [soupsieve.compile(s) for s in selectors]
+        self._strip: Dict[str, List[Tuple[Pattern, str]]] = {
+            field: [(re.compile(pattern), repl) for pattern, repl in rules]
+            for field, rules in definition.get('strip', {}).items()
+        }
+        # 項目ごとに最後に一致したセレクタの位置（次回は最初に試す）
+        self._winners: Dict[Tuple[str, str], int] = {}
+        self._hits: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def _order(self, key: Tuple[str, str]) -> List[int]:
+        """セレクタを試す順序（前回一致したものを先頭に）"""
+        count = len(self._compiled.get(key, []))
+        winner = self._winners.get(key)
+        if winner is None:
+            return list(range(count))
+        return [winner] + [i for i in range(count) if i != winner]
+
+    def _record(self, key: Tuple[str, str], index: int):
+        with self._lock:
+            # 最後のセレクタ（title・a など何にでも一致する最終手段）は先頭に移さない
+            if index < len(self._compiled[key]) - 1:
+                self._winners[key] = index
+            hit_key = key + (index,)
+            self._hits[hit_key] = self._hits.get(hit_key, 0) + 1
+
+    def select_one(self, node, mode: str, field: str):
+        """項目のセレクタを順に試し、最初に一致した要素を返す（なければNone）"""
+        key = (mode, field)
+        compiled = self._compiled.get(key, [])
+        for index in self._order(key):
+            element = compiled[index].select_one(node)
+            if element is not None:
+                self._record(key, index)
+                return element
+        return None
+
+    def select(self, node, mode: str, field: str) -> List:
+        """項目のセレクタを順に試し、最初に一致した要素のリストを返す（文書順）"""
+        key = (mode, field)
+        compiled = self._compiled.get(key, [])
+        for index in self._order(key):
+            elements = compiled[index].select(node)
+            if elements:
+                self._record(key, index)
+                return elements
+        return []
+
+    def clean(self, field: str, text: str) -> str:
+        """項目の除去ルールを適用（前後の空白も除去）"""
+        for pattern, repl in self._strip.get(field, []):
+            text = pattern.sub(repl, text)
+        return text.strip()
+
+    def is_entry_url(self, url: str) -> bool:
+        """個別ページのURLか"""
+        return bool(self.entry_path) and self.entry_path in url
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """項目ごとの、各セレクタが一致した回数"""
+        result: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for (mode, field, index), count in sorted(self._hits.items()):
+                selector = self._selectors[(mode, field)][index]
+                result.setdefault(f"{mode}.{field}", {})[selector] = count
+        return result
+
+
+def _resolve_definitions() -> Dict[str, Dict[str, Any]]:
+    """PROFILES の extends を解決（継承元は先に定義されている必要がある）"""
+    definitions: Dict[str, Dict[str, Any]] = {}
+    for definition in PROFILES:
+        merged = dict(definitions[definition['extends']]) if definition.get('extends') else {}
+        merged.update(definition)
+        definitions[definition['name']] = merged
+    return definitions
+
+
+_definitions = _resolve_definitions()
+_host_profiles: Dict[str, SiteProfile] = {}
+_host_lock = threading.Lock()
+_generic_profile: Optional[SiteProfile] = None
+
+
+def _match_definition(host: str) -> Dict[str, Any]:
+    """ホストに最も長く一致したプロファイル定義（なければ generic）"""
+    best, best_len = _definitions['generic'], -1
+    for definition in _definitions.values():
+        for pattern in definition['hosts']:
+            if (host == pattern or host.endswith('.' + pattern)) and len(pattern) > best_len:
+                best, best_len = definition, len(pattern)
+    return best
+
+
+def get_profile(url: str) -> SiteProfile:
+    """
+    URLのホストに対応するプロファイルを取得
+
+    照合はホストごとに1回だけ行い、一致したセレクタの記録もホストごとに持つ。
+    """
+    host = urlparse(url).netloc.lower()
+    with _host_lock:
+        profile = _host_profiles.get(host)
+        if profile is None:
+            profile = _host_profiles[host] = SiteProfile(_match_definition(host))
+            logger.debug(f"サイトプロファイル: {host} -> {profile.name}")
+        return profile
+
+
+def get_generic_profile() -> SiteProfile:
+    """汎用のプロファイル（個別ページのURL形式がプロファイルと一致しない場合など）"""
+    global _generic_profile
+    with _host_lock:
+        if _generic_profile is None:
+            _generic_profile = SiteProfile(_definitions['generic'])
+        return _generic_profile
+
+
+def element_text(element) -> str:
+    """要素のテキスト（なければ空文字列）"""
+    return element.get_text(strip=True) if element is not None else ""
+
+
+def element_date(element) -> str:
+    """日付要素の値（datetime 属性を優先）"""
+    if element is None:
+        return ""
+    return element.get('datetime') or element.get_text(strip=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from blog_fetcher import BlogFetcher
+    from html_parsing import make_soup
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    parser = argparse.ArgumentParser(description='URLに対応するサイトプロファイルで抽出結果を確認')
+    parser.add_argument('urls', nargs='+', help='ブログまたは個別ページのURL')
+    args = parser.parse_args()
+
+    for url in args.urls:
+        fetcher = BlogFetcher(url)
+        print(f"{url} -> プロファイル: {fetcher.profile.name}")
+        response = fetcher._get_page(url)
+        post = fetcher._parse_page(make_soup(response.text))
+        for key, value in (post or {}).items():
+            print(f"  {key}: {str(value)[:80]}")
+        for field, hits in fetcher.profile.stats().items():
+            for selector, count in hits.items():
+                print(f"  [{field}] {count}回: {selector}")
@@ -0,0 +1,255 @@
+"""
+ツイート整形モジュール
+アカウント（ブログ）ごとの整形ルールを TweetFormatter にまとめ、正規表現は作成時に1回だけコンパイルする。
+同じ投稿（タイトル・本文のハッシュ・リンク）の整形結果は LRU キャッシュから返す。
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from tweet_length import max_weighted_length, truncate_to_weight, weighted_length
+
+# ツイート全体（URL・ハッシュタグ含む）は X の重み付き文字数で Config.TWEET_MAX_WEIGHTED_LENGTH 以内にする
+# ツイート末尾のハッシュタグ（改行を含む）
+HASHTAG = "\n#ACIM"
+# 整形結果のキャッシュ件数（アカウントごと）
+CACHE_SIZE = 1024
+# 整形処理（_format・trim_first_word・build_tweet）の版。処理を変えたら上げる（保存済みのツイートが整形し直される）
+FORMAT_VERSION = 1
+
+# 語録番号: 「語録XX」「語録 (Logion) XX」など（全角・半角数字対応）
+_GOROKU = r'語録(?:\s*\([^)]+\)\s*)?[０-９0-9]+'
+_GOROKU_HEAD = re.compile(rf'^({_GOROKU})')
+
+# 置換ルール: (正規表現, 置換後の文字列)
+Rule = Tuple[Pattern, str]
+
+
+def _rules(*rules: Tuple[str, str, int]) -> List[Rule]:
+    return [(re.compile(pattern, flags), repl) for pattern, repl, flags in rules]
+
+
+# タイトルの「| パーサによるトマスの福音書」などのサブタイトル（全アカウント共通）
+_SUBTITLE = re.compile(r"\s*\|.*")
+
+
+class TweetFormatter:
+    """
+    1つのアカウントのツイート整形
+
+    - include_title: タイトルを本文の前に入れるか
+    - title_rules / content_rules: タイトル・本文の置換ルール（順に適用）
+    - goroku_newline: 本文が「語録XX」で始まる場合、その後に改行を入れるか
+    """
+
+    def __init__(
+        self,
+        name: str,
+        include_title: bool = True,
+        title_rules: Optional[List[Rule]] = None,
+        content_rules: Optional[List[Rule]] = None,
+        goroku_newline: bool = False,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.name = name
+        self.include_title = include_title
+        self.title_rules = title_rules or []
+        self.content_rules = content_rules or []
+        self.goroku_newline = goroku_newline
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def format(self, title: str, content: str, link: str) -> str:
+        """
+        ブログ投稿をツイート用にフォーマット（リンクとハッシュタグは含まない）
+
+        同じ (タイトル, 本文のハッシュ, リンク) の結果はキャッシュから返す。
+        """
+        # 本文は SHA-256 のハッシュをキーにする（本文全体をキャッシュに保持せず、hash() の衝突で別の本文の結果を返さない）
+        key = (title or '', hashlib.sha256((content or '').encode('utf-8')).hexdigest(), link)
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                return text
+        text = self._format(title or '', content or '', link)
+        with self._lock:
+            self._cache[key] = text
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    def rules_hash(self) -> str:
+        """
+        整形ルールのハッシュ（ルール・整形処理の版・文字数の上限のいずれかが変わると変わる）
+
+        保存済みのツイート（rendered_tweets）がこのルールで整形されたものかの判定に使う。
+        """
+        rules = [
+            [(pattern.pattern, pattern.flags, repl) for pattern, repl in self.title_rules],
+            [(pattern.pattern, pattern.flags, repl) for pattern, repl in self.content_rules],
+        ]
+        key = repr((FORMAT_VERSION, self.include_title, self.goroku_newline, rules, HASHTAG, max_weighted_length()))
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def normalize_title(self, title: str) -> str:
+        """サブタイトルを除去し、アカウントのタイトルルールを適用"""
+        title = _SUBTITLE.sub('', title) if title else title
+        for pattern, repl in self.title_rules:
+            title = pattern.sub(repl, title)
+        return title
+
+    def clean_content(self, content: str) -> str:
+        """本文からナビゲーション要素などを除去"""
+        content = content.strip()
+        for pattern, repl in self.content_rules:
+            content = pattern.sub(repl, content)
+        content = content.strip()
+        if self.goroku_newline:
+            # 本文が「語録XX」で始まる場合、その後に改行を追加
+            match = _GOROKU_HEAD.match(content)
+            if match:
+                goroku_part = match.group(1)
+                rest = content[len(goroku_part):].lstrip()
+                if not rest.startswith('\n'):
+                    content = f"{goroku_part}\n{rest}"
+        return content
+
+    def _format(self, title: str, content: str, link: str) -> str:
+        title = self.normalize_title(title)
+        content = self.clean_content(content)
+        # 形式: ツイート本文 + 改行 + URL + HASHTAG が重み付きで上限以内（URLは23文字）
+        max_text_weight = max_weighted_length() - weighted_length(f"\n{link}{HASHTAG}")
+        if not self.include_title:
+            return truncate_to_weight(content, max_text_weight)
+        # タイトル + 改行 + 本文（本文は途中で切る。句読点で区切らない）
+        available_weight = max_text_weight - weighted_length(title) - 1
+        if available_weight < 0:
+            # タイトルが長すぎる場合はタイトルのみ（通常は発生しない。タイトルも上限で切る）
+            return truncate_to_weight(title, max_text_weight)
+        return f"{title}\n{truncate_to_weight(content, available_weight)}"
+
+
+# アカウントごとの整形ルール
+FORMATTERS = {
+    # 365botGary: 「ACIM学習ガイド 」「ACIM学習ノート 」を削除し、「神の使い」を「神の使者」に修正
+    '365bot': TweetFormatter(
+        '365bot',
+        title_rules=_rules(
+            (r'^ACIM学習(ガイド|ノート)\s+', '', 0),
+            (r'神の使い', '神の使者', 0),
+        ),
+    ),
+    # pursahsgospel: タイトルなし、本文先頭のブログタイトル・語録番号の重複を除去
+    'pursahs': TweetFormatter(
+        'pursahs',
+        include_title=False,
+        title_rules=_rules(
+            (r'\s*\|\s*Pursah\'?s Gospelのブログ\s*$', '', 0),
+        ),
+        content_rules=_rules(
+            (rf'ブログトップ.*?{_GOROKU}\s*\|\s*Pursah\'?s Gospelのブログ\s*{_GOROKU}', '', re.DOTALL),
+            (rf'ブログトップ.*?{_GOROKU}\s*\|\s*パーサによるトマスの福音書\s*{_GOROKU}', '', re.DOTALL),
+            (rf'{_GOROKU}\s*\|\s*Pursah\'?s Gospelのブログ\s*{_GOROKU}', '', re.DOTALL),
+            (rf'{_GOROKU}\s*\|\s*パーサによるトマスの福音書\s*{_GOROKU}', '', re.DOTALL),
+            # 残っている「ブログトップ...語録XX」（最も広いパターン）
+            (rf'ブログトップ.*?{_GOROKU}', '', re.DOTALL),
+            # 先頭に残っている重複した語録番号
+            (rf'^{_GOROKU}\s*{_GOROKU}', '', re.MULTILINE),
+        ),
+        goroku_newline=True,
+    ),
+    'default': TweetFormatter('default'),
+}
+
+
+def account_for_link(link: str) -> str:
+    """リンクから整形ルールのアカウントキーを判定"""
+    if 'notesofacim.blog.fc2.com' in link:
+        return '365bot'
+    if 'ameblo.jp/pursahs-gospel' in link or 'ameba.jp/profile/general/pursahs-gospel' in link:
+        return 'pursahs'
+    return 'default'
+
+
+def get_formatter(link: str) -> TweetFormatter:
+    """リンクに対応する TweetFormatter"""
+    return FORMATTERS[account_for_link(link)]
+
+
+def format_tweet(title: str, content: str, link: str) -> str:
+    """ブログ投稿をツイート用にフォーマット（リンクに対応するアカウントのルールで）"""
+    return get_formatter(link).format(title, content, link)
+
+
+def build_tweet(text: str, link: str) -> str:
+    """投稿するツイート全体（TwitterPoster.post_tweet_with_link と同じ形式）"""
+    return f"{text}\n{link}{HASHTAG}"
+
+
+# 403エラー時の再試行用: 先頭の語録番号（語録番号の後は1行目のみ対象）
+_TRIM_GOROKU = re.compile(rf"\s*({_GOROKU})\s*(.*)")
+# 空白で区切られた先頭の1語
+_TRIM_WORD = re.compile(r"\s*([^\s]+)\s+(.*)")
+# 空白がない場合の先頭の1語（英単語1つ / 助詞や句読点までの短い単位（最大5文字））
+_TRIM_SHORT = re.compile(r'^([A-Za-z]+[、，,。.]?|.{1,5}?[はがのをにで、，,。.「」]|.{1,3})')
+
+
+def _drop_first_word(text: str) -> str:
+    """先頭の1語を削除した残り"""
+    # 「Ｊは言った。」のような場合は「Ｊは」だけを削除
+    if text.startswith('Ｊは') or text.startswith('Jは'):
+        return text[2:]
+    match = _TRIM_WORD.match(text)
+    if match:
+        return match.group(2)
+    match = _TRIM_SHORT.match(text)
+    first_word = match.group(1) if match else text[:3]
+    return text[len(first_word):]
+
+
+def trim_first_word(text: str) -> str:
+    """
+    403エラー時の再試行用に文頭の1語を削ったテキスト（先頭に「…」を付ける）
+
+    本文が語録番号で始まる場合は語録番号を残し、その後の1語を削る。
+    """
+    has_leading_ellipsis = text.startswith("…")
+    body = text[1:] if has_leading_ellipsis else text
+    goroku_match = _TRIM_GOROKU.match(body)
+    if goroku_match:
+        goroku = goroku_match.group(1)
+        rest = _drop_first_word(goroku_match.group(2).lstrip()).lstrip()
+        if not rest:
+            return goroku
+        return f"{goroku}\n{rest if rest.startswith('…') else f'…{rest}'}"
+    trimmed = _drop_first_word(body).lstrip()
+    if trimmed:
+        return f"…{trimmed}"
+    return "…" if not has_leading_ellipsis else body
+
+
+def render_tweet(title: str, content: str, link: str, account_key: Optional[str] = None) -> Dict[str, str]:
+    """
+    投稿するツイートと403エラー時の再試行用のツイートを作る
+
+    Args:
+        account_key: 整形ルールのアカウントキー（省略時はリンクから判定）
+
+    Returns:
+        text（リンクを含まない本文）, tweet_text（投稿するツイート全体）, fallback_text（文頭の1語を削ったツイート全体）
+    """
+    formatter = FORMATTERS[account_key] if account_key else get_formatter(link)
+    text = formatter.format(title, content, link)
+    return {
+        'text': text,
+        'tweet_text': build_tweet(text, link),
+        'fallback_text': build_tweet(trim_first_word(text), link),
+    }
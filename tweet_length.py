@@ -0,0 +1,84 @@
+"""
+ツイートの文字数（X の重み付きカウント）モジュール
+twitter-text（v3）の数え方を実装する:
+- テキストは NFC 正規化してから数える
+- U+0000-U+10FF, U+2000-U+200D, U+2010-U+201F, U+2032-U+2037 は1文字、それ以外（日本語など）は2文字
+- URL は長さに関係なく23文字（t.co に短縮されるため）
+- 絵文字（ZWJ・肌色・異体字セレクタで結合したものを含む）は1つで2文字
+"""
+import re
+import unicodedata
+from typing import Iterable, List
+
+from config import Config
+
+# URL（t.co に短縮される）の文字数
+URL_LENGTH = 23
+
+# 重み1の文字の範囲（それ以外の文字は重み2）
+_LIGHT_RANGES = '\u0000-\u10ff\u2000-\u200d\u2010-\u201f\u2032-\u2037'
+_LIGHT = re.compile(f'[{_LIGHT_RANGES}]+')
+_URL = re.compile(r'https?://\S+')
+_EMOJI_BASE = '[\U0001F000-\U0001FAFF\u2600-\u27bf\u2b00-\u2bff]'
+_EMOJI_MODIFIERS = '(?:\ufe0f|[\U0001F3FB-\U0001F3FF]|\u20e3)*'
+_EMOJI = re.compile(
+    f'[\U0001F1E6-\U0001F1FF]{{2}}'  # 国旗（地域指示記号2つ）
+    f'|[#*0-9]\ufe0f?\u20e3'  # キーキャップ
+    f'|{_EMOJI_BASE}{_EMOJI_MODIFIERS}(?:\u200d{_EMOJI_BASE}{_EMOJI_MODIFIERS})*'
+)
+
+
+def max_weighted_length() -> int:
+    """1ツイートの上限（重み付き）"""
+    return Config.TWEET_MAX_WEIGHTED_LENGTH
+
+
+def _raw_weight(text: str) -> int:
+    """URL・絵文字を考慮しない重み付き文字数（重み1の文字は1、それ以外は2）"""
+    if text.isascii():
+        return len(text)
+    # 重み1の文字の連続をまとめて数える（日本語の本文では1文字ずつ数えるより速い）
+    return 2 * len(text) - sum(map(len, _LIGHT.findall(text)))
+
+
+def weighted_length(text: str) -> int:
+    """X の重み付き文字数"""
+    text = unicodedata.normalize('NFC', text)
+    length = _raw_weight(text)
+    for url in _URL.findall(text):
+        length += URL_LENGTH - _raw_weight(url)
+    if not text.isascii():
+        for emoji in _EMOJI.findall(text):
+            length += 2 - _raw_weight(emoji)
+    return length
+
+
+def weighted_lengths(texts: Iterable[str]) -> List[int]:
+    """複数のテキストの重み付き文字数（一括検証用）"""
+    return [weighted_length(text) for text in texts]
+
+
+def is_within_limit(text: str, max_length: int = None) -> bool:
+    """重み付き文字数が上限以内か"""
+    return weighted_length(text) <= (max_length if max_length is not None else max_weighted_length())
+
+
+def truncate_to_weight(text: str, max_weight: int) -> str:
+    """
+    重み付き文字数が max_weight 以内になるよう末尾を切る（途中で切る。句読点で区切らない）
+
+    URL・絵文字を含まない本文向け（1文字ずつの重みで数える）。
+    """
+    if max_weight <= 0:
+        return ''
+    if _raw_weight(text) <= max_weight:
+        return text
+    # 重み付き文字数が max_weight 以内になる最長の先頭部分を二分探索
+    low, high = 0, min(len(text), max_weight)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _raw_weight(text[:mid]) <= max_weight:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
@@ -2,13 +2,31 @@
 X (Twitter) 投稿モジュール
 """
 import tweepy
+import hashlib
 import logging
+import re
+import threading
 from typing import Dict, Optional
-from config import Config
+from tweet_formatter import format_tweet
+from tweet_length import max_weighted_length, truncate_to_weight, weighted_length
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ツイート末尾のリンクとハッシュタグ（改行 + URL + 改行 + "#ACIM" など）
+_LINK_SUFFIX = re.compile(r'\nhttps?://\S+(?:\n#\S+)*\s*$')
+
+
+def _truncate_keeping_link(text: str) -> str:
+    """
+    重み付き文字数が上限以内になるよう本文の末尾を切る（末尾のリンク・ハッシュタグは残す）
+    """
+    match = _LINK_SUFFIX.search(text)
+    body, suffix = (text[:match.start()], match.group(0)) if match else (text, '')
+    max_body_weight = max_weighted_length() - weighted_length(suffix) - 3  # "..."を考慮
+    return truncate_to_weight(body, max_body_weight) + "..." + suffix
+
+
 def _sanitize_x_headers(headers: dict) -> Dict[str, str]:
     """
     返ってきたレスポンスヘッダーから、調査に必要なものだけを抽出する。
@@ -96,6 +114,7 @@ class TwitterPoster:
         self.credentials = credentials
         self.account_key = account_key
         self.account_name = account_name
+        self.fingerprint = _credentials_fingerprint(credentials)
         self.client = self._create_client()
     
     def _create_client(self):
@@ -141,13 +160,15 @@ class TwitterPoster:
             投稿結果の辞書、またはNone（エラー時）
         """
         try:
-            # 文字数制限チェック
-            if len(text) > Config.MAX_POST_LENGTH:
-                text = text[:Config.MAX_POST_LENGTH - 3] + "..."
+            # 文字数制限チェック（X の重み付き文字数。本文を切り、末尾のリンク・ハッシュタグは残す）
+            if weighted_length(text) > max_weighted_length():
+                text = _truncate_keeping_link(text)
             
             logger.info(f"ツイート投稿中: {text[:50]}...")
             
             # ツイート投稿（API v2）
+            # （クライアントは使い回すため、前回のレスポンスのヘッダーを残さない）
+            self.client._last_response_headers = {}
             response = self.client.create_tweet(text=text)
             
             if response and response.data:
@@ -283,29 +304,14 @@ class TwitterPoster:
             投稿結果の辞書、またはNone（エラー時）
         """
         # リンクと#ACIMを追加
-        # 403エラーを回避するため、188文字（URL含む）に制限
-        # TwitterはURLを23文字としてカウントするが、実際のAPI送信時は実際のURL長が使用される
-        # そのため、最終的なテキスト（URL含む）が188文字以内になるようにする
-        # 最終的な形式: text + 改行(1) + URL(実際の長さ) + 改行(1) + "#ACIM"(5) = 188文字以内
-        hashtag = "\n#ACIM"  # 改行(1) + "#ACIM"(5) = 6文字
-        
-        # 最終的なテキスト: text + 改行(1) + URL(実際の長さ) + 改行(1) + "#ACIM"(5) = 188文字以内
-        # そのため、text + 1 + len(link) + 1 + 5 <= 188
-        # text <= 188 - 1 - len(link) - 1 - 5 = 181 - len(link)
-        max_text_length = 188 - 1 - len(link) - 1 - len("#ACIM")  # 改行(1) + URL + 改行(1) + #ACIM
-        
-        if len(text) > max_text_length:
-            text = text[:max_text_length - 3] + "..."
-        
+        # 最終的な形式: text + 改行 + URL + 改行 + "#ACIM" が X の重み付き文字数で上限以内
+        # （日本語は2文字、URLは実際の長さに関係なく23文字）
+        hashtag = "\n#ACIM"
         tweet_text = f"{text}\n{link}{hashtag}"
-        
-        # 最終チェック: 188文字を超えないように（念のため）
-        if len(tweet_text) > 188:
-            # テキストをさらに切り詰める
-            available_length = max_text_length - 3  # "..."を考慮
-            if available_length > 0:
-                text = text[:available_length] + "..."
-                tweet_text = f"{text}\n{link}{hashtag}"
+        if weighted_length(tweet_text) > max_weighted_length():
+            max_text_weight = max_weighted_length() - weighted_length(f"\n{link}{hashtag}")
+            text = truncate_to_weight(text, max_text_weight - 3) + "..."
+            tweet_text = f"{text}\n{link}{hashtag}"
         
         return self.post_tweet(tweet_text)
     
@@ -313,6 +319,9 @@ class TwitterPoster:
         """
         ブログ投稿をツイート用にフォーマット
         
+        整形ルールはリンクのアカウントごとに tweet_formatter.py で定義
+        （正規表現は事前コンパイル済み、同じ投稿の結果はキャッシュから返す）。
+        
         Args:
             title: ブログタイトル
             content: ブログコンテンツ（抜粋）
@@ -321,130 +330,55 @@ class TwitterPoster:
         Returns:
             フォーマットされたツイートテキスト（リンクは含まない）
         """
-        import re
-        
-        # タイトルに「| パーサによるトマスの福音書」などのサブタイトルが含まれている場合は除去
-        if title:
-            title = re.sub(r"\s*\|.*", "", title)
-        # タイトルの正規化
-        normalized_title = title
-        
-        # 365botGaryの場合: 「ACIM学習ガイド 」や「ACIM学習ノート 」を削除、「神の使い」を「神の使者」に修正
-        if 'notesofacim.blog.fc2.com' in link:
-            # 「ACIM学習ガイド 」または「ACIM学習ノート 」を削除
-            normalized_title = re.sub(r'^ACIM学習(ガイド|ノート)\s+', '', normalized_title)
-            # 「神の使い」を「神の使者」に修正
-            normalized_title = normalized_title.replace('神の使い', '神の使者')
-        
-        # pursahsgospelの場合: 「 | Pursah's Gospelのブログ」を削除
-        elif 'ameblo.jp/pursahs-gospel' in link or 'ameba.jp/profile/general/pursahs-gospel' in link:
-            # 「 | Pursah's Gospelのブログ」を削除
-            normalized_title = re.sub(r'\s*\|\s*Pursah\'?s Gospelのブログ\s*$', '', normalized_title)
-        
-        # コンテンツから不要な文字を除去（ナビゲーション要素など）
-        cleaned_content = content.strip()
-        
-        # pursahsgospelの場合: コンテンツ内のタイトルパターンを除去
-        if 'ameblo.jp/pursahs-gospel' in link or 'ameba.jp/profile/general/pursahs-gospel' in link:
-            # 語録番号パターン: 「語録XX」「語録 (Logion) XX」など（全角・半角数字対応）
-            goroku_pattern = r'語録(?:\s*\([^)]+\)\s*)?[０-９0-9]+'
-            
-            # 「ブログトップ...語録XX | Pursah's Gospelのブログ 語録XX」などのパターンを除去
-            cleaned_content = re.sub(rf'ブログトップ.*?{goroku_pattern}\s*\|\s*Pursah\'?s Gospelのブログ\s*{goroku_pattern}', '', cleaned_content, flags=re.DOTALL)
-            # 「ブログトップ...語録XX | パーサによるトマスの福音書 語録XX」などのパターンを除去
-            cleaned_content = re.sub(rf'ブログトップ.*?{goroku_pattern}\s*\|\s*パーサによるトマスの福音書\s*{goroku_pattern}', '', cleaned_content, flags=re.DOTALL)
-            # 「語録XX | Pursah's Gospelのブログ 語録XX」のパターンを除去
-            cleaned_content = re.sub(rf'{goroku_pattern}\s*\|\s*Pursah\'?s Gospelのブログ\s*{goroku_pattern}', '', cleaned_content, flags=re.DOTALL)
-            # 「語録XX | パーサによるトマスの福音書 語録XX」のパターンを除去
-            cleaned_content = re.sub(rf'{goroku_pattern}\s*\|\s*パーサによるトマスの福音書\s*{goroku_pattern}', '', cleaned_content, flags=re.DOTALL)
-            # 残っている「ブログトップ...語録XX」のパターンを除去（最も広いパターン）
-            cleaned_content = re.sub(rf'ブログトップ.*?{goroku_pattern}', '', cleaned_content, flags=re.DOTALL)
-            # コンテンツの先頭に残っている重複した語録番号を除去
-            cleaned_content = re.sub(rf'^{goroku_pattern}\s*{goroku_pattern}', '', cleaned_content, flags=re.MULTILINE)
-        
-        cleaned_content = cleaned_content.strip()
-        
-        # pursahsgospelの場合: コンテンツの先頭が「語録XX」で始まる場合、その後に改行を追加
-        if 'ameblo.jp/pursahs-gospel' in link or 'ameba.jp/profile/general/pursahs-gospel' in link:
-            # コンテンツの先頭が「語録XX」または「語録 (Logion) XX」で始まる場合、その後に改行を追加
-            # 語録番号パターン: 全角・半角数字対応
-            goroku_head_pattern = r'^(語録(?:\s*\([^)]+\)\s*)?[０-９0-9]+)'
-            match = re.match(goroku_head_pattern, cleaned_content)
-            if match:
-                goroku_part = match.group(1)
-                rest_content = cleaned_content[len(goroku_part):].lstrip()
-                # 改行がなければ追加
-                if not rest_content.startswith('\n'):
-                    cleaned_content = f"{goroku_part}\n{rest_content}"
-        
-        # フォーマット: タイトル + "\n" + 本文 + "\n" + URL + "\n" + "#ACIM"
-        # 最終的な形式: tweet_text + 改行(1) + URL(実際の長さ) + 改行(1) + "#ACIM"(5) = 188文字以内
-        # pursahsgospelの場合: タイトルを含めない（本文のみ）
-        # 365botGaryの場合: タイトルを含める
-        max_total_length = 188  # Twitterカウント（URL含む）
-        hashtag = "\n#ACIM"  # 改行(1) + "#ACIM"(5) = 6文字
-        
-        # pursahsgospelの場合: タイトルを含めない（本文のみ）
-        is_pursahs = 'ameblo.jp/pursahs-gospel' in link or 'ameba.jp/profile/general/pursahs-gospel' in link
-        is_365bot = 'notesofacim.blog.fc2.com' in link
-        
-        # 実際のURL長を使用（post_tweet_with_linkと同じロジック）
-        # 最終的な形式: tweet_text + 改行(1) + URL(実際の長さ) + 改行(1) + "#ACIM"(5) = 188文字以内
-        # そのため、tweet_text + 1 + len(link) + 1 + 5 <= 188
-        # tweet_text <= 188 - 1 - len(link) - 1 - 5 = 181 - len(link)
-        max_tweet_text_length = max_total_length - 1 - len(link) - 1 - len("#ACIM")  # 改行(1) + URL + 改行(1) + #ACIM
-        
-        if is_pursahs:
-            # pursahsgospel: タイトルなし、本文のみ
-            # tweet_text = content_preview
-            # そのため、content_preview <= max_tweet_text_length
-            max_text_length = max_tweet_text_length
-            title_with_newline = ""
-            title_length = 0
-        elif is_365bot:
-            # 365botGary: タイトルあり
-            # tweet_text = normalized_title + "\n" + content_preview
-            # そのため、len(normalized_title) + 1 + len(content_preview) <= max_tweet_text_length
-            title_with_newline = f"{normalized_title}\n"
-            title_length = len(title_with_newline)  # タイトル + 改行
-            max_text_length = max_tweet_text_length - title_length  # タイトル改行を引く
-        else:
-            # その他の場合（通常は発生しない）
-            title_with_newline = f"{normalized_title}\n"
-            title_length = len(title_with_newline)
-            max_text_length = max_tweet_text_length - title_length
-        
-        # 本文を切り詰める
-        if len(cleaned_content) <= max_text_length:
-            # 全部引用
-            content_preview = cleaned_content
-        else:
-            # 本文を切り詰める（途中で切る。句読点で区切らない）
-            content_preview = cleaned_content[:max_text_length]
-        
-        # タイトル + 改行 + 本文の形式で結合（pursahsgospelの場合はタイトルなし）
-        if is_pursahs:
-            tweet_text = content_preview
-        else:
-            tweet_text = f"{normalized_title}\n{content_preview}"
-        
-        # 最終チェック: max_tweet_text_lengthを超えないように（念のため）
-        if len(tweet_text) > max_tweet_text_length:
-            if is_pursahs:
-                # pursahsgospel: 本文のみなので、本文を切り詰める
-                content_preview = cleaned_content[:max_tweet_text_length]
-                tweet_text = content_preview
-            else:
-                # 365botGary: タイトルは含める必要があるので、本文をさらに切り詰める
-                available_for_content = max_tweet_text_length - title_length
-                if available_for_content > 0:
-                    # 本文を切り詰める（途中で切る。句読点で区切らない）
-                    content_preview = cleaned_content[:available_for_content]
-                    tweet_text = f"{normalized_title}\n{content_preview}"
-                else:
-                    # タイトルが長すぎる場合は、タイトルのみ（これは通常発生しない）
-                    tweet_text = normalized_title
-        
-        return tweet_text
+        return format_tweet(title, content, link)
+    
+    def close(self):
+        """クライアントのHTTP接続（keep-alive）を閉じる"""
+        session = getattr(self.client, "session", None)
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+
+def _credentials_fingerprint(credentials: Dict[str, str]) -> str:
+    """認証情報の変更検出用のハッシュ（認証情報そのものは保持しない）"""
+    keys = ("api_key", "api_secret", "access_token", "access_token_secret", "bearer_token")
+    joined = "\0".join(str((credentials or {}).get(k) or "") for k in keys)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+# アカウントごとの TwitterPoster（tweepy.Client とその keep-alive 接続）をプロセス内で使い回す
+_posters: Dict[str, TwitterPoster] = {}
+_posters_lock = threading.Lock()
+
+
+def get_poster(credentials: Dict[str, str], account_key: str = None, account_name: str = None) -> TwitterPoster:
+    """
+    アカウントの TwitterPoster を取得（初回に作成し、以降は同じクライアントと接続を使い回す）
+
+    認証情報が前回と変わっていた場合は古いクライアントを閉じて作り直す。
+    """
+    fingerprint = _credentials_fingerprint(credentials)
+    key = account_key or fingerprint
+    with _posters_lock:
+        poster = _posters.get(key)
+        if poster is not None and poster.fingerprint == fingerprint:
+            if account_name:
+                poster.account_name = account_name
+            return poster
+        if poster is not None:
+            logger.info(f"認証情報が変わったため、クライアントを作り直します: {account_name or key}")
+            poster.close()
+        poster = TwitterPoster(credentials, account_key=account_key, account_name=account_name)
+        _posters[key] = poster
+        return poster
 
 
+def close_posters():
+    """使い回している全ての TwitterPoster の接続を閉じる"""
+    with _posters_lock:
+        for poster in _posters.values():
+            poster.close()
+        _posters.clear()
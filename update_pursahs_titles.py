@@ -3,11 +3,12 @@ pursahsgospelのタイトルを正しく更新するスクリプト
 各ページにアクセスしてタイトルを取得し、データベースを更新
 """
 import sqlite3
-import requests
-from bs4 import BeautifulSoup
 import time
 import logging
 import re
+from database import PostDatabase
+from http_session import get_session
+from html_parsing import make_soup
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,16 +23,11 @@ logger = logging.getLogger(__name__)
 def fetch_title_from_page(url: str) -> str:
     """ページからタイトルを取得"""
     try:
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        response = session.get(url, timeout=30)
+        response = get_session().get(url, timeout=30)
         response.encoding = response.apparent_encoding or 'utf-8'
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         # タイトルを取得（複数の方法を試す）
         new_title = None
@@ -76,6 +72,7 @@ def fetch_title_from_page(url: str) -> str:
 
 def update_titles():
     """pursahsgospelのタイトルを更新"""
+    db = PostDatabase()
     conn = sqlite3.connect('posts.db')
     cursor = conn.cursor()
     
@@ -109,8 +106,8 @@ def update_titles():
             new_title = fetch_title_from_page(link)
             
             if new_title and new_title != old_title:
-                # タイトルを更新
-                cursor.execute("UPDATE posts SET title = ? WHERE id = ?", (new_title, post_id))
+                # タイトルを更新（分類カラムも合わせて更新される）
+                db.update_post_title(post_id, new_title)
                 logger.info(f"ID:{post_id:3d} | {old_title[:30]}... → {new_title[:50]}...")
                 updated += 1
             elif new_title:
@@ -0,0 +1,191 @@
+"""
+ツイートの文字数の一括検証・事前整形スクリプト
+各アカウントのブログの全投稿をそのアカウントのルールで整形し、投稿するツイート全体（リンク・ハッシュタグ込み）と
+403エラー時の再試行用のツイート（文頭の1語を削ったもの）、X の重み付き文字数（日本語は2文字、URLは23文字）、
+整形元のコンテンツのハッシュ、整形ルールのハッシュをまとめて rendered_tweets に保存する。
+- 整形元のコンテンツと整形ルールのどちらも変わっていない投稿は整形し直さない（保存もしない）
+- 投稿時はコンテンツのハッシュと整形ルールのハッシュが一致すれば保存済みのツイートをそのまま投稿する
+- 上限を超えるツイート（is_valid = 0）の投稿は投稿候補の選択（get_random_unposted_posts）で除外される
+- --preview で各アカウントの次の投稿候補のツイートを確認できる（投稿しない）
+- --diff で保存済みのツイートと比べて整形結果が変わった投稿を表示する（ネットワークに接続しない）
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+from database import PostDatabase
+from revalidate_posts import ACCOUNTS
+from tweet_formatter import FORMATTERS, render_tweet
+from tweet_length import max_weighted_length, weighted_lengths
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+
+def validate_account(
+    db: PostDatabase, account_key: str, blog_url: str, dry_run: bool = False, full: bool = False
+) -> Dict:
+    """
+    1つのアカウントの投稿のツイートを整形して文字数を検証
+
+    整形元のコンテンツ（source_hash）か整形ルール（rules_hash）が前回から変わった投稿のみ整形し直す。
+
+    Args:
+        full: Trueの場合、変わっていない投稿も含めて全投稿を整形し直す（整形処理の変更の確認用）
+
+    Returns:
+        件数の辞書（total, rendered, valid, invalid, changed）と、整形結果が変わった投稿のリスト（diffs）
+    """
+    limit = max_weighted_length()
+    rules_hash = FORMATTERS[account_key].rules_hash()
+    sources = db.get_tweet_sources(blog_url)
+    previous = db.get_rendered_tweets(account_key)
+    stale = [
+        s for s in sources
+        if full
+        or s['id'] not in previous
+        or previous[s['id']]['source_hash'] != s['source_hash']
+        or previous[s['id']]['rules_hash'] != rules_hash
+    ]
+    rendered = [render_tweet(s['title'], s['content'], s['link'], account_key) for s in stale]
+    lengths = weighted_lengths(r['tweet_text'] for r in rendered)
+
+    rows, diffs = [], []
+    for source, tweet, length in zip(stale, rendered, lengths):
+        is_valid = length <= limit
+        rows.append({
+            'post_id': source['id'],
+            'tweet_text': tweet['tweet_text'],
+            'fallback_text': tweet['fallback_text'],
+            'weighted_length': length,
+            'is_valid': is_valid,
+            'source_hash': source['source_hash'],
+            'rules_hash': rules_hash,
+        })
+        if not is_valid:
+            logger.warning(f"{account_key}: 文字数超過（{length}/{limit}）: post_id={source['id']} {source['link']}")
+        old = previous.get(source['id'])
+        if old and old['tweet_text'] != tweet['tweet_text']:
+            diffs.append({'post_id': source['id'], 'old': old['tweet_text'], 'new': tweet['tweet_text']})
+    if not dry_run:
+        db.save_rendered_tweets(account_key, rows)
+
+    # 整形し直さなかった投稿は保存済みの検証結果を数える
+    validity = {source['id']: bool(previous[source['id']]['is_valid']) for source in sources if source['id'] in previous}
+    validity.update((row['post_id'], row['is_valid']) for row in rows)
+    invalid = sum(1 for source in sources if not validity[source['id']])
+    return {
+        'total': len(sources),
+        'rendered': len(rows),
+        'valid': len(sources) - invalid,
+        'invalid': invalid,
+        'changed': len(diffs),
+        'diffs': diffs,
+    }
+
+
+def load_tweet(db: PostDatabase, post_id: int, account_key: str, page_content: Dict[str, str], link: str) -> Dict:
+    """
+    投稿するツイートを取得（投稿・リトライ共通）
+
+    整形済みのツイート（コンテンツのハッシュと整形ルールのハッシュが一致するもの）があればそれを使い、
+    未整形または内容・整形ルールが変わった場合はここで整形する。
+
+    Returns:
+        tweet_text（投稿するツイート全体）, fallback_text（403エラー時の再試行用）を含む辞書
+    """
+    rendered = db.get_rendered_tweet(post_id, account_key, page_content, FORMATTERS[account_key].rules_hash())
+    if rendered and rendered.get('fallback_text'):
+        logger.info(f"整形済みのツイートを使用（整形日時: {rendered['rendered_at']}）")
+        return rendered
+    return render_tweet(
+        title=page_content.get('title', ''),
+        content=page_content.get('content', ''),
+        link=page_content.get('link', link),
+        account_key=account_key
+    )
+
+
+def preview(db: PostDatabase, account_key: str, blog_url: str, twitter_handle: str, count: int) -> List[Dict]:
+    """
+    次の投稿候補のツイート（投稿時と同じく、取得済みのページコンテンツを優先して選ぶ）
+
+    データベースには書き込まない（サイクルの開始・完了も記録しない）。
+
+    Returns:
+        投稿のリスト（post_id, link, tweet_text, fallback_text, weighted_length, is_valid, rendered_at）
+    """
+    candidates = db.get_random_unposted_posts(
+        blog_url, twitter_handle, limit=count, account_key=account_key, prefer_cached=True, read_only=True
+    )
+    rules_hash = FORMATTERS[account_key].rules_hash()
+    tweets = []
+    for post in candidates:
+        page_content = db.get_post_content(post['id'])
+        rendered = db.get_rendered_tweet(post['id'], account_key, page_content or post, rules_hash)
+        if rendered is None:
+            # 未整形（または整形後に内容・整形ルールが変わった）投稿はその場で整形する
+            source = page_content or post
+            rendered = render_tweet(source['title'], source.get('content') or '', post['link'], account_key)
+            rendered['weighted_length'] = weighted_lengths([rendered['tweet_text']])[0]
+            rendered['is_valid'] = rendered['weighted_length'] <= max_weighted_length()
+            rendered['rendered_at'] = None
+        tweets.append(dict(rendered, post_id=post['id'], link=post['link']))
+    return tweets
+
+
+def main(only_account: Optional[str] = None, dry_run: bool = False, full: bool = False) -> Dict[str, Dict]:
+    """メイン関数"""
+    db = PostDatabase()
+    results = {}
+    for account_key, blog_url, twitter_handle in ACCOUNTS:
+        if only_account and account_key != only_account:
+            continue
+        start = time.perf_counter()
+        counts = validate_account(db, account_key, blog_url, dry_run=dry_run, full=full)
+        logger.info(
+            f"@{twitter_handle}: {counts['total']}件を検証（整形 {counts['rendered']}件 / "
+            f"上限以内 {counts['valid']}件 / 超過 {counts['invalid']}件 / "
+            f"前回から変更 {counts['changed']}件、{(time.perf_counter() - start) * 1000:.0f}ms）"
+        )
+        results[account_key] = counts
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='全投稿のツイートを事前に整形し、文字数（X の重み付きカウント）を検証')
+    parser.add_argument('--account', choices=[key for key, _, _ in ACCOUNTS], help='対象のアカウント（省略時は全アカウント）')
+    parser.add_argument('--dry-run', action='store_true', help='データベースに保存しない')
+    parser.add_argument('--all', action='store_true', help='変わっていない投稿も含めて全投稿を整形し直す')
+    parser.add_argument('--preview', type=int, metavar='N', help='各アカウントの次のN件の投稿候補のツイートを表示（投稿しない）')
+    parser.add_argument('--diff', action='store_true', help='保存済みのツイートから整形結果が変わった投稿を表示')
+    args = parser.parse_args()
+
+    if args.preview:
+        db = PostDatabase()
+        for account_key, blog_url, twitter_handle in ACCOUNTS:
+            if args.account and account_key != args.account:
+                continue
+            print(f"\n@{twitter_handle}（次の{args.preview}件）")
+            for tweet in preview(db, account_key, blog_url, twitter_handle, args.preview):
+                status = '' if tweet['is_valid'] else ' 文字数超過'
+                source = '整形済み' if tweet['rendered_at'] else '未整形'
+                print(f"\n--- post_id={tweet['post_id']}（{tweet['weighted_length']}/{max_weighted_length()}、{source}{status}）")
+                print(tweet['tweet_text'])
+                print(f"--- 403時の再試行:\n{tweet['fallback_text']}")
+        sys.exit(0)
+
+    results = main(only_account=args.account, dry_run=args.dry_run, full=args.all)
+    if args.diff:
+        for account_key, counts in results.items():
+            print(f"\n{account_key}: 整形結果が変わった投稿 {counts['changed']}件")
+            for diff in counts['diffs']:
+                print(f"\n--- post_id={diff['post_id']}\n- {diff['old']!r}\n+ {diff['new']!r}")